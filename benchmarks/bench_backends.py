@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Compare the ``captcha`` and ``numpy`` image backends.
+
+Times single-image rendering, batched ``generate_batch`` rendering and full
+PNG samples for each backend. Run from the repository root:
+
+    python benchmarks/bench_backends.py --size 2000 --batch 256
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from oopscaptcha.generators.factory import CaptchaFactory  # noqa: E402
+from oopscaptcha.generators.types import CaptchaType  # noqa: E402
+
+BACKENDS = ('captcha', 'numpy')
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the image rendering backends')
+    parser.add_argument('--size', type=int, default=2000, help='Number of images per case')
+    parser.add_argument('--batch', type=int, default=256, help='Batch size for generate_batch')
+    parser.add_argument('--width', type=int, default=160, help='Image width')
+    parser.add_argument('--height', type=int, default=60, help='Image height')
+    args = parser.parse_args()
+
+    for backend in BACKENDS:
+        generator = CaptchaFactory.create(CaptchaType.IMAGE, backend=backend, width=args.width, height=args.height)
+        generator.warmup()
+        rng = random.Random(0)
+        labels = [generator.generate_label(rng) for _ in range(args.size)]
+        rngs = [random.Random(i) for i in range(args.size)]
+
+        def batches():
+            for start in range(0, args.size, args.batch):
+                generator.generate_batch(labels[start:start + args.batch], rngs=rngs[start:start + args.batch])
+
+        cases = (
+            ('render', lambda: [generator.generator.generate_image(label, rng=r) for label, r in zip(labels, rngs)]),
+            ('generate_batch', batches),
+            ('sample', lambda: [generator.generate_sample(label, rng=r) for label, r in zip(labels, rngs)]),
+        )
+        for name, func in cases:
+            seconds = timed(func)
+            print(f"{backend:>8} {name:>16}: {seconds * 1000 / args.size:7.3f} ms/sample "
+                  f"({args.size / seconds:8.1f} samples/sec)")
+
+
+if __name__ == '__main__':
+    main()
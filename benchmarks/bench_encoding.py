@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Compare sample encoding profiles: encode time against bytes per sample.
+
+Renders ``--size`` images once, then encodes all of them with every profile
+through ``encode_rendered``. Run from the repository root:
+
+    python benchmarks/bench_encoding.py --size 500
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from oopscaptcha.generators.factory import CaptchaFactory  # noqa: E402
+from oopscaptcha.generators.types import CaptchaType  # noqa: E402
+
+PROFILES = {
+    'png': {},
+    'png-fast': {'compress_level': 1},
+    'png-small': {'compress_level': 9, 'optimize': True},
+    'png-gray': {'mode': 'L'},
+    'png-p16': {'mode': 'P', 'colors': 16},
+    'webp-80': {'format': 'webp', 'quality': 80},
+    'webp-fast': {'format': 'webp', 'quality': 80, 'compress_level': 0},
+    'webp-lossless': {'format': 'webp', 'lossless': True},
+    'jpeg-90': {'format': 'jpeg', 'quality': 90},
+    'jpeg-75-gray': {'format': 'jpeg', 'quality': 75, 'mode': 'L'},
+    'raw': {'format': 'raw'},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sample encoding profiles')
+    parser.add_argument('--size', type=int, default=500, help='Number of images encoded per profile')
+    parser.add_argument('--width', type=int, default=160, help='Image width')
+    parser.add_argument('--height', type=int, default=60, help='Image height')
+    parser.add_argument('--profiles', type=lambda v: v.split(','), default=list(PROFILES),
+                        help='Comma-separated profiles: ' + ','.join(PROFILES))
+    args = parser.parse_args()
+
+    renderer = CaptchaFactory.create(CaptchaType.IMAGE, width=args.width, height=args.height)
+    rng = random.Random(0)
+    images = [renderer.render_sample(renderer.generate_label(rng), rng) for _ in range(args.size)]
+
+    for name in args.profiles:
+        generator = CaptchaFactory.create(CaptchaType.IMAGE, width=args.width, height=args.height,
+                                          encoding={'format': 'png', **PROFILES[name]})
+        start = time.perf_counter()
+        encoded = [generator.encode_rendered(image) for image in images]
+        seconds = time.perf_counter() - start
+        size = sum(sample.getbuffer().nbytes for sample in encoded) / args.size
+        print(f"{name:>14} (.{generator.sample_extension:<4}): {seconds * 1000 / args.size:7.3f} ms/sample "
+              f"{size:9.0f} bytes/sample")
+
+
+if __name__ == '__main__':
+    main()
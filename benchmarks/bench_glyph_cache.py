@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Measure samples/sec of ImageCaptchaGenerator with and without the glyph cache.
+
+Uses the default configuration (160x60, 4 characters). Run from the repository root:
+
+    python benchmarks/bench_glyph_cache.py --samples 2000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from oopscaptcha.generators.factory import CaptchaFactory  # noqa: E402
+from oopscaptcha.generators.types import CaptchaType  # noqa: E402
+
+
+def measure(generator, samples: int, encode: bool) -> float:
+    rng = random.Random(0)
+    labels = [generator.generate_label(rng) for _ in range(samples)]
+    render = generator.generate_sample if encode else generator.generator.generate_image
+    
+    # Warm up fonts (and the cache when enabled) outside of the timed loop
+    for label in labels[:50]:
+        render(label, rng=rng)
+    
+    start = time.perf_counter()
+    for label in labels:
+        render(label, rng=rng)
+    return samples / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the glyph rasterization cache')
+    parser.add_argument('--samples', type=int, default=2000, help='Samples rendered per measurement')
+    args = parser.parse_args()
+
+    generators = {
+        'uncached': CaptchaFactory.create(CaptchaType.IMAGE, glyph_cache=False),
+        'cached': CaptchaFactory.create(CaptchaType.IMAGE, glyph_cache=True),
+    }
+    for stage, encode in (('render only', False), ('render + PNG', True)):
+        rates = {name: measure(generator, args.samples, encode) for name, generator in generators.items()}
+        print(f"{stage}:")
+        for name, rate in rates.items():
+            print(f"  {name:>8}: {rate:8.1f} samples/sec")
+        print(f"  speedup: {rates['cached'] / rates['uncached']:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Track CLI startup: import time and wall time of short ``oops-captcha`` invocations.
+
+Every case runs in a fresh interpreter with ``python -X importtime``. The
+report lists the wall time (best of ``--repeat`` runs), the total import time
+and the import time of every heavy third-party module the command loaded. Run
+from the repository root:
+
+    python benchmarks/bench_import.py --output startup.json
+    python benchmarks/bench_import.py --compare baseline.json
+
+Compare mode exits with status 1 when a case is slower than the baseline by
+more than ``--threshold``.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Modules Whose Import Dominates Startup
+HEAVY_MODULES = ('numpy', 'PIL.Image', 'captcha.image', 'yaml', 'asyncio', 'multiprocessing')
+
+CASES = {
+    'import': ['-c', 'import oopscaptcha.cli'],
+    'help': ['-m', 'oopscaptcha.cli', '--help'],
+    'usage-error': ['-m', 'oopscaptcha.cli', 'single'],
+    'single': ['-m', 'oopscaptcha.cli', 'single', '--type', 'image', '--output-dir', '{tmp}'],
+}
+
+
+def parse_importtime(stderr: str) -> Dict[str, Any]:
+    # "import time: self [us] | cumulative | imported package", nesting is shown by indentation
+    cumulative: Dict[str, int] = {}
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        _, us, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):
+            total += int(us)
+        cumulative.setdefault(name.strip(), int(us))
+    return {'total': total, 'modules': cumulative}
+
+
+def run_case(args: List[str], repeat: int) -> Dict[str, Any]:
+    env = {**os.environ, 'PYTHONPATH': str(ROOT)}
+    best = float('inf')
+    imports: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix='oopscaptcha-bench-') as tmp:
+        command = [sys.executable, '-X', 'importtime'] + [arg.format(tmp=tmp) for arg in args]
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+            best = min(best, time.perf_counter() - start)
+            imports = parse_importtime(result.stderr)
+
+    return {
+        'wall_ms': best * 1000,
+        'import_ms': imports['total'] / 1000,
+        'heavy_import_ms': {name: imports['modules'][name] / 1000 for name in HEAVY_MODULES if name in imports['modules']},
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Return the name of every case that got slower than the baseline."""
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        ratio = result['wall_ms'] / base['wall_ms']
+        regressed = ratio > 1 + threshold
+        print(f"{name:<12} {base['wall_ms']:8.1f} ms -> {result['wall_ms']:8.1f} ms ({ratio:5.2f}x)"
+              f"{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CLI startup and import time')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per case, the fastest is reported')
+    parser.add_argument('--cases', type=lambda v: [c for c in v.split(',') if c], default=list(CASES),
+                        help='Comma-separated cases: ' + ','.join(CASES))
+    parser.add_argument('--output', type=Path, help='Write results as JSON to this file')
+    parser.add_argument('--compare', type=Path, help='Baseline results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.20, help='Allowed relative slowdown before a case is flagged')
+    args = parser.parse_args()
+
+    for case in args.cases:
+        if case not in CASES:
+            parser.error(f"Unknown case: {case}")
+
+    report: Dict[str, Any] = {'python': sys.version.split()[0], 'results': {}}
+    for case in args.cases:
+        result = run_case(CASES[case], args.repeat)
+        report['results'][case] = result
+        heavy = ', '.join(f"{name} {ms:.0f}" for name, ms in result['heavy_import_ms'].items()) or '-'
+        print(f"{case:<12} {result['wall_ms']:8.1f} ms wall  {result['import_ms']:7.1f} ms imports  "
+              f"heavy: {heavy}", flush=True)
+
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Compare per-label generation with the vectorized batch label API.
+
+Uses the default configuration (4 characters out of 62). Run from the repository root:
+
+    python benchmarks/bench_labels.py --size 10000000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from oopscaptcha.generators.factory import CaptchaFactory  # noqa: E402
+from oopscaptcha.generators.types import CaptchaType  # noqa: E402
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batch label generation')
+    parser.add_argument('--size', type=int, default=10000000, help='Number of labels to generate')
+    parser.add_argument('--loop-size', type=int, default=1000000, help='Labels drawn by the per-label loop (extrapolated to --size)')
+    args = parser.parse_args()
+
+    generator = CaptchaFactory.create(CaptchaType.IMAGE)
+    rng = random.Random(0)
+
+    loop = timed(lambda: [generator.generate_label(rng) for _ in range(args.loop_size)]) * args.size / args.loop_size
+    print(f"{'generate_label loop':>24}: {loop:8.2f} s (extrapolated)")
+    for name, kwargs in (('generate_labels', {}), ('unique', {'unique': True}), ('balance', {'balance': True})):
+        seconds = timed(lambda: generator.generate_labels(args.size, rng=0, **kwargs))
+        print(f"{name:>24}: {seconds:8.2f} s ({loop / seconds:.0f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Measure how fast ``OnlineProducer`` feeds a consumer.
+
+Compares one process calling ``generate_batch`` against the shared-memory
+producer with an increasing number of worker processes. The consumer only
+touches each batch, so the numbers are the rate a training loop could be fed
+at. Run from the repository root:
+
+    python benchmarks/bench_online.py --batches 50 --workers 1,2,4
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from oopscaptcha.datasets import OnlineProducer  # noqa: E402
+from oopscaptcha.generators.factory import CaptchaFactory  # noqa: E402
+from oopscaptcha.generators.types import CaptchaType  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark shared-memory online generation')
+    parser.add_argument('--batches', type=int, default=50, help='Batches per case')
+    parser.add_argument('--batch-size', type=int, default=256, help='Samples per batch')
+    parser.add_argument('--workers', type=lambda v: [int(w) for w in v.split(',')], default=[1, 2, 4],
+                        help='Comma-separated worker counts')
+    parser.add_argument('--backend', type=str, default='captcha', help='Image backend')
+    args = parser.parse_args()
+
+    generator = CaptchaFactory.create(CaptchaType.IMAGE, backend=args.backend)
+    generator.warmup()
+    samples = args.batches * args.batch_size
+
+    start = time.perf_counter()
+    for _ in range(args.batches):
+        generator.generate_batch(args.batch_size)
+    seconds = time.perf_counter() - start
+    print(f"{'inline':>10}: {samples / seconds:9.1f} samples/sec")
+
+    for workers in args.workers:
+        with OnlineProducer(generator, batch_size=args.batch_size, num_workers=workers,
+                            batches=args.batches) as producer:
+            start = time.perf_counter()
+            for images, labels in producer:
+                images[0, 0, 0]
+            seconds = time.perf_counter() - start
+        waited = producer.metrics()['wait_seconds']
+        print(f"{workers:>3} workers: {samples / seconds:9.1f} samples/sec  "
+              f"(consumer waited {waited / seconds:5.1%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""Stage-level benchmark suite for the CAPTCHA generation pipeline.
+
+Measures samples/sec, per-sample latency percentiles and peak RSS for each
+stage (label, render, encode, sample, save) and for whole ``generate_dataset``
+runs (sequential, thread and process backends) across a matrix of sizes,
+image dimensions and worker counts. Every case runs in a fresh interpreter so
+peak RSS and warm caches do not leak between cases.
+
+Run from the repository root:
+
+    python benchmarks/bench_pipeline.py --output results.json
+    python benchmarks/bench_pipeline.py --sizes 1000,10000 --dims 160x60,320x120 --workers 2,8
+    python benchmarks/bench_pipeline.py --stages dataset --workers 4 --chunk-sizes 8,64,256
+    python benchmarks/bench_pipeline.py --stages encode,save --encoding png,webp,jpeg,raw
+    python benchmarks/bench_pipeline.py --output current.json --compare baseline.json
+
+Compare mode exits with status 1 when a case is slower than the baseline by
+more than ``--threshold`` (throughput or p99 latency).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from oopscaptcha.generators.factory import CaptchaFactory  # noqa: E402
+from oopscaptcha.generators.image import ENCODING_FORMATS  # noqa: E402
+from oopscaptcha.generators.types import CaptchaType  # noqa: E402
+
+STAGES = ('label', 'render', 'encode', 'sample', 'save')
+DATASET_MODES = ('sequential', 'thread', 'process')
+WARMUP = 20
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # Process pool workers are children of the case process
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def percentiles(latencies_ns: List[int]) -> Dict[str, float]:
+    ordered = sorted(latencies_ns)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] / 1e6
+
+    return {'p50': pick(0.50), 'p90': pick(0.90), 'p99': pick(0.99), 'max': ordered[-1] / 1e6}
+
+
+def time_calls(func, args: List[Any]) -> Dict[str, Any]:
+    for arg in args[:WARMUP]:
+        func(arg)
+
+    latencies = []
+    start = time.perf_counter()
+    for arg in args:
+        call_start = time.perf_counter_ns()
+        func(arg)
+        latencies.append(time.perf_counter_ns() - call_start)
+    seconds = time.perf_counter() - start
+    return {'seconds': seconds, 'latency_ms': percentiles(latencies)}
+
+
+def create_generator(case: Dict[str, Any]):
+    # Every stage encodes with the case's encoding profile
+    return CaptchaFactory.create(CaptchaType.IMAGE, width=case['width'], height=case['height'],
+                                 encoding={'format': case.get('encoding', 'png')})
+
+
+def run_stage(case: Dict[str, Any], output_dir: Path) -> Dict[str, Any]:
+    generator = create_generator(case)
+    rng = random.Random(0)
+    size = case['size']
+    stage = case['stage']
+    labels = [generator.generate_label(rng) for _ in range(size)]
+
+    if stage == 'label':
+        return time_calls(lambda _: generator.generate_label(rng), labels)
+    if stage == 'render':
+        return time_calls(lambda label: generator.generator.generate_image(label, rng=rng), labels)
+    if stage == 'sample':
+        return time_calls(lambda label: generator.generate_sample(label, rng=rng), labels)
+
+    # Encode and save measure a pre-rendered pool, cycled, so rendering is excluded
+    distinct = labels[:min(size, 256)]
+    if stage == 'encode':
+        images = [generator.generator.generate_image(label, rng=rng) for label in distinct]
+
+        def encode(i: int) -> None:
+            generator.encode_rendered(images[i % len(images)])
+        return time_calls(encode, list(range(size)))
+
+    samples = [(generator.generate_sample(label, rng=rng), label) for label in distinct]
+
+    def save(i: int) -> None:
+        sample, label = samples[i % len(samples)]
+        generator.save(sample, label, output_dir=output_dir, use_timestamp_dir=False, key=f"{i:08d}")
+    return time_calls(save, list(range(size)))
+
+
+def run_dataset(case: Dict[str, Any], output_dir: Path) -> Dict[str, Any]:
+    generator = create_generator(case)
+    generator.warmup()
+    mode = case['mode']
+
+    start = time.perf_counter()
+    generator.generate_dataset(
+        size=case['size'], train_ratio=0.8, val_ratio=0.1, test_ratio=0.1,
+        parallel=mode != 'sequential', max_workers=case.get('workers'),
+        executor='thread' if mode == 'sequential' else mode,
+        seed=0, output_dir=output_dir, chunk_size=case.get('chunk_size')
+    )
+    return {'seconds': time.perf_counter() - start}
+
+
+def run_case(case: Dict[str, Any]) -> Dict[str, Any]:
+    # Runs in a fresh process, see run_suite
+    output_dir = Path(tempfile.mkdtemp(prefix='oopscaptcha-bench-'))
+    try:
+        if case['stage'] == 'dataset':
+            result = run_dataset(case, output_dir)
+        else:
+            result = run_stage(case, output_dir)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    result['samples_per_sec'] = case['size'] / result['seconds']
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def build_cases(args) -> List[Dict[str, Any]]:
+    cases = []
+    for size in args.sizes:
+        for width, height in args.dims:
+            for encoding in args.encoding:
+                base = {'size': size, 'width': width, 'height': height, 'encoding': encoding}
+                for stage in args.stages:
+                    if stage != 'dataset':
+                        cases.append({'stage': stage, **base})
+                        continue
+                    for mode in args.modes:
+                        for workers in ([None] if mode == 'sequential' else args.workers):
+                            for chunk_size in args.chunk_sizes:
+                                cases.append({'stage': stage, 'mode': mode, 'workers': workers,
+                                              'chunk_size': chunk_size, **base})
+    return cases
+
+
+def case_name(case: Dict[str, Any]) -> str:
+    name = f"{case['stage']}/{case['width']}x{case['height']}/n={case['size']}"
+    if case.get('encoding', 'png') != 'png':
+        name += f"/{case['encoding']}"
+    if case['stage'] == 'dataset':
+        name += f"/{case['mode']}"
+        if case['workers'] is not None:
+            name += f"/workers={case['workers']}"
+        if case.get('chunk_size') is not None:
+            name += f"/chunk={case['chunk_size']}"
+    return name
+
+
+def run_suite(cases: List[Dict[str, Any]]) -> Dict[str, Any]:
+    results = []
+    ctx = get_context('spawn')
+    for case in cases:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            result = pool.submit(run_case, case).result()
+        name = case_name(case)
+        results.append({'name': name, 'case': case, **result})
+
+        latency = result.get('latency_ms')
+        p99 = f"{latency['p99']:8.3f} ms p99" if latency else ' ' * 15
+        rss = f"{result['peak_rss_mb']:7.1f} MB" if result['peak_rss_mb'] is not None else ''
+        print(f"{name:<50} {result['samples_per_sec']:10.1f} samples/sec {p99} {rss}", flush=True)
+
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+        },
+        'results': results
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Return a description of every case that regressed against the baseline."""
+    previous = {result['name']: result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        base = previous.get(result['name'])
+        if base is None:
+            continue
+
+        ratio = result['samples_per_sec'] / base['samples_per_sec']
+        line = f"{result['name']:<50} {ratio:6.2f}x throughput"
+        regressed = ratio < 1 - threshold
+
+        if result.get('latency_ms') and base.get('latency_ms'):
+            p99_ratio = result['latency_ms']['p99'] / base['latency_ms']['p99']
+            line += f" {p99_ratio:6.2f}x p99"
+            regressed = regressed or p99_ratio > 1 + threshold
+
+        print(f"{line}{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(result['name'])
+    return regressions
+
+
+def parse_list(value: str, item=str) -> List[Any]:
+    return [item(v) for v in value.split(',') if v]
+
+
+def parse_dims(value: str) -> List[Any]:
+    return [tuple(int(d) for d in dims.split('x')) for dims in parse_list(value)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the CAPTCHA generation pipeline stage by stage')
+    parser.add_argument('--sizes', type=lambda v: parse_list(v, int), default=[500], help='Comma-separated sample counts')
+    parser.add_argument('--dims', type=parse_dims, default=[(160, 60)], help='Comma-separated WIDTHxHEIGHT list')
+    parser.add_argument('--workers', type=lambda v: parse_list(v, int), default=[2, 4], help='Comma-separated worker counts for parallel dataset runs')
+    parser.add_argument('--encoding', type=parse_list, default=['png'],
+                        help='Comma-separated encoding formats: ' + ','.join(ENCODING_FORMATS))
+    parser.add_argument('--chunk-sizes', type=lambda v: parse_list(v, int), default=[None],
+                        help='Comma-separated maximum samples per task for dataset runs (default: the built-in chunk size)')
+    parser.add_argument('--stages', type=parse_list, default=list(STAGES) + ['dataset'], help='Comma-separated stages: ' + ','.join(STAGES) + ',dataset')
+    parser.add_argument('--modes', type=parse_list, default=list(DATASET_MODES), help='Comma-separated dataset modes: ' + ','.join(DATASET_MODES))
+    parser.add_argument('--output', type=Path, help='Write results as JSON to this file')
+    parser.add_argument('--input', type=Path, help='Load results from this file instead of running the suite')
+    parser.add_argument('--compare', type=Path, help='Baseline results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Allowed relative slowdown before a case is flagged')
+    args = parser.parse_args()
+
+    for stage in args.stages:
+        if stage not in STAGES + ('dataset',):
+            parser.error(f"Unknown stage: {stage}")
+    for mode in args.modes:
+        if mode not in DATASET_MODES:
+            parser.error(f"Unknown dataset mode: {mode}")
+    for encoding in args.encoding:
+        if encoding not in ENCODING_FORMATS:
+            parser.error(f"Unknown encoding: {encoding}")
+
+    if args.input is not None:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+    else:
+        report = run_suite(build_cases(args))
+
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
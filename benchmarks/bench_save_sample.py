@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Compare the legacy decode/re-encode save path with the direct byte write.
+
+Run from the repository root:
+
+    python benchmarks/bench_save_sample.py --size 100000
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from PIL import Image  # type: ignore  # noqa: E402
+
+from oopscaptcha.generators.factory import CaptchaFactory  # noqa: E402
+from oopscaptcha.generators.types import CaptchaType  # noqa: E402
+
+
+def legacy_save_sample(sample: BytesIO, path: Path) -> Path:
+    # Save path used before direct writes: copy, decode and encode again
+    with BytesIO(sample.getvalue()) as image_data:
+        with Image.open(image_data) as img:
+            img.save(path)
+    return path
+
+
+def run(save, samples, size: int, output_dir: Path) -> float:
+    start = time.perf_counter()
+    for i in range(size):
+        save(samples[i % len(samples)], output_dir / f"{i}.png")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ImageCaptchaGenerator._save_sample')
+    parser.add_argument('--size', type=int, default=100000, help='Number of samples to save')
+    parser.add_argument('--distinct', type=int, default=256, help='Number of distinct pre-rendered samples to cycle through')
+    args = parser.parse_args()
+
+    generator = CaptchaFactory.create(CaptchaType.IMAGE)
+    # Render once up front so only the save path is measured
+    samples = [generator.generate()[0] for _ in range(args.distinct)]
+
+    output_dir = Path(tempfile.mkdtemp())
+    try:
+        timings = {}
+        for name, save in (('legacy', legacy_save_sample), ('direct', generator._save_sample)):
+            run_dir = output_dir / name
+            run_dir.mkdir()
+            timings[name] = run(save, samples, args.size, run_dir)
+            shutil.rmtree(run_dir)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    for name, seconds in timings.items():
+        print(f"{name:>7}: {seconds:8.2f} s total, {seconds / args.size * 1e6:8.1f} us/sample")
+    saved = timings['legacy'] - timings['direct']
+    print(f"  saved: {saved:8.2f} s total, {saved / args.size * 1e6:8.1f} us/sample "
+          f"({timings['legacy'] / timings['direct']:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
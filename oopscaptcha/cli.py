@@ -1,16 +1,31 @@
 #!/usr/bin/env python3
 import argparse
+import json
 import sys
 from pathlib import Path
 from typing import List, Optional
 
-from oopscaptcha.generators.factory import CaptchaFactory
-from oopscaptcha.generators.types import CaptchaType
-from oopscaptcha.config.settings import get_settings
+# Generators, NumPy, Pillow and the settings are imported by the sub-command that
+# needs them, so parsing (--help, usage errors) stays fast
+
+
+def encoding_params(args) -> dict:
+    """Collect the encoding keys given on the command line"""
+    encoding = {}
+    if args.encoding:
+        encoding['format'] = args.encoding
+    if args.compress_level is not None:
+        encoding['compress_level'] = args.compress_level
+    if args.quality is not None:
+        encoding['quality'] = args.quality
+    return encoding
 
 
 def generate_single(args):
     """Generate a single CAPTCHA"""
+    from oopscaptcha.generators.factory import CaptchaFactory
+    from oopscaptcha.generators.types import CaptchaType
+    
     # Collect parameters
     params = {}
     if args.width:
@@ -21,8 +36,13 @@ def generate_single(args):
         params['length'] = args.length
     if args.characters:
         params['characters'] = args.characters
+    if args.backend:
+        params['backend'] = args.backend
     if args.output_dir:
         params['output_dir'] = args.output_dir
+    encoding = encoding_params(args)
+    if encoding:
+        params['encoding'] = encoding
     
     generator = CaptchaFactory.create(CaptchaType(args.type), **params)
     
@@ -33,6 +53,10 @@ def generate_single(args):
 
 def generate_dataset(args):
     """Generate a CAPTCHA dataset"""
+    from oopscaptcha.config.settings import get_settings
+    from oopscaptcha.generators.factory import CaptchaFactory
+    from oopscaptcha.generators.types import CaptchaType
+    
     # Collect parameters
     params = {}
     if args.width:
@@ -43,6 +67,15 @@ def generate_dataset(args):
         params['length'] = args.length
     if args.characters:
         params['characters'] = args.characters
+    if args.backend:
+        params['backend'] = args.backend
+    if args.color_mode:
+        params['color_mode'] = args.color_mode
+    if args.id_scheme:
+        params['id_scheme'] = args.id_scheme
+    encoding = encoding_params(args)
+    if encoding:
+        params['encoding'] = encoding
     
     generator = CaptchaFactory.create(CaptchaType(args.type), **params)
     
@@ -69,23 +102,104 @@ def generate_dataset(args):
     dataset_params['test_ratio'] = test_ratio
     dataset_params['parallel'] = args.parallel
     dataset_params['max_workers'] = args.max_workers if args.max_workers is not None else captcha_config.get('max_workers')
+    dataset_params['executor'] = args.executor if args.executor is not None else captcha_config.get('executor')
+    dataset_params['output_format'] = args.output_format if args.output_format is not None else captcha_config.get('output_format')
+    dataset_params['label_format'] = args.label_format if args.label_format is not None else captcha_config.get('label_format')
+    dataset_params['shard_size'] = args.shard_size if args.shard_size is not None else captcha_config.get('shard_size')
+    dataset_params['resume'] = args.resume if args.resume is not None else captcha_config.get('resume')
     dataset_params['seed'] = args.seed if args.seed is not None else captcha_config.get('seed')
     dataset_params['output_dir'] = args.output_dir if args.output_dir is not None else captcha_config.get('dataset_output_dir')
+    dataset_params['record_timings'] = args.timings if args.timings is not None else captcha_config.get('record_timings')
+    dataset_params['stream'] = args.stream if args.stream is not None else captcha_config.get('stream')
+    dataset_params['max_in_flight'] = args.max_in_flight if args.max_in_flight is not None else captcha_config.get('max_in_flight')
+    dataset_params['chunk_size'] = args.chunk_size if args.chunk_size is not None else captcha_config.get('chunk_size')
+    dataset_params['write_workers'] = args.write_workers if args.write_workers is not None else captcha_config.get('write_workers')
+    dataset_params['shard_index'] = args.shard_index if args.shard_index is not None else captcha_config.get('shard_index')
+    dataset_params['num_shards'] = args.num_shards if args.num_shards is not None else captcha_config.get('num_shards')
+    dataset_params['unique_labels'] = args.unique_labels if args.unique_labels is not None else captcha_config.get('unique_labels')
+    if args.progress:
+        from oopscaptcha.utils.instrumentation import ProgressPrinter
+        dataset_params['events'] = ProgressPrinter()
     
     # Generate dataset
     result = generator.generate_dataset(**dataset_params)
     
     # Output statistics
     print(f"Dataset generated successfully! Saved to {dataset_params['output_dir']}")
-    for split, samples in result.items():
-        print(f"{split}: {len(samples)} samples")
+    split_sizes = result['split_sizes'] if dataset_params['stream'] else {split: len(samples) for split, samples in result.items()}
+    for split, count in split_sizes.items():
+        print(f"{split}: {count} samples")
 
 
-def main(argv: Optional[List[str]] = None):
-    """Entry point function"""
-    # Get default values from config
+def merge_dataset(args):
+    """Merge the shards of a sharded dataset run into one dataset"""
+    from oopscaptcha.datasets.merge import merge_shards
+    
+    metadata_path = merge_shards(args.shards, args.output_dir, move=args.move)
+    with open(metadata_path, 'r') as f:
+        split_sizes = json.load(f)['split_sizes']
+    
+    # Output statistics
+    print(f"Merged {len(args.shards)} shards into {args.output_dir}")
+    for split, count in split_sizes.items():
+        print(f"{split}: {count} samples")
+
+
+def serve(args):
+    """Serve CAPTCHAs over HTTP from a pre-rendered pool"""
+    import asyncio
+    from oopscaptcha.config.settings import get_settings
+    from oopscaptcha.generators.factory import CaptchaFactory
+    from oopscaptcha.generators.types import CaptchaType
+    from oopscaptcha.service import CaptchaPool, CaptchaServer
+    
+    # Collect parameters
+    params = {}
+    if args.width:
+        params['width'] = args.width
+    if args.height:
+        params['height'] = args.height
+    if args.length:
+        params['length'] = args.length
+    if args.characters:
+        params['characters'] = args.characters
+    if args.backend:
+        params['backend'] = args.backend
+    encoding = encoding_params(args)
+    if encoding:
+        params['encoding'] = encoding
+    
+    generator = CaptchaFactory.create(CaptchaType(args.type), **params)
+    
+    # Use args values or fall back to config values
     settings = get_settings()
+    captcha_config = settings.get_captcha_config(args.type)
+    pool_size = args.pool_size if args.pool_size is not None else captcha_config.get('pool_size')
+    low_watermark = args.low_watermark if args.low_watermark is not None else captcha_config.get('pool_low_watermark')
+    refill_workers = args.refill_workers if args.refill_workers is not None else captcha_config.get('refill_workers')
+    host = args.host if args.host is not None else captcha_config.get('host')
+    port = args.port if args.port is not None else captcha_config.get('port')
+    
+    pool = CaptchaPool(generator, high_watermark=pool_size, low_watermark=low_watermark,
+                       refill_workers=refill_workers)
+    server = CaptchaServer({args.type: pool}, host=host, port=port)
     
+    async def run():
+        await server.start()
+        print(f"Serving {args.type} CAPTCHAs on http://{server.host}:{server.port}/captcha/{args.type}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+    
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: Optional[List[str]] = None):
+    """Entry point function"""
     parser = argparse.ArgumentParser(
         description='Oops-Captcha - A flexible and extensible CAPTCHA generation library',
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
@@ -110,6 +224,10 @@ def main(argv: Optional[List[str]] = None):
         parser.add_argument('--height', type=int, help='CAPTCHA height')
         parser.add_argument('--length', type=int, help='Number of characters')
         parser.add_argument('--characters', help='Character set for CAPTCHA')
+        parser.add_argument('--backend', choices=['captcha', 'numpy'], help='Image renderer: captcha library or vectorized NumPy')
+        parser.add_argument('--encoding', choices=['png', 'webp', 'jpeg', 'raw'], help='Sample file format (raw is uncompressed .ppm)')
+        parser.add_argument('--compress-level', type=int, help='PNG zlib level (0-9) or WebP method (0-6)')
+        parser.add_argument('--quality', type=int, help='WebP/JPEG quality (1-100)')
         parser.add_argument('--output-dir', type=str, help='Output directory')
     
     add_single_args(single_parser)
@@ -132,9 +250,63 @@ def main(argv: Optional[List[str]] = None):
     dataset_parser.add_argument('--test-ratio', type=float, help='Test set ratio')
     dataset_parser.add_argument('--parallel', action='store_true', help='Enable parallel generation')
     dataset_parser.add_argument('--max-workers', type=int, help='Maximum number of workers')
+    dataset_parser.add_argument('--executor', choices=['thread', 'process'], help='Parallel backend (process avoids the GIL)')
     dataset_parser.add_argument('--seed', type=int, help='Random seed')
+    dataset_parser.add_argument('--output-format', choices=['files', 'tar', 'npy'], help='Write loose files, tar shards or .npy arrays')
+    dataset_parser.add_argument('--label-format', choices=['files', 'jsonl', 'csv', 'npy'],
+                                help='Store labels as one file each or as a single manifest per split')
+    dataset_parser.add_argument('--id-scheme', choices=['random', 'counter', 'sortable'],
+                                help='Sample naming: seeded random hex, <split>-<worker>-<index> or time-ordered random')
+    dataset_parser.add_argument('--color-mode', choices=['L', 'RGB'], help='Pixel format of .npy arrays')
+    dataset_parser.add_argument('--resume', action='store_true', default=None,
+                                help='Use --output-dir as the dataset directory and skip samples already generated there')
+    dataset_parser.add_argument('--shard-size', type=int, help='Samples per tar shard')
+    dataset_parser.add_argument('--stream', action='store_true', default=None,
+                                help='Keep memory constant by not collecting per-sample paths (for very large runs)')
+    dataset_parser.add_argument('--max-in-flight', type=int, help='Maximum tasks submitted to the worker pool at once')
+    dataset_parser.add_argument('--chunk-size', type=int, help='Maximum samples per worker task (tasks shrink towards the end of the run)')
+    dataset_parser.add_argument('--write-workers', type=int,
+                                help='Write files on this many dedicated I/O threads while workers keep rendering')
+    dataset_parser.add_argument('--shard-index', type=int, help='Shard of every split generated by this node (0-based)')
+    dataset_parser.add_argument('--num-shards', type=int, help='Number of nodes the dataset is split across (requires --seed)')
+    dataset_parser.add_argument('--unique-labels', action='store_true', default=None,
+                                help='Never repeat a label within or across splits (no train/test leakage)')
+    dataset_parser.add_argument('--progress', action='store_true', help='Show live progress, throughput and ETA')
+    dataset_parser.add_argument('--timings', action='store_true', default=None,
+                                help='Write a per-stage and per-worker timing summary to metadata.json')
     dataset_parser.set_defaults(func=generate_dataset)
     
+    # Shard merge sub-command
+    merge_parser = subparsers.add_parser(
+        'merge',
+        help='Merge the shards of a sharded dataset into one dataset'
+    )
+    merge_parser.add_argument('shards', nargs='+', help='Shard directories (shard-NNNNN-of-NNNNN) of one run')
+    merge_parser.add_argument('--output-dir', required=True, help='Merged dataset directory (same filesystem as the shards)')
+    merge_parser.add_argument('--move', action='store_true', help='Move files out of the shards instead of hard-linking them')
+    merge_parser.set_defaults(func=merge_dataset)
+    
+    # CAPTCHA service sub-command
+    serve_parser = subparsers.add_parser(
+        'serve',
+        help='Serve CAPTCHAs over HTTP from a pre-rendered pool'
+    )
+    serve_parser.add_argument('--type', required=True, choices=['image'], help='CAPTCHA type (required)')
+    serve_parser.add_argument('--width', type=int, help='CAPTCHA width')
+    serve_parser.add_argument('--height', type=int, help='CAPTCHA height')
+    serve_parser.add_argument('--length', type=int, help='Number of characters')
+    serve_parser.add_argument('--characters', help='Character set for CAPTCHA')
+    serve_parser.add_argument('--backend', choices=['captcha', 'numpy'], help='Image renderer: captcha library or vectorized NumPy')
+    serve_parser.add_argument('--encoding', choices=['png', 'webp', 'jpeg', 'raw'], help='Image format served (raw is uncompressed .ppm)')
+    serve_parser.add_argument('--compress-level', type=int, help='PNG zlib level (0-9) or WebP method (0-6)')
+    serve_parser.add_argument('--quality', type=int, help='WebP/JPEG quality (1-100)')
+    serve_parser.add_argument('--host', help='Address to bind')
+    serve_parser.add_argument('--port', type=int, help='Port to bind')
+    serve_parser.add_argument('--pool-size', type=int, help='Pre-rendered CAPTCHAs to keep ready (high watermark)')
+    serve_parser.add_argument('--low-watermark', type=int, help='Pool depth that triggers a refill')
+    serve_parser.add_argument('--refill-workers', type=int, help='Background threads rendering into the pool')
+    serve_parser.set_defaults(func=serve)
+    
     # Parse command line arguments
     args = parser.parse_args(argv)
     
@@ -0,0 +1,8 @@
+from .writers import TarShardWriter, NpyArrayWriter, LabelManifestWriter, load_label_manifest
+from .progress import ProgressManifest
+from .merge import merge_shards
+from .reader import DatasetReader
+from .online import OnlineProducer
+
+__all__ = ['TarShardWriter', 'NpyArrayWriter', 'LabelManifestWriter', 'load_label_manifest', 'ProgressManifest',
+           'merge_shards', 'DatasetReader', 'OnlineProducer']
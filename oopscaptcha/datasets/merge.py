@@ -0,0 +1,158 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Union
+
+from .writers import LabelManifestWriter, load_label_manifest
+
+SPLITS = ('train', 'val', 'test')
+# Keys That Must Agree Between The Shards Of One Dataset
+SHARED_KEYS = ('captcha_type', 'captcha_params', 'output_format', 'label_format')
+
+
+def merge_shards(shard_dirs: Sequence[Union[str, Path]], output_dir: Union[str, Path],
+                 move: bool = False) -> Path:
+    """Combine the shards of a sharded ``generate_dataset`` run into one dataset.
+
+    Every shard of the run must be given, each a directory holding a complete
+    ``metadata.json``. Sample files, tar shards and arrays are hard-linked into
+    ``output_dir`` (or renamed with ``move=True``), so image data is never
+    copied and ``output_dir`` must be on the same filesystem as the shards.
+    Label manifests are rewritten as one manifest per split. Returns the path
+    of the merged ``metadata.json``.
+    """
+    shards = [(Path(shard_dir), _load_metadata(Path(shard_dir))) for shard_dir in shard_dirs]
+    if not shards:
+        raise ValueError("No shards to merge")
+    shards.sort(key=lambda shard: shard[1]['shard']['index'])
+    _check_shards(shards)
+
+    output_dir = Path(output_dir)
+    if (output_dir / 'metadata.json').exists():
+        raise ValueError(f"Cannot merge into {output_dir}: it already holds a dataset")
+    place: Callable[[Path, Path], None] = os.replace if move else os.link
+
+    first = shards[0][1]
+    output_format = first['output_format']
+    metadata: Dict[str, Any] = {
+        "timestamp": datetime.now().isoformat(),
+        "captcha_type": first['captcha_type'],
+        "captcha_params": first['captcha_params'],
+        "dataset_config": first['dataset_config'],
+        "split_sizes": {split: sum(meta['split_sizes'].get(split, 0) for _, meta in shards) for split in SPLITS},
+        "output_format": output_format,
+        "merged_from": [str(shard_dir) for shard_dir, _ in shards]
+    }
+
+    for split in SPLITS:
+        split_dir = output_dir / split
+        split_dir.mkdir(parents=True, exist_ok=True)
+        if output_format == 'tar':
+            metadata.setdefault("shard_size", first.get('shard_size'))
+            metadata.setdefault("shards", {})[split] = _merge_tar(shards, split, split_dir, place)
+        elif output_format == 'npy':
+            metadata.setdefault("arrays", {})[split] = _merge_npy(shards, split, split_dir, place)
+        else:
+            for shard_dir, _ in shards:
+                _place_tree(shard_dir / split / 'samples', split_dir / 'samples', place)
+            if 'label_format' in first:
+                metadata["label_format"] = first['label_format']
+                metadata.setdefault("label_manifests", {})[split] = _merge_manifest(shards, split, split_dir)
+            else:
+                for shard_dir, _ in shards:
+                    _place_tree(shard_dir / split / 'labels', split_dir / 'labels', place)
+
+    metadata_path = output_dir / 'metadata.json'
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    return metadata_path
+
+
+def _load_metadata(shard_dir: Path) -> Dict[str, Any]:
+    metadata_path = shard_dir / 'metadata.json'
+    if not metadata_path.exists():
+        raise ValueError(f"Shard {shard_dir} is incomplete, it has no metadata.json")
+    with open(metadata_path, 'r') as f:
+        metadata = json.load(f)
+    if 'shard' not in metadata:
+        raise ValueError(f"{shard_dir} is not a shard of a sharded dataset")
+    return metadata
+
+
+def _check_shards(shards: List[Any]) -> None:
+    first_dir, first = shards[0]
+    num_shards = first['shard']['count']
+    indices = [meta['shard']['index'] for _, meta in shards]
+    if indices != list(range(num_shards)):
+        raise ValueError(f"Expected shards 0..{num_shards - 1}, got {indices}")
+
+    for shard_dir, meta in shards[1:]:
+        for key in SHARED_KEYS:
+            if meta.get(key) != first.get(key):
+                raise ValueError(f"Shard {shard_dir} does not match {first_dir}: '{key}' differs")
+        if meta['shard']['count'] != num_shards or meta['dataset_config']['entropy'] != first['dataset_config']['entropy']:
+            raise ValueError(f"Shard {shard_dir} does not belong to the same run as {first_dir}")
+
+
+def _place_tree(source: Path, target: Path, place: Callable[[Path, Path], None]) -> None:
+    if not source.is_dir():
+        return
+    target.mkdir(parents=True, exist_ok=True)
+    with os.scandir(source) as entries:
+        for entry in entries:
+            destination = target / entry.name
+            if destination.exists():
+                raise ValueError(f"Duplicate sample {entry.name} in {source}")
+            place(Path(entry.path), destination)
+
+
+def _merge_tar(shards: List[Any], split: str, split_dir: Path,
+               place: Callable[[Path, Path], None]) -> List[Dict[str, Any]]:
+    # Archives keep their content (index offsets stay valid) and are renumbered across shards
+    layout = []
+    for shard_dir, meta in shards:
+        for shard in meta.get('shards', {}).get(split, []):
+            name = f"{split}-{len(layout):06d}"
+            place(shard_dir / shard['path'], split_dir / f"{name}.tar")
+            place(shard_dir / shard['index'], split_dir / f"{name}.idx")
+            layout.append({'path': f"{split}/{name}.tar", 'index': f"{split}/{name}.idx", 'count': shard['count']})
+    return layout
+
+
+def _merge_npy(shards: List[Any], split: str, split_dir: Path,
+               place: Callable[[Path, Path], None]) -> Dict[str, Any]:
+    # Concatenating would copy every image, so each shard's arrays stay a separate part
+    parts = []
+    spec: Dict[str, Any] = {}
+    for shard_dir, meta in shards:
+        layout = meta.get('arrays', {}).get(split)
+        if layout is None:
+            continue
+        number = meta['shard']['index']
+        images, labels = f"images-{number:05d}.npy", f"labels-{number:05d}.npy"
+        place(shard_dir / layout['images'], split_dir / images)
+        place(shard_dir / layout['labels'], split_dir / labels)
+        parts.append({'images': f"{split}/{images}", 'labels': f"{split}/{labels}", 'count': layout['count']})
+        spec = {key: layout[key] for key in ('image_shape', 'label_shape', 'dtype', 'label_dtype')}
+
+    count = sum(part['count'] for part in parts)
+    if spec:
+        spec['image_shape'] = [count] + spec['image_shape'][1:]
+        spec['label_shape'] = [count] + spec['label_shape'][1:]
+    return {'parts': parts, 'count': count, **spec}
+
+
+def _merge_manifest(shards: List[Any], split: str, split_dir: Path) -> Dict[str, Any]:
+    # Labels are small, the per-shard manifests are rewritten as one in index order
+    first = shards[0][1]
+    label_format = first['label_format']
+    with LabelManifestWriter(split_dir, label_format, first['dataset_config']['entropy']) as writer:
+        for shard_dir, meta in shards:
+            layout = meta.get('label_manifests', {}).get(split)
+            if layout is None:
+                continue
+            columns = load_label_manifest(shard_dir / layout['manifest'])
+            writer.write(list(zip(columns['index'].tolist(), columns['sample'].tolist(),
+                                  columns['label'].tolist())))
+    return {**writer.layout, 'manifest': f"{split}/{writer.path.name}"}
@@ -0,0 +1,241 @@
+from __future__ import annotations
+import queue
+import time
+import traceback
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from ..utils.lazy import LazyModule
+from ..utils.seeding import new_entropy, sample_rng
+
+if TYPE_CHECKING:
+    from multiprocessing.shared_memory import SharedMemory
+    from ..generators.base import CaptchaGenerator
+
+# The datasets package is imported with every generator, keep multiprocessing off that path
+multiprocessing = LazyModule('multiprocessing')
+shared_memory = LazyModule('multiprocessing.shared_memory')
+np = LazyModule('numpy')
+
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_PRODUCER_WORKERS = 2
+POLL_INTERVAL = 0.1
+STOP_TIMEOUT = 5.0
+
+
+class OnlineProducer:
+    """Render batches on worker processes into a shared-memory ring buffer.
+
+    The ring holds ``slots`` batches of ``batch_size`` images and encoded
+    labels (the arrays ``generate_batch`` returns) in two
+    ``multiprocessing.shared_memory`` blocks. Each of the ``num_workers``
+    processes builds its own generator, waits for a free slot, claims the
+    next batch number and renders straight into the slot. Iterating the
+    producer yields ``(images, labels)`` as zero-copy views of completed
+    slots. A view stays valid until the next batch is requested, then its
+    slot is handed back to the workers. Workers block while every slot is full or held,
+    which is the backpressure that keeps them from running ahead of the
+    consumer.
+
+    Batch ``b`` holds samples ``b * batch_size`` onwards. Sample ``i`` is
+    rendered from ``sample_rng(seed, 'train', i)``, so a seeded producer
+    streams exactly the train split of a dataset generated with that seed.
+    Batches arrive in completion order. With ``ordered=True`` they are
+    yielded by batch number instead, holding early arrivals in their slots.
+    With ``batches`` the stream ends after that many batches, otherwise it
+    runs until ``stop()``.
+
+    A worker that fails reports its traceback and the consumer raises it
+    as a ``RuntimeError``. ``stop()`` (or leaving the ``with`` block)
+    signals the workers, waits up to ``STOP_TIMEOUT`` seconds for them to
+    finish their current batch, terminates any that do not, and frees the
+    shared memory.
+    """
+
+    def __init__(self, generator: CaptchaGenerator, batch_size: int = DEFAULT_BATCH_SIZE,
+                 num_workers: int = DEFAULT_PRODUCER_WORKERS, slots: Optional[int] = None,
+                 seed: Optional[int] = None, batches: Optional[int] = None, ordered: bool = False,
+                 start_method: Optional[str] = None):
+        slots = 2 * num_workers if slots is None else slots
+        if batch_size <= 0:
+            raise ValueError(f"Invalid batch_size: {batch_size}")
+        if num_workers <= 0:
+            raise ValueError(f"Invalid num_workers: {num_workers}")
+        if slots < 2:
+            raise ValueError(f"Invalid slots: {slots}, the consumer holds one slot, so at least 2 are needed")
+        if batches is not None and batches < 0:
+            raise ValueError(f"Invalid batches: {batches}")
+
+        self.generator = generator
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+        self.slots = slots
+        self.seed = new_entropy() if seed is None else seed
+        self.batches = batches
+        self.ordered = ordered
+        self._context = multiprocessing.get_context(start_method)
+
+        self._workers: List[Any] = []
+        self._memory: List[SharedMemory] = []
+        self._images: Any = None
+        self._labels: Any = None
+        self._held: Optional[int] = None
+        self._early: Dict[int, int] = {}
+
+        # Counters
+        self.delivered = 0
+        self.wait_seconds = 0.0
+
+    def start(self) -> None:
+        """Allocate the ring buffer and start the worker processes."""
+        if self._workers:
+            return
+
+        # One probe sample fixes the shapes and dtypes of the slots
+        probe_images, probe_labels = self.generator.generate_batch(1)
+        image_spec = ((self.slots, self.batch_size) + probe_images.shape[1:], probe_images.dtype)
+        label_spec = ((self.slots, self.batch_size) + probe_labels.shape[1:], probe_labels.dtype)
+        self._memory = [shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+                        for shape, dtype in (image_spec, label_spec)]
+        self._images = np.ndarray(image_spec[0], dtype=image_spec[1], buffer=self._memory[0].buf)
+        self._labels = np.ndarray(label_spec[0], dtype=label_spec[1], buffer=self._memory[1].buf)
+
+        self._free = self._context.Queue()
+        self._ready = self._context.Queue()
+        self._stop = self._context.Event()
+        self._next_batch = self._context.Value('q', 0)
+        for slot in range(self.slots):
+            self._free.put(slot)
+
+        self._workers = [
+            self._context.Process(
+                target=_produce_batches,
+                args=(type(self.generator), self.generator.config, self._memory, image_spec, label_spec,
+                      self._free, self._ready, self._stop, self._next_batch, self.seed, self.batches),
+                name=f"oopscaptcha-producer-{worker}",
+                daemon=True
+            )
+            for worker in range(self.num_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def stop(self) -> None:
+        """Stop the workers and free the ring buffer."""
+        if not self._workers:
+            return
+        self._stop.set()
+        deadline = time.monotonic() + STOP_TIMEOUT
+        for worker in self._workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        self._workers = []
+
+        self._images = self._labels = None
+        for memory in self._memory:
+            try:
+                memory.close()
+            except BufferError:
+                # The consumer still holds a view, the mapping goes away with it
+                pass
+            memory.unlink()
+        self._memory = []
+        self._held = None
+        self._early = {}
+
+    def __iter__(self) -> 'OnlineProducer':
+        return self
+
+    def __next__(self) -> Tuple[Any, Any]:
+        if not self._workers:
+            raise RuntimeError("OnlineProducer is not started")
+        if self._held is not None:
+            self._free.put(self._held)
+            self._held = None
+        if self.batches is not None and self.delivered >= self.batches:
+            raise StopIteration
+
+        start = time.perf_counter()
+        slot = self._next_slot()
+        self.wait_seconds += time.perf_counter() - start
+        self._held = slot
+        self.delivered += 1
+        return self._images[slot], self._labels[slot]
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'batch_size': self.batch_size,
+            'num_workers': self.num_workers,
+            'slots': self.slots,
+            'delivered': self.delivered,
+            'samples': self.delivered * self.batch_size,
+            'wait_seconds': self.wait_seconds
+        }
+
+    def __enter__(self) -> 'OnlineProducer':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _next_slot(self) -> int:
+        # With ordered, early batches wait in their slots until their turn
+        while True:
+            if self.ordered and self.delivered in self._early:
+                return self._early.pop(self.delivered)
+            try:
+                slot, number, error = self._ready.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            if error is not None:
+                raise RuntimeError(f"Producer worker failed:\n{error}")
+            if not self.ordered or number == self.delivered:
+                return slot
+            self._early[number] = slot
+
+    def _check_workers(self) -> None:
+        for worker in self._workers:
+            if worker.exitcode not in (None, 0):
+                raise RuntimeError(f"Producer worker {worker.name} exited with code {worker.exitcode}")
+
+
+def _produce_batches(generator_cls: type, config: Any, memory: List[SharedMemory],
+                     image_spec: Tuple[Tuple[int, ...], Any], label_spec: Tuple[Tuple[int, ...], Any],
+                     free: Any, ready: Any, stop: Any, next_batch: Any, seed: int,
+                     batches: Optional[int]) -> None:
+    # Worker process: take a free slot, claim the next batch number and render into the slot.
+    # The slot comes first, so every claimed batch can finish even while early batches fill the ring
+    images = labels = None
+    try:
+        generator = generator_cls(config)
+        generator.warmup()
+        images = np.ndarray(image_spec[0], dtype=image_spec[1], buffer=memory[0].buf)
+        labels = np.ndarray(label_spec[0], dtype=label_spec[1], buffer=memory[1].buf)
+        batch_size = image_spec[0][1]
+
+        while not stop.is_set():
+            try:
+                slot = free.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            with next_batch.get_lock():
+                number = next_batch.value
+                next_batch.value += 1
+            if batches is not None and number >= batches:
+                free.put(slot)
+                break
+
+            rngs = [sample_rng(seed, 'train', index) for index in range(number * batch_size, (number + 1) * batch_size)]
+            _, encoded = generator.generate_batch([generator.generate_label(rng) for rng in rngs],
+                                                  rngs=rngs, out=images[slot])
+            labels[slot] = encoded
+            ready.put((slot, number, None))
+    except BaseException:
+        ready.put((None, None, traceback.format_exc()))
+    finally:
+        images = labels = None
+        for block in memory:
+            block.close()
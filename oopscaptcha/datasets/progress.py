@@ -0,0 +1,58 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO, Tuple, Union
+
+PROGRESS_MANIFEST_FILE = 'progress.jsonl'
+
+
+class ProgressManifest:
+    """Append-only record of the completed samples of one split.
+    
+    Each line is a JSON object with the sample ``index`` and the ``sample`` and
+    ``label`` paths relative to the split directory. Lines are flushed as soon
+    as a batch completes, so an interrupted run loses at most the batches that
+    were still in flight.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file: Optional[TextIO] = None
+    
+    def load(self) -> Dict[int, Tuple[str, str]]:
+        """Return ``{index: (sample, label)}`` for every recorded sample."""
+        completed: Dict[int, Tuple[str, str]] = {}
+        if not self.path.exists():
+            return completed
+        
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash, that sample is simply redone
+                    continue
+                completed[record['index']] = (record['sample'], record['label'])
+        return completed
+    
+    def append(self, records: List[Tuple[int, str, str]]) -> None:
+        """Record completed ``(index, sample, label)`` entries and flush them."""
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        
+        self._file.write(''.join(
+            json.dumps({'index': index, 'sample': sample, 'label': label}) + '\n'
+            for index, sample, label in records
+        ))
+        self._file.flush()
+    
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def __enter__(self) -> 'ProgressManifest':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,207 @@
+from __future__ import annotations
+import copy
+import io
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
+from ..utils.lazy import LazyModule
+from .progress import ProgressManifest, PROGRESS_MANIFEST_FILE
+from .writers import load_label_manifest
+
+np = LazyModule('numpy')
+
+INDEX_NAME = 'index.npy'
+LABEL_EXTENSION = 'txt'
+
+
+class DatasetReader:
+    """Random access to one split of a dataset written by ``generate_dataset``.
+
+    ``reader[i]`` returns ``(sample, label)``: the encoded sample bytes, or with
+    ``decode=True`` the image as a NumPy array (``npy`` rows are always arrays).
+    ``rebuild_index=True`` rebuilds the split's ``index.npy`` even if current.
+    ``shard(index, count)`` returns a reader over every ``count``-th sample from
+    ``index`` sharing the index, safe to create before data loader workers fork.
+    """
+
+    def __init__(self, dataset_dir: Union[str, Path], split: str = 'train', decode: bool = False,
+                 rebuild_index: bool = False):
+        self.dataset_dir = Path(dataset_dir)
+        metadata_path = self.dataset_dir / 'metadata.json'
+        if not metadata_path.exists():
+            raise ValueError(f"{self.dataset_dir} is not a complete dataset, it has no metadata.json")
+        with open(metadata_path, 'r') as f:
+            self.metadata: Dict[str, Any] = json.load(f)
+        if split not in self.metadata['split_sizes']:
+            raise ValueError(f"Invalid split: {split}, expected one of {tuple(self.metadata['split_sizes'])}")
+
+        self.split = split
+        self.decode = decode
+        self.output_format = self.metadata.get('output_format', 'files')
+        self.split_dir = self.dataset_dir / split
+        self._files: Dict[int, int] = {}
+        self._pid = os.getpid()
+
+        if self.output_format == 'npy':
+            self._open_arrays()
+            count = int(self._starts[-1])
+        else:
+            self._index = self._load_index(metadata_path, rebuild_index)
+            count = len(self._index)
+        self._rows = range(count)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, i: int) -> Tuple[Any, str]:
+        row = self._rows[i]
+        if self.output_format == 'npy':
+            part = int(np.searchsorted(self._starts, row, side='right')) - 1
+            offset = row - int(self._starts[part])
+            images, labels = self._arrays[part]
+            return images[offset], ''.join(self._characters[int(code)] for code in labels[offset])
+
+        entry = self._index[row]
+        if self.output_format == 'tar':
+            data = os.pread(self._shard_file(int(entry['shard'])), int(entry['size']), int(entry['offset']))
+        else:
+            with open(self.split_dir / entry['sample'].decode('utf-8'), 'rb') as f:
+                data = f.read()
+        return (self._decode(data) if self.decode else data), str(entry['label'])
+
+    def __iter__(self) -> Iterator[Tuple[Any, str]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def shard(self, index: int, count: int) -> 'DatasetReader':
+        """Return the reader for worker ``index`` of ``count``, sharing this reader's index."""
+        if count <= 0 or not 0 <= index < count:
+            raise ValueError(f"Invalid shard: {index} of {count}")
+        reader = copy.copy(self)
+        reader._rows = self._rows[index::count]
+        return reader
+
+    def close(self) -> None:
+        """Close the tar shards opened by this process."""
+        if self._pid == os.getpid():
+            for fd in self._files.values():
+                os.close(fd)
+        self._files.clear()
+
+    def __enter__(self) -> 'DatasetReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _decode(self, data: bytes) -> np.ndarray:
+        # Pillow is only needed when images are decoded
+        from PIL import Image
+        with Image.open(io.BytesIO(data)) as image:
+            return np.asarray(image)
+
+    def _shard_file(self, shard: int) -> int:
+        # Descriptors inherited through fork share their offset, pread never uses it but reopen anyway
+        if self._pid != os.getpid():
+            self._files = {}
+            self._pid = os.getpid()
+        fd = self._files.get(shard)
+        if fd is None:
+            fd = self._files[shard] = os.open(self.dataset_dir / self._shards[shard]['path'], os.O_RDONLY)
+        return fd
+
+    def _open_arrays(self) -> None:
+        # Splits without samples have no arrays, merged datasets keep one part per shard
+        layout = self.metadata['arrays'].get(self.split, {})
+        parts = layout.get('parts', [layout]) if layout.get('count') else []
+        self._arrays = [(np.load(self.dataset_dir / part['images'], mmap_mode='r'),
+                         np.load(self.dataset_dir / part['labels'], mmap_mode='r')) for part in parts]
+        self._starts = np.cumsum([0] + [part['count'] for part in parts])
+        self._characters = self.metadata['captcha_params']['characters']
+
+    def _load_index(self, metadata_path: Path, rebuild: bool) -> np.ndarray:
+        if self.output_format == 'tar':
+            self._shards: List[Dict[str, Any]] = self.metadata['shards'].get(self.split, [])
+        index_path = self.split_dir / INDEX_NAME
+        if (not rebuild and index_path.exists()
+                and index_path.stat().st_mtime >= metadata_path.stat().st_mtime):
+            return np.load(index_path, mmap_mode='r')
+
+        index = self._build_tar_index() if self.output_format == 'tar' else self._build_files_index()
+        try:
+            self.split_dir.mkdir(parents=True, exist_ok=True)
+            # Written under a temporary name, concurrent readers never see a partial index
+            fd, temp_path = tempfile.mkstemp(prefix='.index-', suffix='.npy', dir=self.split_dir)
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, index)
+            os.replace(temp_path, index_path)
+        except OSError:
+            return index
+        return np.load(index_path, mmap_mode='r')
+
+    def _build_files_index(self) -> np.ndarray:
+        manifest = self.metadata.get('label_manifests', {}).get(self.split)
+        if manifest is not None:
+            columns = load_label_manifest(self.dataset_dir / manifest['manifest'])
+            order = np.argsort(columns['index'], kind='stable')
+            samples, labels = columns['sample'][order].tolist(), columns['label'][order].tolist()
+        else:
+            progress = ProgressManifest(self.split_dir / PROGRESS_MANIFEST_FILE).load()
+            if progress:
+                # Resumable runs record every completed sample, files they did not record are not part of the split
+                pairs = [progress[index] for index in sorted(progress)]
+            else:
+                # One directory scan, a sample whose label was never written is not part of the split
+                names: List[str] = []
+                if (self.split_dir / 'samples').is_dir():
+                    with os.scandir(self.split_dir / 'samples') as entries:
+                        names = sorted(entry.name for entry in entries if entry.is_file())
+                pairs = [(f"samples/{name}", f"labels/{name.rsplit('.', 1)[0]}.{LABEL_EXTENSION}") for name in names]
+            
+            # One small read per label, only done when the index is built
+            samples, labels = [], []
+            for sample, label in pairs:
+                try:
+                    with open(self.split_dir / label, 'r') as f:
+                        labels.append(f.read())
+                except FileNotFoundError:
+                    continue
+                samples.append(sample)
+
+        return _structured({
+            'sample': np.array([sample.encode('utf-8') for sample in samples], dtype=np.bytes_),
+            'label': np.array(labels, dtype=np.str_)
+        }, len(samples))
+
+    def _build_tar_index(self) -> np.ndarray:
+        shards, offsets, sizes, labels = [], [], [], []
+        for number, shard in enumerate(self._shards):
+            with open(self.dataset_dir / shard['index'], 'r') as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+            with open(self.dataset_dir / shard['path'], 'rb') as f:
+                for entry in entries:
+                    extension = next(key for key in entry if key not in ('key', LABEL_EXTENSION))
+                    label_offset, label_size = entry[LABEL_EXTENSION]
+                    f.seek(label_offset)
+                    labels.append(f.read(label_size).decode('utf-8'))
+                    shards.append(number)
+                    offsets.append(entry[extension][0])
+                    sizes.append(entry[extension][1])
+
+        return _structured({
+            'shard': np.array(shards, dtype=np.int32),
+            'offset': np.array(offsets, dtype=np.int64),
+            'size': np.array(sizes, dtype=np.int64),
+            'label': np.array(labels, dtype=np.str_)
+        }, len(labels))
+
+
+def _structured(columns: Dict[str, np.ndarray], count: int) -> np.ndarray:
+    # Pack equal-length columns into one fixed-width record array
+    table = np.empty(count, dtype=[(name, column.dtype) for name, column in columns.items()])
+    for name, column in columns.items():
+        table[name] = column
+    return table
@@ -0,0 +1,295 @@
+from __future__ import annotations
+import csv
+import io
+import itertools
+import json
+import tarfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, TextIO, Tuple, Union
+
+from ..utils.lazy import LazyModule
+
+np = LazyModule('numpy')
+
+DEFAULT_SHARD_SIZE = 10000
+DEFAULT_BUFFER_SIZE = 4 * 1024 * 1024
+LABEL_FORMATS = ('files', 'jsonl', 'csv', 'npy')
+MANIFEST_FIELDS = ('index', 'sample', 'label', 'seed')
+
+
+class TarShardWriter:
+    """Stream samples into fixed-size, WebDataset-style tar shards.
+
+    Shards are named ``<prefix>-<shard number>.tar`` and each is accompanied by a
+    ``.idx`` file holding one JSON line per sample with its key and the byte
+    offset and size of every member, so readers can seek without scanning.
+    """
+
+    def __init__(self, output_dir: Union[str, Path], prefix: str,
+                 shard_size: int = DEFAULT_SHARD_SIZE,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE):
+        if shard_size <= 0:
+            raise ValueError(f"Invalid shard_size: {shard_size}")
+        
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.shard_size = shard_size
+        self.buffer_size = buffer_size
+        self.shards: List[Dict[str, Any]] = []
+        self._mtime = int(time.time())
+        self._file: Optional[io.BufferedWriter] = None
+        self._tar: Optional[tarfile.TarFile] = None
+        self._index: List[str] = []
+    
+    @property
+    def shard_path(self) -> Path:
+        return self.output_dir / f"{self.prefix}-{len(self.shards):06d}.tar"
+    
+    def write(self, key: str, members: Dict[str, bytes]) -> Path:
+        """Append one sample, given as ``{extension: data}``, and return its shard path."""
+        if self._tar is None:
+            self._open_shard()
+        assert self._tar is not None
+        
+        entry: Dict[str, Any] = {'key': key}
+        for extension, data in members.items():
+            info = tarfile.TarInfo(f"{key}.{extension}")
+            info.size = len(data)
+            info.mtime = self._mtime
+            self._tar.addfile(info, io.BytesIO(data))
+            
+            # Data ends the member, followed by padding up to the next block
+            padded_size = -(-info.size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+            entry[extension] = [self._tar.offset - padded_size, info.size]
+        self._index.append(json.dumps(entry))
+        
+        shard_path = self.shard_path
+        if len(self._index) >= self.shard_size:
+            self._close_shard()
+        return shard_path
+    
+    def close(self) -> List[Dict[str, Any]]:
+        """Finish the current shard and return the layout of every shard written."""
+        if self._tar is not None:
+            self._close_shard()
+        return self.shards
+    
+    def __enter__(self) -> 'TarShardWriter':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def _open_shard(self) -> None:
+        # Large buffered sequential writes, the tar stream itself is never seeked
+        self._file = open(self.shard_path, 'wb', buffering=self.buffer_size)
+        self._tar = tarfile.open(fileobj=self._file, mode='w', format=tarfile.USTAR_FORMAT)
+        self._index = []
+    
+    def _close_shard(self) -> None:
+        assert self._tar is not None and self._file is not None
+        shard_path = self.shard_path
+        index_path = shard_path.with_suffix('.idx')
+        
+        self._tar.close()
+        self._file.close()
+        with open(index_path, 'w') as f:
+            f.write('\n'.join(self._index) + '\n')
+        
+        self.shards.append({
+            'path': shard_path.name,
+            'index': index_path.name,
+            'count': len(self._index)
+        })
+        self._tar = None
+        self._file = None
+        self._index = []
+
+
+class NpyArrayWriter:
+    """Fill ``images.npy`` and ``labels.npy`` for one split, in order.
+    
+    Both files are created as ``.npy`` memory maps sized for ``size`` rows on the
+    first write, so they can be reopened with ``np.load(path, mmap_mode='r')``.
+    """
+
+    def __init__(self, output_dir: Union[str, Path], size: int):
+        if size <= 0:
+            raise ValueError(f"Invalid size: {size}")
+        
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.size = size
+        self.images_path = self.output_dir / 'images.npy'
+        self.labels_path = self.output_dir / 'labels.npy'
+        self.count = 0
+        self._images: Optional[np.ndarray] = None
+        self._labels: Optional[np.ndarray] = None
+        self._spec: Dict[str, Any] = {}
+    
+    def write(self, images: np.ndarray, labels: np.ndarray) -> int:
+        """Append a batch of rows and return the index of its first row."""
+        if len(images) != len(labels):
+            raise ValueError(f"Batch size mismatch: {len(images)} images, {len(labels)} labels")
+        if self.count + len(images) > self.size:
+            raise ValueError(f"Writing {len(images)} rows would exceed size {self.size}")
+        
+        if self._images is None:
+            self._images = np.lib.format.open_memmap(
+                self.images_path, mode='w+', dtype=images.dtype, shape=(self.size,) + images.shape[1:]
+            )
+            self._labels = np.lib.format.open_memmap(
+                self.labels_path, mode='w+', dtype=labels.dtype, shape=(self.size,) + labels.shape[1:]
+            )
+            self._spec = {
+                'image_shape': list(self._images.shape),
+                'label_shape': list(self._labels.shape),
+                'dtype': str(self._images.dtype),
+                'label_dtype': str(self._labels.dtype)
+            }
+        assert self._images is not None and self._labels is not None
+        
+        start = self.count
+        self._images[start:start + len(images)] = images
+        self._labels[start:start + len(labels)] = labels
+        self.count += len(images)
+        return start
+    
+    @property
+    def layout(self) -> Dict[str, Any]:
+        return {
+            'images': self.images_path.name,
+            'labels': self.labels_path.name,
+            'count': self.count,
+            **self._spec
+        }
+    
+    def close(self) -> Dict[str, Any]:
+        """Flush both arrays to disk, release the maps and return their layout."""
+        if self._images is not None and self._labels is not None:
+            self._images.flush()
+            self._labels.flush()
+        self._images = None
+        self._labels = None
+        return self.layout
+    
+    def __enter__(self) -> 'NpyArrayWriter':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class LabelManifestWriter:
+    """Write the labels of one split to a single ``labels.<format>`` manifest.
+    
+    ``jsonl`` and ``csv`` manifests are append-only text with one row per sample
+    (``index``, ``sample`` path relative to the split directory, ``label`` and
+    ``seed``), written through a large buffer and flushed once per batch.
+    ``npy`` is the columnar variant: rows are kept as compact NumPy chunks and
+    saved on close as one structured array with ``index``, ``sample`` and
+    ``label`` fields, so a split loads with a single ``np.load``.
+    """
+
+    def __init__(self, output_dir: Union[str, Path], format: str, seed: Optional[int] = None,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE):
+        if format not in LABEL_FORMATS or format == 'files':
+            raise ValueError(f"Invalid label manifest format: {format}, expected one of {LABEL_FORMATS[1:]}")
+        
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.format = format
+        self.seed = seed
+        self.path = self.output_dir / f"labels.{format}"
+        self.count = 0
+        self._file: Optional[TextIO] = None
+        self._csv: Any = None
+        self._chunks: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        
+        if format != 'npy':
+            self._file = open(self.path, 'w', encoding='utf-8', newline='', buffering=buffer_size)
+            if format == 'csv':
+                self._csv = csv.writer(self._file)
+                self._csv.writerow(MANIFEST_FIELDS)
+    
+    def write(self, rows: Sequence[Tuple[int, str, str]]) -> None:
+        """Append a batch of ``(index, sample, label)`` rows."""
+        if self.format == 'npy':
+            indices, samples, labels = zip(*rows) if rows else ((), (), ())
+            self._chunks.append((np.array(indices, dtype=np.int64),
+                                 np.array([sample.encode('utf-8') for sample in samples], dtype=np.bytes_),
+                                 np.array(labels, dtype=np.str_)))
+        elif self.format == 'csv':
+            self._csv.writerows((index, sample, label, self.seed) for index, sample, label in rows)
+        else:
+            assert self._file is not None
+            self._file.write(''.join(
+                json.dumps({'index': index, 'sample': sample, 'label': label, 'seed': self.seed}) + '\n'
+                for index, sample, label in rows
+            ))
+        
+        if self._file is not None:
+            self._file.flush()
+        self.count += len(rows)
+    
+    @property
+    def layout(self) -> Dict[str, Any]:
+        return {
+            'manifest': self.path.name,
+            'format': self.format,
+            'count': self.count
+        }
+    
+    def close(self) -> Dict[str, Any]:
+        """Finish the manifest and return its layout."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.format == 'npy' and (self._chunks or not self.path.exists()):
+            self._save_columns()
+        return self.layout
+    
+    def __enter__(self) -> 'LabelManifestWriter':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def _save_columns(self) -> None:
+        # Concatenation widens every string column to its longest value
+        columns = [np.concatenate([chunk[i] for chunk in self._chunks]) if self._chunks else
+                   np.empty(0, dtype=dtype) for i, dtype in enumerate((np.int64, np.bytes_, np.str_))]
+        manifest = np.empty(len(columns[0]), dtype=[(name, column.dtype) for name, column
+                                                    in zip(MANIFEST_FIELDS, columns)])
+        for name, column in zip(MANIFEST_FIELDS, columns):
+            manifest[name] = column
+        np.save(self.path, manifest)
+        self._chunks = []
+
+
+def load_label_manifest(path: Union[str, Path]) -> Dict[str, np.ndarray]:
+    """Load a split's label manifest in one sequential read as ``index``, ``sample`` and ``label`` columns."""
+    path = Path(path)
+    if path.suffix == '.npy':
+        manifest = np.load(path)
+        return {
+            'index': manifest['index'],
+            'sample': np.char.decode(manifest['sample'], 'utf-8'),
+            'label': manifest['label']
+        }
+    
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.suffix == '.csv':
+            rows = [(int(index), sample, label) for index, sample, label, _ in itertools.islice(csv.reader(f), 1, None)]
+        else:
+            rows = [(record['index'], record['sample'], record['label'])
+                    for record in map(json.loads, f.read().splitlines())]
+    
+    indices, samples, labels = zip(*rows) if rows else ((), (), ())
+    return {
+        'index': np.array(indices, dtype=np.int64),
+        'sample': np.array(samples, dtype=np.str_),
+        'label': np.array(labels, dtype=np.str_)
+    }
@@ -1,5 +1,8 @@
+from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import TypeVar, Tuple, Any, Dict, Generic, Union, Optional, List
+from typing import TypeVar, Tuple, Any, Dict, Generic, Union, Optional, List, Iterator, Iterable, Sequence, Callable, Deque
+import itertools
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
 import random
@@ -7,9 +10,33 @@ import os
 from .types import CaptchaType
 import json
 from datetime import datetime
-import numpy as np # type: ignore
-from ..utils.id_generator import IDGenerator
+from concurrent import futures  # futures.ProcessPoolExecutor (and multiprocessing) loads on first use
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from ..utils.id_generator import IDGenerator, IDScheme
+from ..utils.lazy import LazyModule
+from ..utils.prefetch import prefetch
+from ..utils.seeding import sample_rng, new_entropy, IndexPermutation
+from ..utils.instrumentation import TaskStats, DatasetMonitor, EventSink
 from ..config.settings import get_settings
+from ..datasets.writers import TarShardWriter, NpyArrayWriter, LabelManifestWriter, DEFAULT_SHARD_SIZE, LABEL_FORMATS
+from ..datasets.progress import ProgressManifest, PROGRESS_MANIFEST_FILE
+
+EXECUTOR_TYPES = ('thread', 'process')
+OUTPUT_FORMATS = ('files', 'tar', 'npy')
+ARRAY_BATCH_SIZE = 256
+TASK_CHUNK_SIZE = 64
+TASKS_IN_FLIGHT_PER_WORKER = 4
+CHUNKS_PER_WORKER = 4
+PROGRESS_STATE_FILE = 'progress.json'
+
+# NumPy Is Only Needed For Dataset Generation, Not For Single Samples
+np = LazyModule('numpy')
+
+# Per-process generator, built once by the pool initializer
+_worker_generator: Any = None
+
+# (seed, split, start, count, output_dir), a contiguous range of sample indices
+IndexTask = Tuple[int, str, int, int, str]
 
 SampleType = TypeVar('SampleType')  # Captcha Sample
 LabelType = TypeVar('LabelType')  # Captcha Label
@@ -19,21 +46,57 @@ class CaptchaConfig:
     type: CaptchaType
     params: Dict[str, Any]
 
+@dataclass(frozen=True)
+class UniqueLabelPlan:
+    """Distinct labels for a whole run: sample ``index`` of ``split`` gets label number
+    ``permutation(offsets[split] + index)``. Every split owns its own range of permutation
+    positions, so no label repeats within or across splits."""
+    permutation: IndexPermutation
+    offsets: Dict[str, int]
+    
+    def number(self, split: str, index: int) -> int:
+        return self.permutation(self.offsets[split] + index)
+
 class CaptchaGenerator(Generic[SampleType, LabelType], ABC):
     
+    # File Extensions Of Encoded Samples And Labels
+    sample_extension: str = 'bin'
+    label_extension: str = 'txt'
+    
     def __init__(self, config: CaptchaConfig):
         self.config = config
+        self._id_scheme: Optional[IDScheme] = None
+        self._label_plan: Optional[UniqueLabelPlan] = None
+    
+    # Scheme Naming Dataset Samples, From The id_scheme And id_worker Params Or Config
+    @property
+    def id_scheme(self) -> IDScheme:
+        if getattr(self, '_id_scheme', None) is None:
+            params = self.config.params
+            captcha_config = get_settings().get_captcha_config(self.config.type.value)
+            name = params.get('id_scheme') if 'id_scheme' in params else captcha_config.get('id_scheme', 'random')
+            worker = params.get('id_worker') if 'id_worker' in params else captcha_config.get('id_worker', 0)
+            self._id_scheme = IDGenerator.create_scheme(name or 'random', worker=worker or 0)
+        return self._id_scheme
     
     @abstractmethod
-    def generate_label(self) -> LabelType:
+    def generate_label(self, rng: Optional[random.Random] = None) -> LabelType:
         pass
     
+    # Number Of Distinct Labels (Used By Unique Labels)
+    def label_space(self) -> int:
+        raise NotImplementedError(f"{type(self).__name__} does not support unique labels")
+    
+    # Label Number n In [0, label_space()) (Used By Unique Labels)
+    def label_at(self, number: int) -> LabelType:
+        raise NotImplementedError(f"{type(self).__name__} does not support unique labels")
+    
     @abstractmethod
     def _save_label(self, label: LabelType, path: Union[str, Path]) -> Path:
         pass
 
     @abstractmethod
-    def generate_sample(self, label: LabelType) -> SampleType:
+    def generate_sample(self, label: LabelType, rng: Optional[random.Random] = None) -> SampleType:
         pass
     
     @abstractmethod
@@ -41,16 +104,112 @@ class CaptchaGenerator(Generic[SampleType, LabelType], ABC):
         pass
 
     @abstractmethod
-    def generate(self) -> Tuple[SampleType, LabelType]:
+    def generate(self, rng: Optional[random.Random] = None) -> Tuple[SampleType, LabelType]:
         pass
     
     @abstractmethod
-    def save(self, sample: SampleType, label: LabelType, output_dir: Optional[Union[str, Path]] = None, use_timestamp_dir: bool = True) -> Tuple[Path, Path]:
+    def save(self, sample: SampleType, label: LabelType, output_dir: Optional[Union[str, Path]] = None, use_timestamp_dir: bool = True, key: Optional[str] = None) -> Tuple[Path, Path]:
         pass
     
+    # Render A Sample Without Serializing It (Defaults To generate_sample)
+    def render_sample(self, label: LabelType, rng: Optional[random.Random] = None) -> Any:
+        return self.generate_sample(label, rng)
+    
+    # Turn A Rendered Sample Into The Final Sample (Defaults To Returning It Unchanged)
+    def encode_rendered(self, rendered: Any) -> SampleType:
+        return rendered
+    
+    def generate_indexed(self, seed: int, split: str, index: int,
+                         stats: Optional[TaskStats] = None) -> Tuple[SampleType, LabelType, str]:
+        """Generate sample ``index`` of ``split`` and return ``(sample, label, key)``.
+        
+        Label, rendering noise and key all come from the sample's own RNG stream,
+        so the result depends only on ``(seed, split, index)`` (and, with the
+        ``sortable`` ID scheme, the key on the time). During a ``unique_labels``
+        run the label is taken from the run's label permutation instead. When
+        ``stats`` is given the label, render and encode stages are timed into it.
+        """
+        rng = sample_rng(seed, split, index)
+        label = self._indexed_label(split, index, rng)
+        if stats is None:
+            return self.generate_sample(label, rng), label, self.id_scheme.key(split, index, rng)
+        
+        stats.lap('label')
+        rendered = self.render_sample(label, rng)
+        stats.lap('render')
+        sample = self.encode_rendered(rendered)
+        stats.lap('encode')
+        return sample, label, self.id_scheme.key(split, index, rng)
+    
+    def _indexed_label(self, split: str, index: int, rng: random.Random) -> LabelType:
+        plan = getattr(self, '_label_plan', None)
+        if plan is None:
+            return self.generate_label(rng)
+        return self.label_at(plan.number(split, index))
+    
     def export(self, output_dir: Optional[Union[str, Path]] = None) -> Tuple[Path, Path]:
         sample, label = self.generate()
         return self.save(sample, label, output_dir)
+    
+    def iter_samples(self, n: Optional[int] = None, batch_size: Optional[int] = None,
+                     prefetch_batches: int = 0) -> Iterator[Any]:
+        """Lazily generate ``(sample, label)`` pairs in memory, never touching the filesystem.
+        
+        Yields ``n`` pairs, or an endless stream when ``n`` is None. With ``batch_size``
+        the pairs are yielded as lists of up to ``batch_size`` items. A positive
+        ``prefetch_batches`` renders that many batches ahead on a background thread
+        so generation overlaps with the consumer.
+        """
+        if n is not None and n < 0:
+            raise ValueError(f"Invalid n: {n}")
+        if batch_size is not None and batch_size <= 0:
+            raise ValueError(f"Invalid batch_size: {batch_size}")
+        if prefetch_batches < 0:
+            raise ValueError(f"Invalid prefetch_batches: {prefetch_batches}")
+        
+        batches = self._iter_batches(n, batch_size or 1)
+        if prefetch_batches:
+            batches = prefetch(batches, prefetch_batches)
+        
+        for batch in batches:
+            if batch_size is None:
+                yield batch[0]
+            else:
+                yield batch
+    
+    def _iter_batches(self, n: Optional[int], batch_size: int) -> Iterator[List[Tuple[SampleType, LabelType]]]:
+        counts = itertools.repeat(batch_size) if n is None else (
+            min(batch_size, n - start) for start in range(0, n, batch_size)
+        )
+        for count in counts:
+            yield [self.generate() for _ in range(count)]
+    
+    # Load Expensive Resources Up Front (Called Once Per Worker Process)
+    def warmup(self) -> None:
+        pass
+    
+    # Serialize Sample To Bytes (Used By Archive Outputs)
+    def encode_sample(self, sample: SampleType) -> bytes:
+        raise NotImplementedError(f"{type(self).__name__} does not support encoded sample output")
+    
+    # Serialize Label To Bytes (Used By Archive Outputs)
+    def encode_label(self, label: LabelType) -> bytes:
+        return str(label).encode('utf-8')
+    
+    # Generate Sample And Return Encoded Members Keyed By Extension
+    def generate_encoded(self, label: LabelType, rng: Optional[random.Random] = None) -> Dict[str, bytes]:
+        return self._encode_members(self.generate_sample(label, rng), label)
+    
+    def _encode_members(self, sample: SampleType, label: LabelType) -> Dict[str, bytes]:
+        return {
+            self.sample_extension: self.encode_sample(sample),
+            self.label_extension: self.encode_label(label)
+        }
+    
+    # Render Labels (Or A Count) Into Stacked Sample And Encoded Label Arrays (Used By Array Outputs)
+    def generate_batch(self, labels: Union[int, List[LabelType]],
+                       rngs: Optional[List[random.Random]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError(f"{type(self).__name__} does not support array output")
         
     def generate_dataset(self,
                         size: Optional[int] = None, 
@@ -60,7 +219,42 @@ class CaptchaGenerator(Generic[SampleType, LabelType], ABC):
                         parallel: Optional[bool] = None,
                         max_workers: Optional[int] = None,
                         seed: Optional[int] = None,
-                        output_dir: Optional[Union[str, Path]] = None) -> Dict[str, List[Tuple[Path, Path]]]:
+                        output_dir: Optional[Union[str, Path]] = None,
+                        executor: Optional[str] = None,
+                        output_format: Optional[str] = None,
+                        shard_size: Optional[int] = None,
+                        resume: Optional[bool] = None,
+                        label_format: Optional[str] = None,
+                        events: Optional[EventSink] = None,
+                        record_timings: Optional[bool] = None,
+                        stream: Optional[bool] = None,
+                        max_in_flight: Optional[int] = None,
+                        write_workers: Optional[int] = None,
+                        shard_index: Optional[int] = None,
+                        num_shards: Optional[int] = None,
+                        unique_labels: Optional[bool] = None,
+                        chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """Generate train/val/test splits under ``output_dir/<timestamp>``.
+        
+        Arguments left as ``None`` fall back to the configuration. See
+        docs/api-reference.md for the details of each option.
+        
+        size: total number of samples across the splits
+        train_ratio, val_ratio, test_ratio: split shares, must sum to 1
+        parallel, max_workers, executor: render on a ``'thread'`` or ``'process'`` pool
+        seed: base of every sample's ``(seed, split, index)`` stream, fresh entropy if unset
+        output_dir: parent directory of the dataset (the dataset itself with ``resume``)
+        output_format: ``'files'``, ``'tar'`` shards of ``shard_size`` samples, or ``'npy'`` arrays
+        resume: skip samples recorded in ``<split>/progress.jsonl`` (files format only)
+        label_format: ``'files'`` or one ``jsonl``/``csv``/``npy`` label manifest per split
+        events, record_timings: progress event sink, timing summary in ``metadata.json``
+        stream: return a summary instead of every sample's paths
+        max_in_flight: tasks submitted to the pool at once
+        write_workers: dedicated threads writing the files
+        shard_index, num_shards: generate only this node's shard of every split
+        unique_labels: never repeat a label within or across splits
+        chunk_size: maximum samples per task
+        """
         
         # Get default values from configuration
         captcha_config = get_settings().get_captcha_config(self.config.type.value)
@@ -72,6 +266,19 @@ class CaptchaGenerator(Generic[SampleType, LabelType], ABC):
         parallel = captcha_config.get('parallel') if parallel is None else parallel
         max_workers = captcha_config.get('max_workers') if max_workers is None else max_workers
         seed = captcha_config.get('seed') if seed is None else seed
+        executor = (captcha_config.get('executor') or 'thread') if executor is None else executor
+        output_format = (captcha_config.get('output_format') or 'files') if output_format is None else output_format
+        shard_size = (captcha_config.get('shard_size') or DEFAULT_SHARD_SIZE) if shard_size is None else shard_size
+        resume = bool(captcha_config.get('resume')) if resume is None else resume
+        label_format = (captcha_config.get('label_format') or 'files') if label_format is None else label_format
+        record_timings = bool(captcha_config.get('record_timings')) if record_timings is None else record_timings
+        stream = bool(captcha_config.get('stream')) if stream is None else stream
+        max_in_flight = captcha_config.get('max_in_flight') if max_in_flight is None else max_in_flight
+        write_workers = captcha_config.get('write_workers') if write_workers is None else write_workers
+        shard_index = (captcha_config.get('shard_index') or 0) if shard_index is None else shard_index
+        num_shards = (captcha_config.get('num_shards') or 1) if num_shards is None else num_shards
+        unique_labels = bool(captcha_config.get('unique_labels')) if unique_labels is None else unique_labels
+        chunk_size = captcha_config.get('chunk_size') if chunk_size is None else chunk_size
         
         # Check if parameters exist or are valid
         if size is None:
@@ -87,10 +294,43 @@ class CaptchaGenerator(Generic[SampleType, LabelType], ABC):
         if output_dir is None:
             raise ValueError(f"Missing required parameter 'output_dir' and no default value in configuration for CAPTCHA type '{self.config.type.value}'")
 
+        # Validate executor type
+        if executor not in EXECUTOR_TYPES:
+            raise ValueError(f"Invalid executor: {executor}, expected one of {EXECUTOR_TYPES}")
+
+        # Validate output format
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Invalid output_format: {output_format}, expected one of {OUTPUT_FORMATS}")
+        if shard_size <= 0:
+            raise ValueError(f"Invalid shard_size: {shard_size}")
+        if resume and output_format != 'files':
+            raise ValueError(f"Resume is only supported for output_format 'files', got '{output_format}'")
+        if label_format not in LABEL_FORMATS:
+            raise ValueError(f"Invalid label_format: {label_format}, expected one of {LABEL_FORMATS}")
+        if label_format != 'files' and (output_format != 'files' or resume):
+            raise ValueError(f"label_format '{label_format}' requires output_format 'files' without resume")
+        if stream and (resume or label_format == 'npy'):
+            raise ValueError("Streaming does not support resume or the 'npy' label_format")
+        if max_in_flight is not None and max_in_flight <= 0:
+            raise ValueError(f"Invalid max_in_flight: {max_in_flight}")
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError(f"Invalid chunk_size: {chunk_size}")
+        if write_workers is not None and write_workers <= 0:
+            raise ValueError(f"Invalid write_workers: {write_workers}")
+        if write_workers and output_format != 'files':
+            raise ValueError(f"write_workers requires output_format 'files', got '{output_format}'")
+        if num_shards <= 0 or not 0 <= shard_index < num_shards:
+            raise ValueError(f"Invalid shard: shard_index {shard_index} of num_shards {num_shards}")
+        if num_shards > 1 and seed is None:
+            raise ValueError("Sharded runs require a seed, shards of one dataset must draw from the same streams")
+
         # Validate size is positive
         if size <= 0:
             raise ValueError(f"Invalid size: {size}")
         
+        # Fail on an unknown ID scheme before anything is written
+        self.id_scheme
+        
         # Validate ratios are non-negative
         if train_ratio < 0 or val_ratio < 0 or test_ratio < 0:
             raise ValueError(f"Ratios must be non-negative, got "
@@ -103,18 +343,37 @@ class CaptchaGenerator(Generic[SampleType, LabelType], ABC):
         if abs(total_ratio - 1.0) > 1e-6:
             raise ValueError(f"Ratios must sum to 1.0, got {total_ratio}")
         
-        # Set random seeds for reproducibility if specified
-        if seed is not None:
-            random.seed(seed)
-            np.random.seed(seed)
+        # Calculate sizes for each split
+        train_size = int(size * train_ratio)
+        val_size = int(size * val_ratio)
+        test_size = size - train_size - val_size
+        
+        # Fail before anything is written when a split cannot get enough distinct labels
+        label_offsets = self._unique_label_offsets(
+            {'train': (train_size, train_ratio), 'val': (val_size, val_ratio), 'test': (test_size, test_ratio)}
+        ) if unique_labels else None
+        
+        # Every sample is derived from (seed, split, index), unseeded runs draw fresh entropy
+        entropy = new_entropy() if seed is None else seed
         
         # Create dataset output directory
         base_output_dir = Path(output_dir)
        
-        # Use Shared Directory Timestamp
-        timestamp = IDGenerator.get_dir_timestamp()
-        output_dir = base_output_dir / timestamp
-        output_dir.mkdir(parents=True, exist_ok=True)
+        if resume:
+            # Resumable datasets live at a fixed path and keep the entropy they started with
+            output_dir = base_output_dir
+            output_dir.mkdir(parents=True, exist_ok=True)
+            entropy = self._load_progress_state(output_dir, seed, entropy, output_format,
+                                                (shard_index, num_shards), unique_labels)
+        elif num_shards > 1:
+            # Shards get a fixed name so the nodes of one run agree on the layout
+            output_dir = base_output_dir / f"shard-{shard_index:05d}-of-{num_shards:05d}"
+            output_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            # Use Shared Directory Timestamp
+            timestamp = IDGenerator.get_dir_timestamp()
+            output_dir = base_output_dir / timestamp
+            output_dir.mkdir(parents=True, exist_ok=True)
         
         # Create Split Directories
         splits = ['train', 'val', 'test']
@@ -123,101 +382,445 @@ class CaptchaGenerator(Generic[SampleType, LabelType], ABC):
             split_dir = output_dir / split
             split_dir.mkdir(parents=True, exist_ok=True)
             split_dirs[split] = split_dir
-            
-        # Calculate sizes for each split
-        train_size = int(size * train_ratio)
-        val_size = int(size * val_ratio)
-        test_size = size - train_size - val_size
         
-        split_sizes = {
-            'train': train_size,
-            'val': val_size,
-            'test': test_size
+        # This run only covers its shard of every split
+        shard_ranges = {
+            split: _shard_range(split_size, shard_index, num_shards)
+            for split, split_size in (('train', train_size), ('val', val_size), ('test', test_size))
         }
+        split_sizes = {split: len(indices) for split, indices in shard_ranges.items()}
         
-        # Generate dataset
+        # Generate dataset, streaming runs only count what was written
         results: Dict[str, List[Tuple[Path, Path]]] = {split: [] for split in splits}
+        layouts: Dict[str, Any] = {}
+        
+        # Label plan of this run, thread tasks borrow it from self and process workers get a copy
+        label_plan = UniqueLabelPlan(IndexPermutation(self.label_space(), entropy),
+                                     label_offsets) if label_offsets is not None else None
+        
+        # Resumed splits only generate the indices their progress manifest is missing
+        completed: Dict[str, Dict[int, Tuple[Path, Path]]] = {}
+        pending: Dict[str, Sequence[int]] = dict(shard_ranges)
+        if resume:
+            for split, indices in shard_ranges.items():
+                completed[split] = self._load_completed(split, split_dirs[split], indices)
+                pending[split] = [index for index in indices if index not in completed[split]]
         
+        pool: Optional[Executor] = None
         if parallel and max_workers != 0:
-            # Parallel generation
+            # Parallel generation, one pool shared across splits so workers are only initialized once
             max_workers = max_workers or os.cpu_count() or 1
-            
-            for split, split_size in split_sizes.items():
-                if split_size <= 0:
-                    continue
-                    
-                split_results = self._generate_dataset_parallel(
-                    size=split_size,
-                    output_dir=split_dirs[split],
-                    max_workers=max_workers
-                )
-                results[split].extend(split_results)
-        else:
-            # Sequential generation
+            pool = self._create_executor(executor, max_workers, label_plan)
+        
+        workers = max_workers if pool is not None else 1
+        # A batch task carries up to chunk_size rendered images, so only one per worker is in flight
+        in_flight = workers if output_format == 'npy' else max_in_flight or workers * TASKS_IN_FLIGHT_PER_WORKER
+        monitor = DatasetMonitor(sum(split_sizes.values()), events)
+        monitor.skip(sum(split_sizes[split] - len(indices) for split, indices in pending.items()))
+        
+        # Dedicated I/O stage, rendering workers hand encoded samples to these threads
+        writer = ThreadPoolExecutor(max_workers=write_workers, thread_name_prefix='writer') if write_workers else None
+        write_in_flight = (write_workers or 0) * TASKS_IN_FLIGHT_PER_WORKER
+        
+        # Every split's tasks go through one scheduler, chunked from one shared budget
+        method = self._task_method(output_format, label_format, writer is not None)
+        chunks = _GuidedChunks(sum(len(indices) for indices in pending.values()), workers,
+                               chunk_size or (ARRAY_BATCH_SIZE if output_format == 'npy' else TASK_CHUNK_SIZE))
+        scheduler = _TaskScheduler(self._task_submitter(pool), self._task_call, in_flight,
+                                   _queue_observer(monitor, 'render', in_flight))
+        for split, indices in pending.items():
+            if split_sizes[split] > 0:
+                scheduler.add(split, method, _iter_index_tasks(entropy, split, indices, split_dirs[split], chunks))
+        
+        monitor.start()
+        split = None
+        self._label_plan = label_plan
+        try:
             for split, split_size in split_sizes.items():
                 if split_size <= 0:
                     continue
-                    
-                split_results = self._generate_dataset_sequential(
-                    size=split_size,
-                    output_dir=split_dirs[split]
-                )
+                
+                monitor.start_split(split)
+                rendered = scheduler.results(split)
+                if output_format == 'tar':
+                    split_results, layouts[split] = self._generate_split_tar(
+                        split, split_dirs[split], rendered, shard_size, monitor, collect=not stream
+                    )
+                elif output_format == 'npy':
+                    split_results, layouts[split] = self._generate_split_npy(
+                        split, split_size, split_dirs[split], rendered, monitor, collect=not stream
+                    )
+                elif label_format != 'files':
+                    split_results, layouts[split] = self._generate_split_manifest(
+                        entropy, split, split_dirs[split], rendered, label_format, monitor,
+                        collect=not stream, writer=writer, write_in_flight=write_in_flight
+                    )
+                else:
+                    split_results = self._generate_split_files(
+                        split, split_dirs[split], rendered, monitor, completed.get(split),
+                        collect=not stream, writer=writer, write_in_flight=write_in_flight,
+                        indices=shard_ranges[split]
+                    )
                 results[split].extend(split_results)
+        except Exception as e:
+            monitor.failure(split, e)
+            raise
+        finally:
+            self._label_plan = None
+            scheduler.close()
+            if pool is not None:
+                pool.shutdown()
+            if writer is not None:
+                writer.shutdown()
+        monitor.finish()
             
         # Save metadata
-        self._save_dataset_metadata(output_dir, size, train_ratio, val_ratio, test_ratio, 
-                                  parallel, max_workers, seed, results)
+        timings = monitor.summary()
+        shard = {
+            'index': shard_index,
+            'count': num_shards,
+            'ranges': {split: [indices.start, indices.stop] for split, indices in shard_ranges.items()}
+        } if num_shards > 1 else None
+        metadata_path = self._save_dataset_metadata(output_dir, size, train_ratio, val_ratio, test_ratio,
+                                                    parallel, max_workers, seed, split_sizes, executor,
+                                                    output_format, shard_size, layouts, entropy, resume,
+                                                    timings if record_timings else None, label_format,
+                                                    write_workers, shard, unique_labels)
         
         # Reset directory timestamp to ensure new datasets get new timestamps
         IDGenerator.reset_dir_timestamp()
         
+        if stream:
+            return {
+                'output_dir': output_dir,
+                'metadata': metadata_path,
+                'split_sizes': split_sizes,
+                'timings': timings
+            }
         return results
     
-    def _generate_dataset_sequential(self, size: int, output_dir: Path) -> List[Tuple[Path, Path]]:
+    def _unique_label_offsets(self, splits: Dict[str, Tuple[int, float]]) -> Dict[str, int]:
+        # Each split owns a ratio-sized range of permutation positions, stable when a resumed run grows
+        try:
+            space = self.label_space()
+        except NotImplementedError:
+            raise ValueError(f"unique_labels is not supported by {type(self).__name__}")
+        total = sum(size for size, _ in splits.values())
+        if total > space:
+            raise ValueError(f"Cannot generate {total} unique labels, the label space only holds {space}")
+        
+        offsets, cumulative = {}, 0.0
+        for position, (split, (size, ratio)) in enumerate(splits.items(), 1):
+            start = int(space * cumulative)
+            cumulative += ratio
+            stop = space if position == len(splits) else int(space * cumulative)
+            if size > stop - start:
+                raise ValueError(f"Cannot generate {size} unique '{split}' labels, its {ratio:.0%} share "
+                                 f"of the label space holds {stop - start} of {space} labels")
+            offsets[split] = start
+        return offsets
+    
+    def _load_completed(self, split: str, output_dir: Path, indices: range) -> Dict[int, Tuple[Path, Path]]:
+        # Samples a previous run of this split already recorded in its progress manifest
+        completed = {
+            index: (output_dir / sample, output_dir / label)
+            for index, (sample, label) in ProgressManifest(output_dir / PROGRESS_MANIFEST_FILE).load().items()
+        }
+        if completed and max(completed) >= indices.stop:
+            raise ValueError(f"Cannot shrink split '{split}' to {indices.stop} samples, "
+                             f"{max(completed) + 1} already exist in {output_dir}")
+        
+        # Files an interrupted task wrote but never recorded are regenerated, and with
+        # time-based keys under other names, so drop them
+        recorded = {path for paths in completed.values() for path in paths}
+        for directory in ('samples', 'labels'):
+            if not (output_dir / directory).is_dir():
+                continue
+            with os.scandir(output_dir / directory) as entries:
+                orphans = [Path(entry.path) for entry in entries if entry.is_file() and Path(entry.path) not in recorded]
+            for orphan in orphans:
+                orphan.unlink()
+        return completed
+    
+    def _generate_split_files(self, split: str, output_dir: Path, rendered: Iterator[Tuple[IndexTask, Any]],
+                              monitor: DatasetMonitor,
+                              completed: Optional[Dict[int, Tuple[Path, Path]]] = None,
+                              collect: bool = True,
+                              writer: Optional[Executor] = None,
+                              write_in_flight: Optional[int] = None,
+                              indices: range = range(0)) -> List[Tuple[Path, Path]]:
+        # Workers render and write their own files (or hand them to the writer stage),
+        # only index ranges and paths are exchanged
+        written = self._map_written(rendered, output_dir, True, monitor, writer, write_in_flight)
+        if completed is None:
+            results = []
+            for _, (paths, stats) in written:
+                if collect:
+                    results.extend(paths)
+                monitor.task_done(split, stats)
+            return results
+        
+        # Resumed run, each finished batch is recorded right away
+        with ProgressManifest(output_dir / PROGRESS_MANIFEST_FILE) as manifest:
+            for (_, _, start, _, _), (paths, stats) in written:
+                records = []
+                for index, (sample_path, label_path) in enumerate(paths, start):
+                    completed[index] = (sample_path, label_path)
+                    records.append((index,
+                                    sample_path.relative_to(output_dir).as_posix(),
+                                    label_path.relative_to(output_dir).as_posix()))
+                manifest.append(records)
+                monitor.task_done(split, stats)
+        
+        return [completed[index] for index in indices]
+    
+    def _generate_split_manifest(self, seed: int, split: str, output_dir: Path,
+                                 rendered: Iterator[Tuple[IndexTask, Any]], label_format: str,
+                                 monitor: DatasetMonitor,
+                                 collect: bool = True,
+                                 writer: Optional[Executor] = None,
+                                 write_in_flight: Optional[int] = None) -> Tuple[List[Tuple[Path, Path]], Dict[str, Any]]:
+        # Workers only write sample files, labels are gathered here into one buffered manifest
         results = []
-        for _ in range(size):
-            sample, label = self.generate()
-            sample_path, label_path = self.save(sample, label, output_dir, use_timestamp_dir=False)
-            results.append((sample_path, label_path))
-        return results
+        with LabelManifestWriter(output_dir, label_format, seed) as manifest:
+            written = self._map_written(rendered, output_dir, False, monitor, writer, write_in_flight)
+            for (_, _, start, _, _), (rows, stats) in written:
+                stats.restart()
+                manifest.write([
+                    (index, sample_path.relative_to(output_dir).as_posix(), str(label))
+                    for index, (sample_path, label) in enumerate(rows, start)
+                ])
+                stats.lap('write')
+                
+                # Paths of the rows inside the manifest
+                if collect:
+                    results.extend((sample_path, manifest.path / str(index))
+                                   for index, (sample_path, _) in enumerate(rows, start))
+                monitor.task_done(split, stats)
+        return results, manifest.layout
+    
+    def _load_progress_state(self, output_dir: Path, seed: Optional[int], entropy: int, output_format: str,
+                             shard: Tuple[int, int] = (0, 1), unique_labels: bool = False) -> int:
+        state_path = output_dir / PROGRESS_STATE_FILE
+        state: Dict[str, Any] = {
+            "captcha_type": self.config.type.value,
+            "captcha_params": {k: str(v) for k, v in self.config.params.items()},
+            "output_format": output_format,
+            "entropy": entropy
+        }
+        if shard[1] > 1:
+            state["shard"] = list(shard)
+        if unique_labels:
+            state["unique_labels"] = True
+        
+        if state_path.exists():
+            with open(state_path, 'r') as f:
+                saved = json.load(f)
+            
+            # Existing samples are only reusable if they come from the same generator and streams
+            for key in ('captcha_type', 'captcha_params', 'output_format', 'shard', 'unique_labels'):
+                if saved.get(key) != state.get(key):
+                    raise ValueError(f"Cannot resume dataset in {output_dir}: '{key}' changed "
+                                     f"from {saved.get(key)} to {state.get(key)}")
+            if seed is not None and seed != saved['entropy']:
+                raise ValueError(f"Cannot resume dataset in {output_dir}: seed {seed} does not match "
+                                 f"the original seed {saved['entropy']}")
+            entropy = saved['entropy']
+        else:
+            with open(state_path, 'w') as f:
+                json.dump(state, f, indent=2)
+        
+        # The dataset is incomplete again until every split is finished
+        metadata_path = output_dir / "metadata.json"
+        if metadata_path.exists():
+            metadata_path.unlink()
+        
+        return entropy
     
-    def _generate_dataset_parallel(self, size: int, output_dir: Path, max_workers: int) -> List[Tuple[Path, Path]]:
+    def _generate_split_tar(self, split: str, output_dir: Path, rendered: Iterator[Tuple[IndexTask, Any]],
+                            shard_size: int, monitor: DatasetMonitor,
+                            collect: bool = True) -> Tuple[List[Tuple[Path, Path]], List[Dict[str, Any]]]:
+        # Workers render and encode, the archive is appended in order by this thread
         results = []
+        with TarShardWriter(output_dir, split, shard_size) as writer:
+            for _, (encoded, stats) in rendered:
+                stats.restart()
+                for key, members in encoded:
+                    paths = self._write_archive_sample(writer, key, members)
+                    if collect:
+                        results.append(paths)
+                stats.lap('write')
+                monitor.task_done(split, stats)
+        return results, writer.shards
+    
+    def _generate_split_npy(self, split: str, size: int, output_dir: Path, rendered: Iterator[Tuple[IndexTask, Any]],
+                            monitor: DatasetMonitor,
+                            collect: bool = True) -> Tuple[List[Tuple[Path, Path]], Dict[str, Any]]:
+        # Workers render batches into arrays, rows are copied into the memory maps in order
+        with NpyArrayWriter(output_dir, size) as writer:
+            for _, ((images, label_array), stats) in rendered:
+                stats.restart()
+                writer.write(images, label_array)
+                stats.lap('write')
+                monitor.task_done(split, stats)
         
-        # Pre-generate labels for reproducibility
-        labels = [self.generate_label() for _ in range(size)]
+        # Paths of the rows inside the arrays
+        results = [(writer.images_path / str(i), writer.labels_path / str(i)) for i in range(size)] if collect else []
+        return results, writer.layout
+    
+    # Task Methods Return Their Results Together With The Stage Timings Of The Task
+    def _files_task(self, task: Tuple[int, str, int, int, str]) -> Tuple[List[Tuple[Path, Path]], TaskStats]:
+        seed, split, start, count, output_dir = task
+        stats = TaskStats(samples=count)
+        results = []
+        for index in range(start, start + count):
+            sample, label, key = self.generate_indexed(seed, split, index, stats)
+            results.append(self.save(sample, label, Path(output_dir), use_timestamp_dir=False, key=key))
+            stats.lap('write')
+        return results, stats
+    
+    def _samples_task(self, task: Tuple[int, str, int, int, str]) -> Tuple[List[Tuple[Path, LabelType]], TaskStats]:
+        seed, split, start, count, output_dir = task
+        samples_dir = Path(output_dir) / "samples"
+        samples_dir.mkdir(parents=True, exist_ok=True)
+        stats = TaskStats(samples=count)
+        results = []
+        for index in range(start, start + count):
+            sample, label, key = self.generate_indexed(seed, split, index, stats)
+            results.append((self._save_sample(sample, samples_dir / f"{key}.{self.sample_extension}"), label))
+            stats.lap('write')
+        return results, stats
+    
+    def _encoded_task(self, task: Tuple[int, str, int, int, str]) -> Tuple[List[Tuple[str, Dict[str, bytes]]], TaskStats]:
+        seed, split, start, count, _ = task
+        stats = TaskStats(samples=count)
+        results = []
+        for index in range(start, start + count):
+            sample, label, key = self.generate_indexed(seed, split, index, stats)
+            results.append((key, self._encode_members(sample, label)))
+            stats.lap('encode')
+        return results, stats
+    
+    def _rendered_task(self, task: Tuple[int, str, int, int, str]) -> Tuple[List[Tuple[str, LabelType, SampleType]], TaskStats]:
+        # Render and encode only, the writer stage stores the samples
+        seed, split, start, count, _ = task
+        stats = TaskStats(samples=count)
+        results = []
+        for index in range(start, start + count):
+            sample, label, key = self.generate_indexed(seed, split, index, stats)
+            results.append((key, label, sample))
+        return results, stats
+    
+    def _write_task(self, output_dir: Path, rendered: Tuple[List[Tuple[str, LabelType, SampleType]], TaskStats],
+                    labels: bool) -> Tuple[List[Tuple[Path, Any]], TaskStats]:
+        # Writer stage: store what _rendered_task produced, like _files_task (labels) or _samples_task
+        samples, stats = rendered
+        stats.restart()
+        samples_dir = output_dir / "samples"
+        samples_dir.mkdir(parents=True, exist_ok=True)
+        results: List[Tuple[Path, Any]] = []
+        for key, label, sample in samples:
+            if labels:
+                results.append(self.save(sample, label, output_dir, use_timestamp_dir=False, key=key))
+            else:
+                results.append((self._save_sample(sample, samples_dir / f"{key}.{self.sample_extension}"), label))
+        stats.lap('write')
+        return results, stats
+    
+    def _array_task(self, task: Tuple[int, str, int, int, str]) -> Tuple[Tuple[np.ndarray, np.ndarray], TaskStats]:
+        seed, split, start, count, _ = task
+        stats = TaskStats(samples=count)
+        rngs = [sample_rng(seed, split, index) for index in range(start, start + count)]
+        labels = [self._indexed_label(split, index, rng) for index, rng in zip(range(start, start + count), rngs)]
+        stats.lap('label')
+        arrays = self.generate_batch(labels, rngs=rngs)
+        stats.lap('render')
+        return arrays, stats
+    
+    def _task_method(self, output_format: str, label_format: str, write_stage: bool) -> str:
+        # Task method rendering every split of a run
+        if output_format == 'tar':
+            return '_encoded_task'
+        if output_format == 'npy':
+            return '_array_task'
+        if write_stage:
+            return '_rendered_task'
+        return '_files_task' if label_format == 'files' else '_samples_task'
+    
+    def _task_submitter(self, pool: Optional[Executor]) -> Optional[Callable[[str, Any], Future]]:
+        # Submit a generator method call to whichever backend is active
+        if pool is None:
+            return None
+        if isinstance(pool, futures.ProcessPoolExecutor):
+            return lambda method, item: pool.submit(_process_call, method, item)
+        return lambda method, item: pool.submit(self._thread_call, method, item)
+    
+    def _task_call(self, method: str, item: Any) -> Any:
+        return getattr(self, method)(item)
+    
+    def _map_written(self, rendered: Iterator[Tuple[IndexTask, Any]], output_dir: Path, labels: bool,
+                     monitor: DatasetMonitor, writer: Optional[Executor] = None,
+                     write_in_flight: Optional[int] = None) -> Iterator[Tuple[IndexTask, Any]]:
+        # Results of '_files_task' or '_samples_task', or of '_rendered_task' stored by the writer stage
+        if writer is None:
+            return rendered
         
-        # Define a serializable processing function
-        def _parallel_save(args):
-            idx, output_dir_str, label = args
-            output_dir_path = Path(output_dir_str)
-            
-            try:
-                # Use a new instance of the generator
-                from .factory import CaptchaFactory
-                generator = CaptchaFactory.create(self.config.type)
-                
-                sample = generator.generate_sample(label)
-                return generator.save(sample, label, output_dir_path, use_timestamp_dir=False)
-            except Exception as e:
-                # Error handling: fallback to current instance
-                print(f"Parallel generation failed: {e}")
-                sample = self.generate_sample(label)
-                return self.save(sample, label, output_dir_path, use_timestamp_dir=False)
-        
-        # Use thread pool to execute parallel tasks
-        from concurrent.futures import ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            args_list = [(i, str(output_dir), label) for i, label in enumerate(labels)]
-            futures = executor.map(_parallel_save, args_list)
-            results.extend(futures)
+        write_in_flight = write_in_flight or TASKS_IN_FLIGHT_PER_WORKER
+        tasks: Deque[IndexTask] = deque()
         
-        return results
+        def submit(item: Tuple[IndexTask, Any]) -> Future:
+            task, samples = item
+            tasks.append(task)
+            return writer.submit(self._write_task, output_dir, samples, labels)
+        
+        written = _bounded_map(submit, rendered, write_in_flight, _queue_observer(monitor, 'write', write_in_flight))
+        return ((tasks.popleft(), result) for result in written)
+    
+    def _thread_call(self, method: str, item: Any) -> Any:
+        # Each pool thread builds one generator for this config and reuses it for every task
+        from .factory import CaptchaFactory
+        generator = CaptchaFactory.acquire_config(self.config, type(self))
+        if generator is self or self._label_plan is None:
+            return getattr(generator, method)(item)
+        
+        # Pooled generators outlive the run, only lend them its label plan for this task
+        generator._label_plan = self._label_plan
+        try:
+            return getattr(generator, method)(item)
+        finally:
+            generator._label_plan = None
+    
+    def _write_archive_sample(self, writer: TarShardWriter, key: str, members: Dict[str, bytes]) -> Tuple[Path, Path]:
+        shard_path = writer.write(key, members)
+        
+        # Paths of the members inside their shard
+        return (shard_path / f"{key}.{self.sample_extension}",
+                shard_path / f"{key}.{self.label_extension}")
+    
+    def _create_executor(self, executor: str, max_workers: int,
+                         label_plan: Optional[UniqueLabelPlan] = None) -> Executor:
+        if executor == 'process':
+            # Each worker process builds and warms up its own generator once
+            return futures.ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_process_worker,
+                initargs=(type(self), self.config, label_plan)
+            )
+        return ThreadPoolExecutor(max_workers=max_workers)
     
     def _save_dataset_metadata(self, output_dir: Path, size: int, train_ratio: float, 
                              val_ratio: float, test_ratio: float, parallel: bool,
                              max_workers: Optional[int], seed: Optional[int],
-                             results: Dict[str, List[Tuple[Path, Path]]]) -> Path:
+                             split_sizes: Dict[str, int],
+                             executor: str = 'thread', output_format: str = 'files',
+                             shard_size: Optional[int] = None,
+                             layouts: Optional[Dict[str, Any]] = None,
+                             entropy: Optional[int] = None, resume: bool = False,
+                             timings: Optional[Dict[str, Any]] = None,
+                             label_format: str = 'files',
+                             write_workers: Optional[int] = None,
+                             shard: Optional[Dict[str, Any]] = None,
+                             unique_labels: bool = False) -> Path:
 
         metadata = {
             "timestamp": datetime.now().isoformat(),
@@ -230,15 +833,190 @@ class CaptchaGenerator(Generic[SampleType, LabelType], ABC):
                 "test_ratio": test_ratio,
                 "parallel": parallel,
                 "max_workers": max_workers,
-                "seed": seed
+                "executor": executor,
+                "seed": seed,
+                "entropy": entropy,
+                "resume": resume,
+                "write_workers": write_workers,
+                "unique_labels": unique_labels
             },
-            "split_sizes": {
-                split: len(paths) for split, paths in results.items()
-            }
+            "split_sizes": split_sizes,
+            "output_format": output_format
         }
         
+        # Record storage layout, paths are relative to the dataset directory
+        if output_format == 'tar':
+            metadata["shard_size"] = shard_size
+            metadata["shards"] = {
+                split: [
+                    {**shard, 'path': f"{split}/{shard['path']}", 'index': f"{split}/{shard['index']}"}
+                    for shard in split_shards
+                ]
+                for split, split_shards in (layouts or {}).items()
+            }
+        elif output_format == 'npy':
+            metadata["arrays"] = {
+                split: {**layout, 'images': f"{split}/{layout['images']}", 'labels': f"{split}/{layout['labels']}"}
+                for split, layout in (layouts or {}).items()
+            }
+        elif label_format != 'files':
+            metadata["label_format"] = label_format
+            metadata["label_manifests"] = {
+                split: {**layout, 'manifest': f"{split}/{layout['manifest']}"}
+                for split, layout in (layouts or {}).items()
+            }
+        
+        if shard is not None:
+            metadata["shard"] = shard
+        
+        if timings is not None:
+            metadata["timings"] = timings
+        
         metadata_path = output_dir / "metadata.json"
         with open(metadata_path, 'w') as f:
             json.dump(metadata, f, indent=2)
             
-        return metadata_path
\ No newline at end of file
+        return metadata_path
+
+
+def _init_process_worker(generator_cls: type, config: CaptchaConfig,
+                         label_plan: Optional[UniqueLabelPlan] = None) -> None:
+    global _worker_generator
+    
+    # Forked workers inherit the parent's RNG state, reseed so IDs don't collide
+    random.seed()
+    np.random.seed()
+    
+    _worker_generator = generator_cls(config)
+    _worker_generator._label_plan = label_plan
+    _worker_generator.warmup()
+
+
+def _process_call(method: str, item: Any) -> Any:
+    return getattr(_worker_generator, method)(item)
+
+
+def _bounded_map(submit: Callable[[Any], Future], items: Iterable[Any], in_flight: int,
+                 observe: Optional[Callable[[Sequence[Future]], None]] = None) -> Iterator[Any]:
+    # Like Executor.map, but items are consumed lazily and at most in_flight are submitted at a time.
+    # observe sees the queue every time its oldest result is taken
+    pending: Deque[Future] = deque()
+    try:
+        for item in items:
+            if len(pending) >= in_flight:
+                if observe is not None:
+                    observe(pending)
+                yield pending.popleft().result()
+            pending.append(submit(item))
+        while pending:
+            if observe is not None:
+                observe(pending)
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _queue_observer(monitor: Optional[DatasetMonitor], stage: str,
+                    capacity: int) -> Optional[Callable[[Sequence[Future]], None]]:
+    # Report how many queued tasks are still running and how many wait for the next stage
+    if monitor is None:
+        return None
+    
+    def observe(pending: Sequence[Future]) -> None:
+        ready = sum(future.done() for future in pending)
+        monitor.observe_queue(stage, capacity, len(pending) - ready, ready)
+    return observe
+
+
+def _shard_range(size: int, shard_index: int, num_shards: int) -> range:
+    # Contiguous slice of range(size), the slices of all shards cover it exactly once
+    return range(size * shard_index // num_shards, size * (shard_index + 1) // num_shards)
+
+
+class _TaskScheduler:
+    # One bounded window of tasks over every split of a run, on one pool. Tasks are submitted in
+    # split order, so the next split is already rendering while the current one finishes and the
+    # pool never drains at a split boundary. results(split) yields (task, result) in task order,
+    # every split must be read in full and in the order it was added
+    
+    def __init__(self, submit: Optional[Callable[[str, Any], Future]], call: Callable[[str, Any], Any],
+                 in_flight: int, observe: Optional[Callable[[Sequence[Future]], None]] = None):
+        self._submit = submit
+        self._call = call
+        self._in_flight = in_flight
+        self._observe = observe
+        self._splits: Deque[Tuple[str, str, Iterator[IndexTask]]] = deque()
+        self._pending: Deque[Tuple[str, IndexTask, Future]] = deque()
+    
+    def add(self, split: str, method: str, tasks: Iterable[IndexTask]) -> None:
+        self._splits.append((split, method, iter(tasks)))
+    
+    def results(self, split: str) -> Iterator[Tuple[IndexTask, Any]]:
+        if self._submit is None:
+            # Serial run, each task runs when its result is read
+            while self._splits and self._splits[0][0] == split:
+                _, method, tasks = self._splits.popleft()
+                for task in tasks:
+                    yield task, self._call(method, task)
+            return
+        
+        while True:
+            self._fill()
+            if not self._pending or self._pending[0][0] != split:
+                return
+            if self._observe is not None:
+                self._observe([future for _, _, future in self._pending])
+            _, task, future = self._pending.popleft()
+            yield task, future.result()
+    
+    def close(self) -> None:
+        # Drop what a failed run has not started yet
+        for _, _, future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self._splits.clear()
+    
+    def _fill(self) -> None:
+        while self._splits and len(self._pending) < self._in_flight:
+            split, method, tasks = self._splits[0]
+            task = next(tasks, None)
+            if task is None:
+                self._splits.popleft()
+                continue
+            self._pending.append((split, task, self._submit(method, task)))
+
+
+class _GuidedChunks:
+    # Guided self-scheduling across all splits of a run: a task takes an equal share of the samples
+    # left for CHUNKS_PER_WORKER tasks per worker, up to max_chunk. Early tasks are large, the last
+    # ones shrink to single samples, so idle workers take over the tail instead of waiting on one
+    # worker with a large chunk
+    
+    def __init__(self, remaining: int, workers: int, max_chunk: int):
+        self.remaining = remaining
+        self.workers = workers
+        self.max_chunk = max_chunk
+    
+    def size(self) -> int:
+        return min(self.max_chunk, max(1, -(-self.remaining // (self.workers * CHUNKS_PER_WORKER))))
+    
+    def take(self, count: int) -> None:
+        self.remaining -= count
+
+
+def _iter_index_tasks(seed: int, split: str, indices: Sequence[int], output_dir: Path,
+                      chunks: _GuidedChunks) -> Iterator[IndexTask]:
+    # Contiguous index ranges, each sized when it is created
+    start, count, limit = None, 0, 0
+    for index in indices:
+        if start is not None and index == start + count and count < limit:
+            count += 1
+            continue
+        if start is not None:
+            chunks.take(count)
+            yield (seed, split, start, count, str(output_dir))
+        start, count, limit = index, 1, chunks.size()
+    if start is not None:
+        chunks.take(count)
+        yield (seed, split, start, count, str(output_dir))
@@ -1,31 +1,123 @@
-from typing import Dict, Type, Any
+from typing import Dict, Type, Any, Optional, Tuple, Union
+import importlib
+import json
+import threading
 from .types import CaptchaType
 from .base import CaptchaGenerator, CaptchaConfig
-from .image import ImageCaptchaGenerator
 from ..config.settings import get_settings
 
+# A Generator Class, Or Its '<module>:<class>' Path To Import On First Use
+GeneratorRef = Union[str, Type[CaptchaGenerator]]
+
 class CaptchaFactory:
     
-    # Register Generators
-    _generators: Dict[CaptchaType, Type[CaptchaGenerator]] = {
-        CaptchaType.IMAGE: ImageCaptchaGenerator
+    # Register Generators (Backends Are Only Imported Once They Are Used)
+    _generators: Dict[CaptchaType, GeneratorRef] = {
+        CaptchaType.IMAGE: 'oopscaptcha.generators.image:ImageCaptchaGenerator'
+    }
+    
+    # Register Rendering Backends, Selected By The 'backend' Param (Default: The Registered Generator)
+    _backends: Dict[CaptchaType, Dict[str, GeneratorRef]] = {
+        CaptchaType.IMAGE: {
+            'captcha': 'oopscaptcha.generators.image:ImageCaptchaGenerator',
+            'numpy': 'oopscaptcha.generators.numpy_image:NumpyImageCaptchaGenerator'
+        }
     }
     
+    # Per-Thread Generator Pools, Instances Are Never Shared Between Threads
+    _local = threading.local()
+    
     @classmethod
     def create(cls, type_: CaptchaType, **kwargs) -> CaptchaGenerator:
         
+        config = cls._build_config(type_, **kwargs)
+        
+        # Create Generator Instance
+        return cls._generator_class(config)(config)
+    
+    @classmethod
+    def acquire(cls, type_: CaptchaType, **kwargs) -> CaptchaGenerator:
+        """Return the calling thread's generator for this effective config, creating it once.
+        
+        Unlike ``create`` the instance is reused by later calls with the same
+        effective config on the same thread, so construction cost is paid once
+        per thread instead of once per use.
+        """
+        return cls.acquire_config(cls._build_config(type_, **kwargs))
+    
+    @classmethod
+    def acquire_config(cls, config: CaptchaConfig,
+                       generator_cls: Optional[Type[CaptchaGenerator]] = None) -> CaptchaGenerator:
+        """Pooled variant of building ``generator_cls(config)`` for an existing config."""
+        if generator_cls is None:
+            if config.type not in cls._generators:
+                raise ValueError(f"Unsupported captcha type: {config.type}")
+            generator_cls = cls._generator_class(config)
+        
+        pool = cls._thread_pool()
+        key = (generator_cls, config.type, cls._params_key(config.params))
+        generator = pool.get(key)
+        if generator is None:
+            generator = generator_cls(config)
+            pool[key] = generator
+        return generator
+    
+    @classmethod
+    def register_backend(cls, type_: CaptchaType, name: str, generator_cls: GeneratorRef) -> None:
+        """Make ``generator_cls`` available as ``backend: <name>`` for ``type_``.
+        
+        ``generator_cls`` may also be a ``'<module>:<class>'`` path, which is
+        only imported when the backend is first used.
+        """
+        cls._backends.setdefault(type_, {})[name] = generator_cls
+    
+    @classmethod
+    def clear_pool(cls) -> None:
+        """Drop every generator pooled by the calling thread."""
+        cls._thread_pool().clear()
+    
+    @classmethod
+    def _build_config(cls, type_: CaptchaType, **kwargs) -> CaptchaConfig:
+        
         if type_ not in cls._generators:
             raise ValueError(f"Unsupported captcha type: {type_}")
         
         # Get Default Config
         settings = get_settings()
-        config_params = settings.get_captcha_config(type_.value)
         
-        # Update Custom Config By Args (Override Default Config)
-        config_params.update(kwargs)
+        # Update Custom Config By Args (Override Default Config Without Mutating It)
+        config_params = {**settings.get_captcha_config(type_.value), **kwargs}
         
         # Create Config Object
-        config = CaptchaConfig(type=type_, params=config_params)
+        return CaptchaConfig(type=type_, params=config_params)
+    
+    @classmethod
+    def _generator_class(cls, config: CaptchaConfig) -> Type[CaptchaGenerator]:
+        backend = config.params.get('backend')
+        if backend is None:
+            return cls._resolve(cls._generators[config.type])
         
-        # Create Generator Instance
-        return cls._generators[type_](config)
\ No newline at end of file
+        backends = cls._backends.get(config.type, {})
+        if backend not in backends:
+            raise ValueError(f"Unsupported backend '{backend}' for captcha type {config.type.value}, "
+                             f"expected one of {tuple(backends)}")
+        return cls._resolve(backends[backend])
+    
+    @staticmethod
+    def _resolve(generator: GeneratorRef) -> Type[CaptchaGenerator]:
+        if not isinstance(generator, str):
+            return generator
+        module, _, name = generator.partition(':')
+        return getattr(importlib.import_module(module), name)
+    
+    @classmethod
+    def _thread_pool(cls) -> Dict[Tuple[Any, ...], CaptchaGenerator]:
+        pool = getattr(cls._local, 'generators', None)
+        if pool is None:
+            pool = cls._local.generators = {}
+        return pool
+    
+    @staticmethod
+    def _params_key(params: Dict[str, Any]) -> str:
+        # Canonical form of the effective params, lists and nested dicts included
+        return json.dumps(params, sort_keys=True, default=str)
\ No newline at end of file
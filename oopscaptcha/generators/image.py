@@ -1,15 +1,244 @@
-from typing import Tuple, Union, Optional
+from __future__ import annotations
+from typing import Any, Tuple, Union, Optional, Sequence, List, Dict
+from collections import OrderedDict
+from functools import cached_property
+import threading
 from captcha.image import ImageCaptcha  # type: ignore
+from PIL import Image  # type: ignore
+from PIL.ImageDraw import Draw, ImageDraw  # type: ignore
+from PIL.ImageFilter import SMOOTH  # type: ignore
 from .base import CaptchaGenerator, CaptchaConfig
 import random
 from io import BytesIO
-from PIL import Image  # type: ignore
 from pathlib import Path
 from ..utils.id_generator import IDGenerator
+from ..utils.lazy import LazyModule
 from ..config.settings import get_settings
 
+# NumPy Is Only Loaded By Batch And Label Array Work
+np = LazyModule('numpy')
+
+ColorTuple = Union[Tuple[int, int, int], Tuple[int, int, int, int]]
+
+# Glyphs Kept By The Opt-In Rasterization Cache
+DEFAULT_GLYPH_CACHE_SIZE = 1024
+
+# Channels Per Supported Array Color Mode
+COLOR_MODES = {'L': 1, 'RGB': 3}
+
+# Encoded Sample Formats: Pillow Format And File Extension ('raw' Is Uncompressed Netpbm)
+ENCODING_FORMATS = {'png': ('PNG', 'png'), 'webp': ('WEBP', 'webp'), 'jpeg': ('JPEG', 'jpg'), 'raw': ('PPM', 'ppm')}
+ENCODING_MODES = (None, 'RGB', 'L', 'P')
+
+# Encoding Profile Keys, None Leaves The Setting To Pillow
+DEFAULT_ENCODING = {
+    'format': 'png',
+    'mode': None,
+    'colors': 256,
+    'compress_level': None,
+    'quality': None,
+    'lossless': False,
+    'optimize': False
+}
+
+# Redraw Rounds Before Giving Up On Unique Balanced Labels
+MAX_UNIQUE_ROUNDS = 100
+
+# Unseeded Rendering Stays Unpredictable, Like Upstream's Use Of secrets
+_system_random = random.SystemRandom()
+
+
+def _random_color(rng: random.Random, start: int, end: int, opacity: Optional[int] = None) -> ColorTuple:
+    red = rng.randrange(end - start + 1) + start
+    green = rng.randrange(end - start + 1) + start
+    blue = rng.randrange(end - start + 1) + start
+    if opacity is None:
+        return red, green, blue
+    return red, green, blue, opacity
+
+
+class ImageCaptchaRenderer(ImageCaptcha):
+    """``captcha.image.ImageCaptcha`` with an injectable random source.
+    
+    Draws the same way as upstream, but every random decision is taken from
+    the ``rng`` passed to ``generate``/``generate_image`` so a seeded stream
+    reproduces the image exactly. Without ``rng`` the OS CSPRNG is used.
+    
+    With a positive ``glyph_cache_size`` each ``(font, size, character)`` is
+    rasterized once into a coverage mask kept in an LRU cache, and per-sample
+    work is reduced to coloring, rotating, warping and compositing it.
+    """
+    
+    def __init__(self, width: int = 160, height: int = 60, fonts: Optional[List[str]] = None,
+                 font_sizes: Optional[Tuple[int, ...]] = None, glyph_cache_size: int = 0):
+        super().__init__(width=width, height=height, fonts=fonts, font_sizes=font_sizes)
+        if glyph_cache_size < 0:
+            raise ValueError(f"Invalid glyph_cache_size: {glyph_cache_size}")
+        self.glyph_cache_size = glyph_cache_size
+        self.glyph_cache_hits = 0
+        self.glyph_cache_misses = 0
+        self._glyphs: 'OrderedDict[Tuple[str, int, str], Tuple[int, int, Optional[Image.Image]]]' = OrderedDict()
+        self._glyph_lock = threading.Lock()
+    
+    def _glyph(self, c: str, font, draw: ImageDraw) -> Tuple[int, int, Optional[Image.Image]]:
+        # Layout box and ink-cropped coverage mask of one glyph, rasterized on first use
+        key = (str(font.path), font.size, c)
+        with self._glyph_lock:
+            glyph = self._glyphs.get(key)
+            if glyph is not None:
+                self._glyphs.move_to_end(key)
+                self.glyph_cache_hits += 1
+                return glyph
+        
+        _, _, w, h = draw.multiline_textbbox((1, 1), c, font=font)
+        
+        # Leave room for the largest upstream offset so left/top bearings are not clipped
+        dx, dy = self.character_offset_dx[1], self.character_offset_dy[1]
+        mask = Image.new('L', (int(w) + dx, int(h) + dy))
+        Draw(mask).text((dx, dy), c, font=font, fill=255)
+        bbox = mask.getbbox()
+        glyph = (w, h, mask.crop(bbox) if bbox else None)
+        
+        with self._glyph_lock:
+            self.glyph_cache_misses += 1
+            self._glyphs[key] = glyph
+            while len(self._glyphs) > self.glyph_cache_size:
+                self._glyphs.popitem(last=False)
+        return glyph
+    
+
+    @staticmethod
+    def create_noise_curve(image: Image.Image, color: ColorTuple, rng: random.Random = _system_random) -> Image.Image:
+        w, h = image.size
+        x1 = rng.randrange(int(w / 5) + 1)
+        x2 = rng.randrange(w - int(w / 5) + 1) + int(w / 5)
+        y1 = rng.randrange(h - 2 * int(h / 5) + 1) + int(h / 5)
+        y2 = rng.randrange(h - y1 - int(h / 5) + 1) + y1
+        end = rng.randrange(41) + 160
+        start = rng.randrange(21)
+        Draw(image).arc([x1, y1, x2, y2], start, end, fill=color)
+        return image
+    
+    @staticmethod
+    def create_noise_dots(image: Image.Image, color: ColorTuple, width: int = 3, number: int = 30,
+                          rng: random.Random = _system_random) -> Image.Image:
+        draw = Draw(image)
+        w, h = image.size
+        for _ in range(number):
+            x1 = rng.randrange(w + 1)
+            y1 = rng.randrange(h + 1)
+            draw.line(((x1, y1), (x1 - 1, y1 - 1)), fill=color, width=width)
+        return image
+    
+    def _draw_character(self, c: str, draw: ImageDraw, color: ColorTuple,
+                        rng: random.Random = _system_random) -> Image.Image:
+        font = rng.choice(self.truefonts)
+        
+        if self.glyph_cache_size:
+            # Offsets are still drawn so cached and uncached rendering consume the same stream
+            w, h, mask = self._glyph(c, font, draw)
+            dx1 = rng.randrange(self.character_offset_dx[1] - self.character_offset_dx[0] + 1) + self.character_offset_dx[0]
+            dy1 = rng.randrange(self.character_offset_dy[1] - self.character_offset_dy[0] + 1) + self.character_offset_dy[0]
+            if mask is None:
+                im = Image.new('RGBA', (int(w) + dx1, int(h) + dy1))
+            else:
+                im = Image.new('RGBA', mask.size)
+                im.paste(color, mask=mask)
+        else:
+            _, _, w, h = draw.multiline_textbbox((1, 1), c, font=font)
+            
+            dx1 = rng.randrange(self.character_offset_dx[1] - self.character_offset_dx[0] + 1) + self.character_offset_dx[0]
+            dy1 = rng.randrange(self.character_offset_dy[1] - self.character_offset_dy[0] + 1) + self.character_offset_dy[0]
+            im = Image.new('RGBA', (int(w) + dx1, int(h) + dy1))
+            Draw(im).text((dx1, dy1), c, font=font, fill=color)
+            im = im.crop(im.getbbox())
+        
+        # Rotate
+        im = im.rotate(
+            self.character_rotate[0] + rng.random() * (self.character_rotate[1] - self.character_rotate[0]),
+            Image.Resampling.BILINEAR,
+            expand=True,
+        )
+        
+        # Warp
+        return self._warp(im, w, h, rng)
+    
+    def _warp(self, im: Image.Image, w: float, h: float, rng: random.Random) -> Image.Image:
+        dx2 = w * rng.random() * (self.character_warp_dx[1] - self.character_warp_dx[0]) + self.character_warp_dx[0]
+        dy2 = h * rng.random() * (self.character_warp_dy[1] - self.character_warp_dy[0]) + self.character_warp_dy[0]
+        x1 = int(rng.random() * (dx2 - (-dx2)) + (-dx2))
+        y1 = int(rng.random() * (dy2 - (-dy2)) + (-dy2))
+        x2 = int(rng.random() * (dx2 - (-dx2)) + (-dx2))
+        y2 = int(rng.random() * (dy2 - (-dy2)) + (-dy2))
+        w2 = int(w) + abs(x1) + abs(x2)
+        h2 = int(h) + abs(y1) + abs(y2)
+        data = (
+            x1, y1,
+            -x1, h2 - y2,
+            w2 + x2, h2 + y2,
+            w2 - x2, -y1,
+        )
+        im = im.resize((w2, h2))
+        return im.transform((int(w), int(h)), Image.Transform.QUAD, data)
+    
+    def create_captcha_image(self, chars: str, color: ColorTuple, background: ColorTuple,
+                             rng: random.Random = _system_random) -> Image.Image:
+        image = Image.new('RGB', (self._width, self._height), background)
+        draw = Draw(image)
+        
+        images: List[Image.Image] = []
+        for c in chars:
+            if rng.random() > self.word_space_probability:
+                images.append(self._draw_character(" ", draw, color, rng))
+            images.append(self._draw_character(c, draw, color, rng))
+        
+        text_width = sum(im.size[0] for im in images)
+        
+        width = max(text_width, self._width)
+        image = image.resize((width, self._height))
+        
+        average = int(text_width / len(chars))
+        rand = int(self.word_offset_dx * average)
+        offset = int(average * 0.1)
+        
+        for im in images:
+            w, h = im.size
+            mask = im.convert('L').point(self.lookup_table)
+            image.paste(im, (offset, int((self._height - h) / 2)), mask)
+            offset = offset + w + (-rng.randrange(rand + 1))
+        
+        if width > self._width:
+            image = image.resize((self._width, self._height))
+        
+        return image
+    
+    def generate_image(self, chars: str, bg_color: Optional[ColorTuple] = None,
+                       fg_color: Optional[ColorTuple] = None,
+                       rng: Optional[random.Random] = None) -> Image.Image:
+        rng = rng or _system_random
+        background = bg_color if bg_color else _random_color(rng, 238, 255)
+        random_fg_color = _random_color(rng, 10, 200, rng.randrange(36) + 220)
+        color = fg_color if fg_color else random_fg_color
+        
+        im = self.create_captcha_image(chars, color, background, rng)
+        self.create_noise_dots(im, color, rng=rng)
+        self.create_noise_curve(im, color, rng=rng)
+        return im.filter(SMOOTH)
+    
+    def generate(self, chars: str, format: str = 'png', bg_color: Optional[ColorTuple] = None,
+                 fg_color: Optional[ColorTuple] = None, rng: Optional[random.Random] = None) -> BytesIO:
+        im = self.generate_image(chars, bg_color=bg_color, fg_color=fg_color, rng=rng)
+        out = BytesIO()
+        im.save(out, format=format)
+        out.seek(0)
+        return out
+
+
 class ImageCaptchaGenerator(CaptchaGenerator[BytesIO, str]):
     
+    sample_extension = 'png'
+    label_extension = 'txt'
+    
     def __init__(self, config: CaptchaConfig):
         super().__init__(config)
         # Get or Set Params
@@ -23,6 +252,12 @@ class ImageCaptchaGenerator(CaptchaGenerator[BytesIO, str]):
         self.fonts = params.get('fonts') if 'fonts' in params else captcha_config.get('fonts')
         self.characters = params.get('characters') if 'characters' in params else captcha_config.get('characters')
         self.output_dir = params.get('output_dir') if 'output_dir' in params else captcha_config.get('output_dir')
+        self.glyph_cache = params.get('glyph_cache') if 'glyph_cache' in params else captcha_config.get('glyph_cache', False)
+        self.glyph_cache_size = params.get('glyph_cache_size') if 'glyph_cache_size' in params else captcha_config.get('glyph_cache_size', DEFAULT_GLYPH_CACHE_SIZE)
+        self.color_mode = params.get('color_mode') if 'color_mode' in params else captcha_config.get('color_mode', 'RGB')
+        
+        # Encoding Keys Given In Params Override Those Of The Config One By One
+        self.encoding = {**DEFAULT_ENCODING, **(captcha_config.get('encoding') or {}), **(params.get('encoding') or {})}
 
         # Check Required Params
         if self.width is None:
@@ -38,18 +273,112 @@ class ImageCaptchaGenerator(CaptchaGenerator[BytesIO, str]):
         if self.output_dir is None:
             raise ValueError(f"Missing required parameter 'output_dir' and no default value in configuration for CAPTCHA type '{config.type.value}'")
         
+        if self.color_mode not in COLOR_MODES:
+            raise ValueError(f"Invalid color_mode: {self.color_mode}, expected one of {tuple(COLOR_MODES)}")
+        
         self.output_dir = Path(self.output_dir)
         
+        self._save_format, self._save_params = self._encoding_options()
+        # Pillow writes raw grayscale as PGM (P5), name it so
+        self.sample_extension = ('pgm' if self.encoding['format'] == 'raw' and self.encoding['mode'] == 'L'
+                                 else ENCODING_FORMATS[self.encoding['format']][1])
+        
         # Create Image Generator
-        self.generator = ImageCaptcha(
+        self.generator = self._create_renderer()
+    
+    # Character Tables Are Built On First Use, So Single Samples Never Load NumPy
+    @cached_property
+    def _char_codes(self) -> np.ndarray:
+        return np.frombuffer(str(self.characters).encode('utf-32-le'), dtype=np.uint32)
+    
+    # Character Index Lookup By Code Point, First Occurrence Wins
+    @cached_property
+    def _char_lookup(self) -> np.ndarray:
+        codes = self._char_codes
+        lookup = np.full(int(codes.max()) + 1 if codes.size else 0, -1, dtype=np.int64)
+        lookup[codes[::-1]] = np.arange(len(codes))[::-1]
+        return lookup
+    
+    @cached_property
+    def _char_table(self) -> np.ndarray:
+        return np.array(list(self.characters))
+    
+    @cached_property
+    def label_dtype(self) -> type:
+        return np.uint8 if len(self._char_codes) <= 256 else np.uint16
+    
+    # First-Occurrence Index Of Every Character Slot, And Of Every Distinct Character
+    @cached_property
+    def _slot_index(self) -> np.ndarray:
+        return self._char_lookup[self._char_codes].astype(self.label_dtype)
+    
+    @cached_property
+    def _alphabet(self) -> np.ndarray:
+        return np.unique(self._slot_index)
+    
+    # Distinct Characters In Order Of First Occurrence, Like _alphabet Without NumPy
+    @cached_property
+    def _distinct_characters(self) -> str:
+        return ''.join(dict.fromkeys(str(self.characters)))
+    
+    # Validate The Encoding Profile And Translate It Into Pillow Save Arguments
+    def _encoding_options(self) -> Tuple[str, Dict[str, Any]]:
+        encoding = self.encoding
+        unknown = set(encoding) - set(DEFAULT_ENCODING)
+        if unknown:
+            raise ValueError(f"Unknown encoding keys: {sorted(unknown)}, expected some of {tuple(DEFAULT_ENCODING)}")
+        
+        format_ = encoding['format']
+        if format_ not in ENCODING_FORMATS:
+            raise ValueError(f"Invalid encoding format: {format_}, expected one of {tuple(ENCODING_FORMATS)}")
+        if encoding['mode'] not in ENCODING_MODES:
+            raise ValueError(f"Invalid encoding mode: {encoding['mode']}, expected one of {ENCODING_MODES}")
+        if encoding['mode'] == 'P' and format_ != 'png':
+            raise ValueError(f"Palette mode 'P' is only supported by the png encoding, got '{format_}'")
+        if not 2 <= encoding['colors'] <= 256:
+            raise ValueError(f"Invalid encoding colors: {encoding['colors']}, must be in [2, 256]")
+        
+        # compress_level is the zlib level for PNG and the speed/size method for WebP
+        level, quality = encoding['compress_level'], encoding['quality']
+        max_level = {'png': 9, 'webp': 6}.get(format_)
+        if level is not None and (max_level is None or not 0 <= level <= max_level):
+            raise ValueError(f"Invalid compress_level {level} for encoding '{format_}'"
+                             + (f", must be in [0, {max_level}]" if max_level is not None else ""))
+        if quality is not None and (format_ not in ('webp', 'jpeg') or not 1 <= quality <= 100):
+            raise ValueError(f"Invalid quality {quality} for encoding '{format_}', only webp and jpeg take a quality in [1, 100]")
+        
+        options: Dict[str, Any] = {}
+        if format_ == 'png':
+            options['optimize'] = bool(encoding['optimize'])
+            if level is not None:
+                options['compress_level'] = level
+        elif format_ == 'webp':
+            options['lossless'] = bool(encoding['lossless'])
+            if level is not None:
+                options['method'] = level
+        elif format_ == 'jpeg':
+            options['optimize'] = bool(encoding['optimize'])
+        if quality is not None:
+            options['quality'] = quality
+        return ENCODING_FORMATS[format_][0], options
+    
+    # Build The Renderer Drawing The Images (Overridden By Other Backends)
+    def _create_renderer(self) -> ImageCaptchaRenderer:
+        return ImageCaptchaRenderer(
             width=self.width,
             height=self.height,
-            fonts=self.fonts
+            fonts=self.fonts,
+            glyph_cache_size=self.glyph_cache_size if self.glyph_cache else 0
         )
     
+    # Load TrueType Fonts Before First Use
+    def warmup(self) -> None:
+        self.generator.truefonts
+    
     # Generate Random Text
-    def generate_label(self) -> str:
-        return ''.join(random.choice(self.characters) 
+    def generate_label(self, rng: Optional[random.Random] = None) -> str:
+        rng = rng or random  # type: ignore
+        return ''.join(rng.choice(self.characters) 
                       for _ in range(self.length))
     
     def _save_label(self, label: str, path: Union[str, Path]) -> Path:
@@ -65,8 +394,24 @@ class ImageCaptchaGenerator(CaptchaGenerator[BytesIO, str]):
         except Exception as e:
             raise IOError(f"Failed to save captcha label to {path}: {e}")
     
-    def generate_sample(self, label: str) -> BytesIO:
-        return self.generator.generate(str(label))
+    def generate_sample(self, label: str, rng: Optional[random.Random] = None) -> BytesIO:
+        return self.encode_rendered(self.render_sample(label, rng))
+    
+    def render_sample(self, label: str, rng: Optional[random.Random] = None) -> Image.Image:
+        return self.generator.generate_image(str(label), rng=rng)
+    
+    # Encode With The Configured Profile, Converting To Grayscale Or A Palette First If Asked
+    def encode_rendered(self, rendered: Image.Image) -> BytesIO:
+        mode = self.encoding['mode']
+        if mode == 'P':
+            rendered = rendered.quantize(colors=self.encoding['colors'], method=Image.Quantize.FASTOCTREE)
+        elif mode is not None and rendered.mode != mode:
+            rendered = rendered.convert(mode)
+        
+        out = BytesIO()
+        rendered.save(out, format=self._save_format, **self._save_params)
+        out.seek(0)
+        return out
 
     def _save_sample(self, sample: BytesIO, path: Union[str, Path]) -> Path:
         
@@ -75,19 +420,152 @@ class ImageCaptchaGenerator(CaptchaGenerator[BytesIO, str]):
         path_obj.parent.mkdir(parents=True, exist_ok=True)
         
         try:
-            with BytesIO(sample.getvalue()) as image_data:
-                with Image.open(image_data) as img:
-                    img.save(path_obj)
+            # Sample is already encoded, write its buffer without copying or re-encoding
+            with sample.getbuffer() as image_data, open(path_obj, 'wb') as f:
+                f.write(image_data)
             return path_obj
         except Exception as e:
             raise IOError(f"Failed to save captcha image to {path}: {e}")
     
-    def generate(self) -> Tuple[BytesIO, str]:
-        text = self.generate_label()
-        image = self.generate_sample(str(text))
+    def encode_sample(self, sample: BytesIO) -> bytes:
+        return sample.getvalue()
+    
+    # Render Labels (Or A Count) Into One uint8 Array Of Shape (N, height, width, channels)
+    def generate_batch(self, labels: Union[int, Sequence[str]], rngs: Optional[Sequence[random.Random]] = None,
+                       color_mode: Optional[str] = None,
+                       out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        if isinstance(labels, int):
+            labels = [self.generate_label() for _ in range(labels)]
+        
+        color_mode = self.color_mode if color_mode is None else color_mode
+        if color_mode not in COLOR_MODES:
+            raise ValueError(f"Invalid color_mode: {color_mode}, expected one of {tuple(COLOR_MODES)}")
+        
+        shape = (len(labels), self.height, self.width, COLOR_MODES[color_mode])
+        if out is None:
+            out = np.empty(shape, dtype=np.uint8)
+        elif out.shape != shape or out.dtype != np.uint8:
+            raise ValueError(f"Invalid output array: expected uint8 {shape}, got {out.dtype} {out.shape}")
+        
+        # Pixels go straight from the PIL image into the batch, no PNG round trip
+        for i, label in enumerate(labels):
+            image = self.generator.generate_image(str(label), rng=rngs[i] if rngs is not None else None)
+            if image.mode != color_mode:
+                image = image.convert(color_mode)
+            out[i] = np.asarray(image).reshape(shape[1:])
+        
+        return out, self.encode_labels(labels)
+    
+    # Number Of Distinct Labels
+    def label_space(self) -> int:
+        return len(self._distinct_characters) ** self.length
+    
+    # Label Number n In [0, label_space()), Its Base-K Digits Over The Distinct Characters
+    def label_at(self, number: int) -> str:
+        if not 0 <= number < self.label_space():
+            raise ValueError(f"Invalid label number: {number}, must be in [0, {self.label_space()})")
+        size = len(self._distinct_characters)
+        chars = []
+        for _ in range(self.length):
+            number, digit = divmod(number, size)
+            chars.append(self._distinct_characters[digit])
+        return ''.join(reversed(chars))
+    
+    # Draw An (N, length) Array Of Indices Into characters In Bulk
+    def generate_label_indices(self, n: int, rng: Optional[Union[int, np.random.Generator]] = None,
+                               unique: bool = False, balance: bool = False) -> np.ndarray:
+        """Draw ``n`` labels at once as indices into ``characters``, like ``encode_labels`` returns.
+        
+        ``rng`` is a NumPy ``Generator`` or seed. With ``unique`` no label repeats
+        (a ``ValueError`` is raised up front if ``n`` exceeds ``label_space()``).
+        With ``balance`` every distinct character occurs ``n * length // K`` or
+        one more times over the batch instead of being drawn independently.
+        """
+        if n < 0:
+            raise ValueError(f"Invalid n: {n}")
+        if unique and n > self.label_space():
+            raise ValueError(f"Cannot draw {n} unique labels, only {self.label_space()} exist "
+                             f"for length {self.length} over {len(self._alphabet)} characters")
+        
+        rng = np.random.default_rng(rng)
+        size = len(self._alphabet)
+        if balance:
+            # A shuffled, evenly repeated alphabet
+            indices = rng.permutation(np.resize(self._alphabet, n * self.length)).reshape(n, self.length)
+        elif unique and self.label_space() <= np.iinfo(np.int64).max:
+            # Sample distinct label numbers without replacement, then split them into base-K digits
+            numbers = rng.choice(self.label_space(), size=n, replace=False)
+            if self.label_space() <= np.iinfo(np.uint32).max:
+                numbers = numbers.astype(np.uint32)
+            digits = np.empty((n, self.length), dtype=numbers.dtype)
+            for position in range(self.length - 1, -1, -1):
+                numbers, digits[:, position] = np.divmod(numbers, size)
+            return self._alphabet[digits]
+        else:
+            indices = self._draw_indices(rng, (n, self.length))
+        
+        if unique:
+            indices = self._make_unique(indices, rng, balance)
+        return indices.astype(self.label_dtype)
+    
+    # Draw N Labels At Once, Returned As An Array Of Strings
+    def generate_labels(self, n: int, rng: Optional[Union[int, np.random.Generator]] = None,
+                        unique: bool = False, balance: bool = False) -> np.ndarray:
+        indices = self.generate_label_indices(n, rng, unique=unique, balance=balance)
+        chars = np.ascontiguousarray(self._char_codes[indices])
+        return chars.view(f'<U{self.length}').reshape(n)
+    
+    def _draw_indices(self, rng: np.random.Generator, shape: Tuple[int, int]) -> np.ndarray:
+        # Every slot of characters is equally likely, like random.choice
+        positions = rng.integers(0, len(self._slot_index), shape, dtype=self.label_dtype)
+        if len(self._alphabet) == len(self._slot_index):
+            return positions
+        return self._slot_index[positions]
+    
+    def _make_unique(self, indices: np.ndarray, rng: np.random.Generator, balance: bool) -> np.ndarray:
+        flat = indices.reshape(-1)
+        for _ in range(MAX_UNIQUE_ROUNDS):
+            rows = np.ascontiguousarray(indices).view(np.dtype((np.void, indices.dtype.itemsize * self.length))).ravel()
+            _, first = np.unique(rows, return_index=True)
+            if len(first) == len(rows):
+                return indices
+            
+            duplicate = np.ones(len(rows), dtype=bool)
+            duplicate[first] = False
+            if balance:
+                # Swap the cells of repeated rows with random cells, character counts stay balanced
+                cells = np.flatnonzero(np.repeat(duplicate, self.length))
+                others = rng.integers(0, flat.size, cells.size)
+                flat[cells], flat[others] = flat[others], flat[cells].copy()
+            else:
+                indices[duplicate] = self._draw_indices(rng, (int(duplicate.sum()), self.length))
+        raise ValueError(f"Could not draw {len(indices)} unique labels in {MAX_UNIQUE_ROUNDS} rounds")
+    
+    # Map Labels To An (N, length) Array Of Indices Into characters
+    def encode_labels(self, labels: Sequence[str]) -> np.ndarray:
+        codes = np.frombuffer(''.join(labels).encode('utf-32-le'), dtype=np.uint32)
+        if codes.size != len(labels) * self.length:
+            raise ValueError(f"All labels must have length {self.length}")
+        
+        indices = np.full(codes.shape, -1, dtype=np.int64)
+        known = codes < self._char_lookup.size
+        indices[known] = self._char_lookup[codes[known]]
+        if (indices < 0).any():
+            raise ValueError(f"Labels contain characters outside of '{self.characters}'")
+        
+        return indices.astype(self.label_dtype).reshape(len(labels), self.length)
+    
+    # Map An (N, length) Index Array Back To Label Strings
+    def decode_labels(self, indices: np.ndarray) -> List[str]:
+        chars = np.ascontiguousarray(self._char_table[np.asarray(indices)])
+        return chars.view(f'<U{chars.shape[-1]}').ravel().tolist()
+    
+    def generate(self, rng: Optional[random.Random] = None) -> Tuple[BytesIO, str]:
+        text = self.generate_label(rng)
+        image = self.generate_sample(str(text), rng)
         return image, text
                       
-    def save(self, sample: BytesIO, label: str, output_dir: Optional[Union[str, Path]] = None, use_timestamp_dir: bool = True) -> Tuple[Path, Path]:
+    def save(self, sample: BytesIO, label: str, output_dir: Optional[Union[str, Path]] = None, use_timestamp_dir: bool = True, key: Optional[str] = None) -> Tuple[Path, Path]:
         if output_dir is None:
             base_dir = self.output_dir
         else:
@@ -104,11 +582,11 @@ class ImageCaptchaGenerator(CaptchaGenerator[BytesIO, str]):
         images_dir.mkdir(parents=True, exist_ok=True)
         labels_dir.mkdir(parents=True, exist_ok=True)
         
-        # Generate Unique Filename
-        base_filename = IDGenerator.generate_captcha_id()
+        # Generate Unique Filename Unless The Caller Derived One
+        base_filename = key if key is not None else IDGenerator.generate_captcha_id()
         
         # Save Sample and Label
-        sample_path = self._save_sample(sample, images_dir / f"{base_filename}.png")
-        label_path = self._save_label(label, labels_dir / f"{base_filename}.txt")
+        sample_path = self._save_sample(sample, images_dir / f"{base_filename}.{self.sample_extension}")
+        label_path = self._save_label(label, labels_dir / f"{base_filename}.{self.label_extension}")
         
         return sample_path, label_path
\ No newline at end of file
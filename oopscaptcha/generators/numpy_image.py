@@ -0,0 +1,364 @@
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import random
+import threading
+from captcha.image import DEFAULT_FONTS  # type: ignore
+from PIL import Image  # type: ignore
+from PIL.ImageDraw import Draw  # type: ignore
+from PIL.ImageFont import FreeTypeFont, truetype  # type: ignore
+import numpy as np  # type: ignore
+from .image import ImageCaptchaGenerator, COLOR_MODES
+
+# Same Sizes As captcha.image.ImageCaptcha
+DEFAULT_FONT_SIZES = (42, 50, 56)
+
+# Uniform Draws Per Sample, Per Character And Per Noise Dot (See _layout)
+SAMPLE_PARAMS = 25
+CHAR_PARAMS = 6
+NOISE_DOTS = 30
+
+# Points Sampled Along The Noise Arc
+CURVE_POINTS = 256
+
+# Offsets Covered By One Noise Dot, Like A 3px Wide Line From (x, y) To (x - 1, y - 1)
+_DOT_OFFSETS = np.array([(dy, dx) for dy in (-2, -1, 0) for dx in (-2, -1, 0)])
+
+
+def _lerp(bounds: Tuple[float, float], u: np.ndarray) -> np.ndarray:
+    return bounds[0] + u * (bounds[1] - bounds[0])
+
+
+class NumpyCaptchaRenderer:
+    """Image CAPTCHA renderer that does the per-pixel work as NumPy array operations.
+
+    Every ``(font, character)`` is rasterized once into a glyph atlas. Rendering
+    then only draws a few random parameters per sample and character; the
+    gradient background, per-character rotation, scale and shear combined with
+    a sine warp (one bilinear gather per character position), the foreground
+    color with its jitter across the text, noise dots, noise arc and PIL's
+    SMOOTH filter are computed for a whole batch at once.
+
+    A sample's parameters come only from its own ``rng``, so it renders to the
+    same pixels alone or as part of any batch. Without ``rng`` the OS entropy
+    source is used.
+    """
+
+    character_rotate: Tuple[float, float] = (-30, 30)
+    character_scale: Tuple[float, float] = (0.85, 1.1)
+    character_shear: Tuple[float, float] = (-0.25, 0.25)
+    character_overlap: Tuple[float, float] = (0.0, 0.25)
+    character_offset_dy: Tuple[float, float] = (-0.08, 0.08)
+    color_jitter: float = 24
+    background_gradient: float = 14
+    # Sine warp amplitude in pixels at height 60 and period relative to the image size
+    warp_amplitude: Tuple[float, float] = (1.0, 3.0)
+    warp_period: Tuple[float, float] = (0.4, 1.0)
+
+    def __init__(self, width: int = 160, height: int = 60, fonts: Optional[List[str]] = None,
+                 font_sizes: Optional[Tuple[int, ...]] = None):
+        self._width = width
+        self._height = height
+        self._fonts = fonts or DEFAULT_FONTS
+        self._font_sizes = font_sizes or DEFAULT_FONT_SIZES
+        self._truefonts: List[FreeTypeFont] = []
+
+        # Square atlas cells with a blank border, so out-of-glyph samples read zero
+        self._box = max(self._font_sizes) * 3 // 2
+        self._atlas = np.zeros((0, self._box, self._box), dtype=np.float32)
+        self._extents = np.zeros((0, 2), dtype=np.float32)
+        self._glyph_index: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def truefonts(self) -> List[FreeTypeFont]:
+        if not self._truefonts:
+            self._truefonts = [truetype(n, s) for n in self._fonts for s in self._font_sizes]
+        return self._truefonts
+
+    def prepare(self, characters: str) -> None:
+        """Rasterize every font variant of the ``characters`` missing from the atlas."""
+        if all(c in self._glyph_index for c in characters):
+            return
+
+        with self._lock:
+            missing = [c for c in dict.fromkeys(characters) if c not in self._glyph_index]
+            if not missing:
+                return
+
+            fonts = self.truefonts
+            glyphs = np.zeros((len(missing) * len(fonts), self._box, self._box), dtype=np.float32)
+            extents = np.zeros((len(glyphs), 2), dtype=np.float32)
+            for i, c in enumerate(missing):
+                for j, font in enumerate(fonts):
+                    extents[i * len(fonts) + j] = self._rasterize(c, font, glyphs[i * len(fonts) + j])
+
+            # Publish the grown atlas before its indices, readers never see an index past it
+            base = len(self._atlas)
+            self._atlas = np.concatenate([self._atlas, glyphs])
+            self._extents = np.concatenate([self._extents, extents])
+            for i, c in enumerate(missing):
+                self._glyph_index[c] = base + i * len(fonts)
+
+    def _rasterize(self, c: str, font: FreeTypeFont, out: np.ndarray) -> Tuple[int, int]:
+        # Ink-cropped coverage of one glyph, centered in its atlas cell
+        box = self._box
+        mask = Image.new('L', (2 * box, 2 * box))
+        Draw(mask).text((box // 2, box // 2), c, font=font, fill=255)
+        bbox = mask.getbbox()
+        if bbox is None:
+            return 0, 0
+
+        ink = np.asarray(mask.crop(bbox), dtype=np.float32)[:box - 2, :box - 2] / 255
+        h, w = ink.shape
+        top, left = (box - h) // 2, (box - w) // 2
+        out[top:top + h, left:left + w] = ink
+        return w, h
+
+    def generate_image(self, chars: str, rng: Optional[random.Random] = None) -> Image.Image:
+        return Image.fromarray(self.render_batch([chars], [rng])[0])
+
+    def render_batch(self, labels: Sequence[str],
+                     rngs: Optional[Sequence[Optional[random.Random]]] = None) -> np.ndarray:
+        """Render equally long ``labels`` into one uint8 array of shape (N, height, width, 3)."""
+        n = len(labels)
+        length = len(labels[0]) if n else 0
+        if any(len(label) != length for label in labels):
+            raise ValueError("All labels of a batch must have the same length")
+        if rngs is not None and len(rngs) != n:
+            raise ValueError(f"Expected {n} rngs, got {len(rngs)}")
+
+        self.prepare(''.join(labels))
+        u = self._uniforms(n, length, rngs)
+        s = u[:, :SAMPLE_PARAMS]
+
+        # Planar float32 channels (N, 3, height, width) until the final conversion
+        image = self._background(s)
+        if length:
+            self._draw_text(image, self._coverage(labels, u), s)
+        self._draw_noise(image, u)
+        return self._smooth(image).transpose(0, 2, 3, 1).copy()
+
+    def _uniforms(self, n: int, length: int,
+                  rngs: Optional[Sequence[Optional[random.Random]]]) -> np.ndarray:
+        # All randomness of a sample is one row of uniforms drawn from its own stream
+        size = SAMPLE_PARAMS + length * CHAR_PARAMS + 2 * NOISE_DOTS
+        if rngs is None or all(rng is None for rng in rngs):
+            return np.random.default_rng().random((n, size))
+
+        u = np.empty((n, size))
+        for i, rng in enumerate(rngs):
+            seed = (rng or random.SystemRandom()).getrandbits(64)
+            u[i] = np.random.default_rng(seed).random(size)
+        return u
+
+    def _background(self, s: np.ndarray) -> np.ndarray:
+        # Light color per sample with a linear gradient in a random direction
+        h, w = self._height, self._width
+        color = (238 + np.floor(s[:, 0:3] * 18)).astype(np.float32)
+        angle = s[:, 3] * 2 * np.pi
+        amount = (s[:, 4] * 2 - 1) * self.background_gradient
+        x = (np.arange(w) / w - 0.5) * (amount * np.cos(angle))[:, None]
+        y = (np.arange(h) / h - 0.5) * (amount * np.sin(angle))[:, None]
+        gradient = y.astype(np.float32)[:, :, None] + x.astype(np.float32)[:, None, :]
+        image = color[:, :, None, None] + gradient[:, None]
+        return np.minimum(image, 255, out=image)
+
+    def _layout(self, labels: Sequence[str], u: np.ndarray) -> Dict[str, np.ndarray]:
+        # Glyph, inverse transform and placement of every character, shape (N, length)
+        n, length = len(labels), len(labels[0])
+        s = u[:, :SAMPLE_PARAMS]
+        c = u[:, SAMPLE_PARAMS:SAMPLE_PARAMS + length * CHAR_PARAMS].reshape(n, length, CHAR_PARAMS)
+
+        fonts = len(self.truefonts)
+        base = np.array([[self._glyph_index[ch] for ch in label] for label in labels], dtype=np.int64)
+        glyph = base + np.minimum((c[..., 0] * fonts).astype(np.int64), fonts - 1)
+        ink_w, ink_h = self._extents[glyph, 0], self._extents[glyph, 1]
+
+        angle = np.radians(_lerp(self.character_rotate, c[..., 1]))
+        scale = _lerp(self.character_scale, c[..., 2])
+        shear = _lerp(self.character_shear, c[..., 3])
+        cos, sin = np.abs(np.cos(angle)), np.abs(np.sin(angle))
+
+        # Squeeze the text into the image like upstream's resize, rotated extents decide the fit
+        rot_w = scale * (ink_w * cos + ink_h * sin + np.abs(shear) * ink_h)
+        rot_h = scale * (ink_w * sin + ink_h * cos)
+        advance = rot_w * (1 - _lerp(self.character_overlap, c[..., 4]))
+        text_w = np.maximum(advance.sum(axis=1), 1)
+        fx = np.minimum(1, 0.92 * self._width / text_w)
+        fy = np.minimum(1, 0.85 * self._height / np.maximum(rot_h.max(axis=1), 1))
+
+        x0 = (self._width - fx * text_w) * s[:, 5]
+        cx = x0[:, None] + fx[:, None] * (np.cumsum(advance, axis=1) - advance / 2)
+        cy = self._height * (0.5 + _lerp(self.character_offset_dy, c[..., 5]))
+
+        # Inverse of diag(fx, fy) . rotation . shear . scale, mapping image offsets to glyph offsets
+        ca, sa = np.cos(angle), np.sin(angle)
+        ifx, ify = 1 / (fx[:, None] * scale), 1 / (fy[:, None] * scale)
+        inverse = np.stack([
+            (ca + shear * sa) * ifx, (sa - shear * ca) * ify,
+            -sa * ifx, ca * ify
+        ], axis=-1)
+        return {'glyph': glyph, 'cx': cx, 'cy': cy, 'inverse': inverse, 'half_width': fx[:, None] * rot_w / 2}
+
+    def _coverage(self, labels: Sequence[str], u: np.ndarray) -> np.ndarray:
+        # Text coverage (N, height, width) of all characters, composited in label order
+        n, h, w = len(labels), self._height, self._width
+        s = u[:, :SAMPLE_PARAMS]
+        layout = self._layout(labels, u)
+        box = self._box
+        center = (box - 1) / 2
+        atlas = self._atlas.reshape(-1)
+
+        # Sine warp, horizontal shift by row and vertical shift by column
+        unit = self._height / 60
+        ax = _lerp(self.warp_amplitude, s[:, 10]) * unit
+        ay = _lerp(self.warp_amplitude, s[:, 11]) * unit
+        px = _lerp(self.warp_period, s[:, 12]) * h
+        py = _lerp(self.warp_period, s[:, 13]) * w
+        rows = np.arange(h) + 0.5
+        shift_x = ax[:, None] * np.sin(2 * np.pi * (rows / px[:, None] + s[:, 14, None]))
+
+        # Each character only touches a window of columns, padded so windows never leave the plane
+        window = int(np.ceil(2 * (layout['half_width'].max() + ax.max()))) + 4
+        padded_w = w + 2 * window
+        coverage = np.zeros(n * h * padded_w, dtype=np.float32)
+        row_start = ((np.arange(n)[:, None] * h + np.arange(h)) * padded_w + window)[:, :, None]
+        offsets = np.arange(window)
+
+        for j in range(len(labels[0])):
+            cols = np.floor(layout['cx'][:, j] - window / 2).astype(np.int64)[:, None] + offsets
+            shift_y = ay[:, None] * np.sin(2 * np.pi * ((cols + 0.5) / py[:, None] + s[:, 15, None]))
+
+            # The warped inverse transform splits into a per-column and a per-row term
+            dx = cols + 0.5 - layout['cx'][:, j, None]
+            dy = rows - layout['cy'][:, j, None]
+            m = layout['inverse'][:, j]
+            gx = (m[:, 0, None] * dx + m[:, 1, None] * shift_y).astype(np.float32)[:, None, :] + \
+                (m[:, 0, None] * shift_x + m[:, 1, None] * dy + center).astype(np.float32)[:, :, None]
+            gy = (m[:, 2, None] * dx + m[:, 3, None] * shift_y).astype(np.float32)[:, None, :] + \
+                (m[:, 2, None] * shift_x + m[:, 3, None] * dy + center).astype(np.float32)[:, :, None]
+            np.clip(gx, 0, box - 1.001, out=gx)
+            np.clip(gy, 0, box - 1.001, out=gy)
+
+            # Bilinear gather from the atlas
+            x0, y0 = gx.astype(np.int32), gy.astype(np.int32)
+            gx -= x0
+            gy -= y0
+            index = y0 * box
+            index += x0
+            index += (layout['glyph'][:, j] * box * box).astype(np.int32)[:, None, None]
+            top = np.take(atlas, index)
+            top += (np.take(atlas, index + 1) - top) * gx
+            index += box
+            bottom = np.take(atlas, index)
+            bottom += (np.take(atlas, index + 1) - bottom) * gx
+            top += (bottom - top) * gy
+
+            # Saturate anti-aliased edges like upstream's mask lookup table, then composite over
+            alpha = np.minimum(top * 1.97, 1, out=top)
+            target = row_start + cols[:, None, :]
+            covered = np.take(coverage, target)
+            covered += alpha * (1 - covered)
+            coverage[target] = covered
+
+        return coverage.reshape(n, h, padded_w)[:, :, window:window + w]
+
+    def _draw_text(self, image: np.ndarray, coverage: np.ndarray, s: np.ndarray) -> None:
+        # Foreground color drifting across the text by up to color_jitter per channel
+        n, _, h, w = image.shape
+        fg = 10 + np.floor(s[:, 6:9] * 191)
+        drift = (s[:, 19:22] * 2 - 1) * self.color_jitter
+        ramp = np.arange(w) / w - 0.5
+        color = np.clip(fg[:, :, None] + drift[:, :, None] * ramp, 0, 255).astype(np.float32)
+
+        opacity = ((220 + np.floor(s[:, 9] * 36)) / 255).astype(np.float32)
+        coverage = coverage * opacity[:, None, None]
+        for channel in range(3):
+            plane = image[:, channel]
+            plane += coverage * (color[:, channel, None, :] - plane)
+
+    def _draw_noise(self, image: np.ndarray, u: np.ndarray) -> None:
+        n, _, h, w = image.shape
+        s = u[:, :SAMPLE_PARAMS]
+        fg = (10 + np.floor(s[:, 6:9] * 191)).astype(np.float32)
+        samples = np.arange(n)
+
+        # Noise dots
+        dots = u[:, -2 * NOISE_DOTS:].reshape(n, NOISE_DOTS, 2)
+        y = np.floor(dots[..., 0] * (h + 1)).astype(np.int64)[..., None] + _DOT_OFFSETS[:, 0]
+        x = np.floor(dots[..., 1] * (w + 1)).astype(np.int64)[..., None] + _DOT_OFFSETS[:, 1]
+        self._plot(image, np.broadcast_to(samples[:, None, None], y.shape), y, x, fg)
+
+        # Noise arc with upstream's bounding box and angle ranges
+        x1 = np.floor(s[:, 16] * (w // 5 + 1))
+        x2 = np.floor(s[:, 17] * (w - w // 5 + 1)) + w // 5
+        y1 = np.floor(s[:, 18] * (h - 2 * (h // 5) + 1)) + h // 5
+        y2 = y1 + np.floor(s[:, 22] * (h - y1 - h // 5 + 1))
+        start = np.floor(s[:, 23] * 21)
+        end = 160 + np.floor(s[:, 24] * 41)
+        t = np.radians(start[:, None] + (end - start)[:, None] * np.linspace(0, 1, CURVE_POINTS))
+        arc_x = np.rint((x1 + x2)[:, None] / 2 + (x2 - x1)[:, None] / 2 * np.cos(t)).astype(np.int64)
+        arc_y = np.rint((y1 + y2)[:, None] / 2 + (y2 - y1)[:, None] / 2 * np.sin(t)).astype(np.int64)
+        self._plot(image, np.broadcast_to(samples[:, None], arc_y.shape), arc_y, arc_x, fg)
+
+    @staticmethod
+    def _plot(image: np.ndarray, sample: np.ndarray, y: np.ndarray, x: np.ndarray, color: np.ndarray) -> None:
+        inside = (y >= 0) & (y < image.shape[2]) & (x >= 0) & (x < image.shape[3])
+        image[sample[inside], :, y[inside], x[inside]] = color[sample[inside]]
+
+    @staticmethod
+    def _smooth(image: np.ndarray) -> np.ndarray:
+        # PIL's SMOOTH kernel (a 3x3 box plus 4 times the center, over 13), separably
+        padded = np.pad(image, ((0, 0), (0, 0), (1, 1), (1, 1)), mode='edge')
+        rows = padded[:, :, :-2] + padded[:, :, 1:-1]
+        rows += padded[:, :, 2:]
+        total = rows[..., :-2] + rows[..., 1:-1]
+        total += rows[..., 2:]
+        total += image * 4
+
+        # A convex combination of 0..255 values, so rounding is all the conversion needs
+        total *= 1 / 13
+        total += 0.5
+        return total.astype(np.uint8)
+
+
+class NumpyImageCaptchaGenerator(ImageCaptchaGenerator):
+    """``ImageCaptchaGenerator`` drawing with ``NumpyCaptchaRenderer`` (``backend: numpy``).
+
+    Labels, encoding and storage are unchanged. ``generate_batch`` renders the
+    whole batch in one vectorized pass instead of one image at a time.
+    """
+
+    generator: NumpyCaptchaRenderer
+
+    def _create_renderer(self) -> NumpyCaptchaRenderer:
+        return NumpyCaptchaRenderer(width=self.width, height=self.height, fonts=self.fonts)
+
+    # Rasterize The Glyph Atlas Before First Use
+    def warmup(self) -> None:
+        self.generator.prepare(str(self.characters))
+
+    def generate_batch(self, labels: Union[int, Sequence[str]], rngs: Optional[Sequence[random.Random]] = None,
+                       color_mode: Optional[str] = None,
+                       out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        if isinstance(labels, int):
+            labels = [self.generate_label() for _ in range(labels)]
+
+        color_mode = self.color_mode if color_mode is None else color_mode
+        if color_mode not in COLOR_MODES:
+            raise ValueError(f"Invalid color_mode: {color_mode}, expected one of {tuple(COLOR_MODES)}")
+
+        shape = (len(labels), self.height, self.width, COLOR_MODES[color_mode])
+        if out is None:
+            out = np.empty(shape, dtype=np.uint8)
+        elif out.shape != shape or out.dtype != np.uint8:
+            raise ValueError(f"Invalid output array: expected uint8 {shape}, got {out.dtype} {out.shape}")
+
+        images = self.generator.render_batch([str(label) for label in labels], rngs)
+        if color_mode == 'L':
+            # ITU-R 601-2 luma, like PIL's convert('L')
+            luma = images.astype(np.uint32) @ np.array([299, 587, 114], dtype=np.uint32)
+            out[..., 0] = (luma + 500) // 1000
+        else:
+            out[...] = images
+
+        return out, self.encode_labels(labels)
@@ -0,0 +1,4 @@
+from .pool import CaptchaPool
+from .server import CaptchaServer
+
+__all__ = ['CaptchaPool', 'CaptchaServer']
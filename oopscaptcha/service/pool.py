@@ -0,0 +1,150 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ..generators.base import CaptchaGenerator
+from ..generators.factory import CaptchaFactory
+
+DEFAULT_POOL_SIZE = 1000
+DEFAULT_REFILL_WORKERS = 2
+RATE_WINDOW = 10.0
+REFILL_RETRY_DELAY = 0.5
+
+
+class CaptchaPool:
+    """Bounded pool of pre-rendered CAPTCHAs for one generator config.
+
+    Issuing is a pop from an in-memory ring buffer. Once the depth falls to
+    ``low_watermark`` the refill workers render new samples on a thread pool
+    until the buffer is back at ``high_watermark``. When the pool runs dry the
+    request is rendered inline instead and counted as a miss.
+    """
+
+    def __init__(self, generator: CaptchaGenerator, high_watermark: int = DEFAULT_POOL_SIZE,
+                 low_watermark: Optional[int] = None, refill_workers: int = DEFAULT_REFILL_WORKERS):
+        if high_watermark <= 0:
+            raise ValueError(f"Invalid high watermark: {high_watermark}")
+        if low_watermark is None:
+            low_watermark = high_watermark // 4
+        if not 0 <= low_watermark < high_watermark:
+            raise ValueError(f"Invalid low watermark: {low_watermark}, must be in [0, {high_watermark})")
+        if refill_workers <= 0:
+            raise ValueError(f"Invalid refill workers: {refill_workers}")
+
+        self.generator = generator
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.refill_workers = refill_workers
+
+        self._buffer: Deque[Tuple[Any, Any]] = deque(maxlen=high_watermark)
+        self._pending = 0
+        self._refill_needed: Optional[asyncio.Event] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._workers: List[asyncio.Task] = []
+        self._refill_times: Deque[float] = deque()
+
+        # Counters
+        self.issued = 0
+        self.misses = 0
+        self.refilled = 0
+        self.refill_failures = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._buffer)
+
+    async def start(self) -> None:
+        """Start the refill workers, which begin by filling the pool to the high watermark."""
+        if self._workers:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.refill_workers,
+                                            thread_name_prefix='oopscaptcha-refill')
+        self._refill_needed = asyncio.Event()
+        self._refill_needed.set()
+        self._workers = [asyncio.create_task(self._refill_worker()) for _ in range(self.refill_workers)]
+
+    async def stop(self) -> None:
+        """Cancel the refill workers and wait for in-flight renders to finish."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def issue(self) -> Tuple[Any, Any]:
+        """Return a ``(sample, label)`` pair, rendering inline only if the pool is empty."""
+        if self._buffer:
+            item = self._buffer.popleft()
+        else:
+            self.misses += 1
+            item = await asyncio.get_running_loop().run_in_executor(self._executor, self._render)
+        self.issued += 1
+
+        if self._refill_needed is not None and len(self._buffer) <= self.low_watermark:
+            self._refill_needed.set()
+        return item
+
+    def refill_rate(self) -> float:
+        """Samples rendered per second by the refill workers over the last ``RATE_WINDOW`` seconds."""
+        self._expire_refill_times(time.monotonic())
+        return len(self._refill_times) / RATE_WINDOW
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'depth': self.depth,
+            'high_watermark': self.high_watermark,
+            'low_watermark': self.low_watermark,
+            'refill_workers': self.refill_workers,
+            'refilling': self._pending,
+            'issued': self.issued,
+            'misses': self.misses,
+            'refilled': self.refilled,
+            'refill_failures': self.refill_failures,
+            'refill_rate': self.refill_rate()
+        }
+
+    async def __aenter__(self) -> 'CaptchaPool':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _refill_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._refill_needed.wait()
+            if len(self._buffer) + self._pending >= self.high_watermark:
+                # Full again, sleep until an issue drops the depth to the low watermark
+                self._refill_needed.clear()
+                continue
+
+            self._pending += 1
+            try:
+                item = await loop.run_in_executor(self._executor, self._render)
+            except Exception:
+                # Keep serving (inline renders surface the error to callers) without spinning
+                self.refill_failures += 1
+                await asyncio.sleep(REFILL_RETRY_DELAY)
+                continue
+            finally:
+                self._pending -= 1
+
+            self._buffer.append(item)
+            self.refilled += 1
+            now = time.monotonic()
+            self._refill_times.append(now)
+            self._expire_refill_times(now)
+
+    def _expire_refill_times(self, now: float) -> None:
+        while self._refill_times and self._refill_times[0] < now - RATE_WINDOW:
+            self._refill_times.popleft()
+
+    def _render(self) -> Tuple[Any, Any]:
+        # Each refill thread renders with its own pooled generator for this config
+        generator = CaptchaFactory.acquire_config(self.generator.config, type(self.generator))
+        return generator.generate()
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import mimetypes
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple
+
+from .pool import CaptchaPool
+from ..utils.id_generator import IDGenerator
+
+MAX_HEADER_LINES = 100
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+class CaptchaServer:
+    """Minimal asyncio HTTP/1.1 service that issues CAPTCHAs from pre-rendered pools.
+
+    Routes:
+
+    - ``GET /captcha/<name>`` (or ``GET /captcha`` for the first pool) returns the
+      sample bytes, with the ID and answer in the ``X-Captcha-Id`` and
+      ``X-Captcha-Label`` headers. It is meant to be called by the application
+      backend, which keeps the answer and forwards only the image to the user.
+    - ``GET /metrics`` returns the metrics of every pool as JSON.
+    """
+
+    def __init__(self, pools: Dict[str, CaptchaPool], host: str = '127.0.0.1', port: int = 8080):
+        if not pools:
+            raise ValueError("At least one pool is required")
+        self.pools = pools
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """Start the pools and begin accepting connections."""
+        for pool in self.pools.values():
+            await pool.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+
+        # Resolve the real port when binding to port 0
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for pool in self.pools.values():
+            await pool.stop()
+
+    async def __aenter__(self) -> 'CaptchaServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                headers = await self._read_headers(reader)
+                parts = request_line.decode('latin-1').split()
+                if headers is None or len(parts) != 3:
+                    self._write_response(writer, self._error(HTTPStatus.BAD_REQUEST), keep_alive=False)
+                    await writer.drain()
+                    break
+
+                method, target, version = parts
+                # Request bodies are never read, so only body-less requests can keep the connection
+                keep_alive = (version == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close'
+                              and 'content-length' not in headers
+                              and 'transfer-encoding' not in headers)
+
+                response = await self._route(method, target)
+                self._write_response(writer, response, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_headers(self, reader: asyncio.StreamReader) -> Optional[Dict[str, str]]:
+        headers: Dict[str, str] = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                return headers
+            name, sep, value = line.decode('latin-1').partition(':')
+            if not sep:
+                return None
+            headers[name.strip().lower()] = value.strip()
+        return None
+
+    async def _route(self, method: str, target: str) -> Response:
+        path = target.split('?', 1)[0].rstrip('/')
+        if method != 'GET':
+            return self._error(HTTPStatus.METHOD_NOT_ALLOWED)
+
+        if path == '/metrics':
+            metrics = {name: pool.metrics() for name, pool in self.pools.items()}
+            return HTTPStatus.OK, {'Content-Type': 'application/json'}, json.dumps(metrics).encode('utf-8')
+
+        if path == '/captcha':
+            return await self._issue(next(iter(self.pools.values())))
+        if path.startswith('/captcha/'):
+            pool = self.pools.get(path[len('/captcha/'):])
+            if pool is not None:
+                return await self._issue(pool)
+
+        return self._error(HTTPStatus.NOT_FOUND)
+
+    async def _issue(self, pool: CaptchaPool) -> Response:
+        try:
+            sample, label = await pool.issue()
+        except Exception as e:
+            return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+
+        generator = pool.generator
+        content_type = mimetypes.types_map.get(f".{generator.sample_extension}", 'application/octet-stream')
+        headers = {
+            'Content-Type': content_type,
+            'Cache-Control': 'no-store',
+            'X-Captcha-Id': IDGenerator.generate_captcha_id(),
+            'X-Captcha-Label': generator.encode_label(label).decode('utf-8')
+        }
+        return HTTPStatus.OK, headers, generator.encode_sample(sample)
+
+    def _error(self, status: HTTPStatus, message: Optional[str] = None) -> Response:
+        body = json.dumps({'error': message or status.phrase}).encode('utf-8')
+        return status, {'Content-Type': 'application/json'}, body
+
+    def _write_response(self, writer: asyncio.StreamWriter, response: Response, keep_alive: bool) -> None:
+        status, headers, body = response
+        status = HTTPStatus(status)
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        lines.append(f"Content-Length: {len(body)}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
@@ -1,3 +1,6 @@
 from .id_generator import IDGenerator
+from .prefetch import prefetch
+from .seeding import sample_rng, new_entropy
+from .instrumentation import ProgressEvent, ProgressPrinter
 
-__all__ = ['IDGenerator'] 
\ No newline at end of file
+__all__ = ['IDGenerator', 'prefetch', 'sample_rng', 'new_entropy', 'ProgressEvent', 'ProgressPrinter'] 
\ No newline at end of file
@@ -1,18 +1,138 @@
+import os
 import uuid
 import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Type
 from datetime import datetime
 
+# Names Of The Built-In ID Schemes
+ID_SCHEMES = ('random', 'counter', 'sortable')
+
+# IDs Handed Out Per Bulk Allocation Of The Sortable Scheme
+SORTABLE_BLOCK_SIZE = 4096
+SORTABLE_COUNTER_LIMIT = 1 << 80
+
+class IDScheme(ABC):
+    """Strategy that names samples, given their split and index.
+    
+    ``worker`` identifies the worker or node a scheme instance belongs to,
+    schemes that embed it stay unique across parallel workers and nodes.
+    """
+    
+    def __init__(self, worker: int = 0):
+        if worker < 0:
+            raise ValueError(f"Invalid worker: {worker}")
+        self.worker = worker
+    
+    @abstractmethod
+    def key(self, split: str, index: int, rng: Optional[random.Random] = None) -> str:
+        pass
+    
+    # Name A Whole Block [start, start + count) Of One Split At Once
+    def block(self, split: str, start: int, count: int,
+              rngs: Optional[Sequence[random.Random]] = None) -> List[str]:
+        if rngs is None:
+            return [self.key(split, index) for index in range(start, start + count)]
+        return [self.key(split, index, rng) for index, rng in zip(range(start, start + count), rngs)]
+
+class RandomIDScheme(IDScheme):
+    """``captcha_<hex>`` drawn from the sample's own RNG stream, or fresh random bits without one."""
+    
+    def key(self, split: str, index: int, rng: Optional[random.Random] = None) -> str:
+        if rng is not None:
+            return f"captcha_{rng.getrandbits(96):024x}"
+        return f"captcha_{uuid.uuid4().hex}"
+
+class CounterIDScheme(IDScheme):
+    """``<split>-<worker>-<index>``, zero padded so names sort in generation order."""
+    
+    def __init__(self, worker: int = 0, worker_width: int = 4, index_width: int = 10):
+        super().__init__(worker)
+        self._prefix_format = f"{{}}-{worker:0{worker_width}d}-{{:0{index_width}d}}"
+    
+    def key(self, split: str, index: int, rng: Optional[random.Random] = None) -> str:
+        return self._prefix_format.format(split, index)
+
+class SortableIDScheme(IDScheme):
+    """Time-ordered random IDs, ``captcha_<48-bit ms time><80-bit counter>``.
+    
+    Each thread allocates IDs in blocks: one clock read and one ``os.urandom``
+    call pick the block's time and random starting counter, and the IDs of the
+    block count up from there. A block allocated in the same millisecond as the
+    thread's previous one (or after the clock stepped back) continues that
+    block's counter instead, like ULID's monotonic mode. IDs therefore sort in
+    generation order within a thread and by millisecond across threads, workers
+    and nodes, and never touch the global ``random`` state.
+    """
+    
+    def __init__(self, worker: int = 0, block_size: int = SORTABLE_BLOCK_SIZE):
+        super().__init__(worker)
+        self.block_size = block_size
+        self._local = threading.local()
+    
+    def key(self, split: str, index: int, rng: Optional[random.Random] = None) -> str:
+        ids = getattr(self._local, 'ids', None)
+        
+        # Forked workers inherit the parent's block, never hand out the same IDs twice
+        if not ids or self._local.pid != os.getpid():
+            ids = self._local.ids = self.allocate(self.block_size)[::-1]
+            self._local.pid = os.getpid()
+        return ids.pop()
+    
+    def block(self, split: str, start: int, count: int,
+              rngs: Optional[Sequence[random.Random]] = None) -> List[str]:
+        return self.allocate(count)
+    
+    def allocate(self, count: int) -> List[str]:
+        """Allocate ``count`` consecutive IDs with a single clock read and random draw."""
+        now = int(time.time() * 1000) & 0xFFFFFFFFFFFF
+        
+        # (pid, ms, next counter) of this thread's last block, a forked worker starts afresh
+        base = None
+        last = getattr(self._local, 'last', None)
+        if last is not None and last[0] == os.getpid() and now <= last[1]:
+            now, base = last[1], last[2]
+        if base is None or base + count > SORTABLE_COUNTER_LIMIT:
+            # Top bit clear so a block never wraps past the end of the 80-bit counter
+            now = now if base is None else now + 1
+            base = int.from_bytes(os.urandom(10), 'big') >> 1
+        self._local.last = (os.getpid(), now, base + count)
+        
+        prefix = f"captcha_{now:012x}"
+        return [f"{prefix}{counter:020x}" for counter in range(base, base + count)]
+
 class IDGenerator:
     _dir_timestamp = None
     
+    # Register ID Schemes
+    _schemes: Dict[str, Type[IDScheme]] = {
+        'random': RandomIDScheme,
+        'counter': CounterIDScheme,
+        'sortable': SortableIDScheme
+    }
+    
+    # Unseeded IDs Come From Per-Thread Blocks Instead Of The Global RNG
+    _unseeded = SortableIDScheme()
+    
     @staticmethod
-    def generate_captcha_id() -> str:
-        if random.getstate():
-            uuid_hex = ''.join(f'{random.randint(0, 15):x}' for _ in range(24))
-        else:
-            uuid_hex = uuid.uuid4().hex
+    def generate_captcha_id(rng: Optional[random.Random] = None) -> str:
+        # Derive the ID from the caller's stream so seeded samples get stable names
+        if rng is not None:
+            return f"captcha_{rng.getrandbits(96):024x}"
         
-        return f"captcha_{uuid_hex}"
+        return IDGenerator._unseeded.key('', 0)
+    
+    @classmethod
+    def create_scheme(cls, name: str, worker: int = 0) -> IDScheme:
+        if name not in cls._schemes:
+            raise ValueError(f"Unsupported ID scheme: {name}, expected one of {tuple(cls._schemes)}")
+        return cls._schemes[name](worker=worker)
+    
+    @classmethod
+    def register_scheme(cls, name: str, scheme_cls: Type[IDScheme]) -> None:
+        cls._schemes[name] = scheme_cls
     
     @staticmethod
     def get_dir_timestamp() -> str:
@@ -0,0 +1,207 @@
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, TextIO
+
+# Stages Timed For Every Generated Sample
+STAGES = ('label', 'render', 'encode', 'write')
+
+
+def worker_name() -> str:
+    # Imported here, multiprocessing is not needed until a dataset runs
+    from multiprocessing import current_process
+    return f"{current_process().name}/{threading.current_thread().name}"
+
+
+@dataclass
+class TaskStats:
+    """Stage timings of one dataset task, filled in by the worker that ran it.
+
+    ``lap(stage)`` charges the time since the previous lap to ``stage``, so a
+    task only pays for one ``perf_counter_ns`` call per stage and sample.
+    Instances are small and picklable so process workers can return them.
+    """
+    worker: str = field(default_factory=worker_name)
+    samples: int = 0
+    stage_ns: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(STAGES, 0))
+    _last: int = field(default_factory=time.perf_counter_ns, repr=False)
+
+    def restart(self) -> None:
+        """Start timing from now, e.g. when the parent adds its own stage to a returned task."""
+        self._last = time.perf_counter_ns()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter_ns()
+        self.stage_ns[stage] += now - self._last
+        self._last = now
+
+
+@dataclass
+class ProgressEvent:
+    """One event of a dataset run.
+
+    ``kind`` is ``'start'``, ``'task'`` (a task finished, ``stats`` is set),
+    ``'failure'`` (``error`` is set, the run aborts after the event) or
+    ``'finish'``. Counts cover the whole run, ``split`` is the split being
+    generated. ``queues`` holds the latest occupancy of every pipeline stage
+    queue, see ``DatasetMonitor.observe_queue``.
+    """
+    kind: str
+    split: Optional[str]
+    done: int
+    total: int
+    elapsed: float
+    failures: int = 0
+    stats: Optional[TaskStats] = None
+    error: Optional[BaseException] = None
+    queues: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def rate(self) -> float:
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        rate = self.rate
+        return (self.total - self.done) / rate if rate > 0 else None
+
+
+EventSink = Callable[[ProgressEvent], None]
+
+
+class DatasetMonitor:
+    """Aggregates task statistics of a dataset run and forwards events to a sink."""
+
+    def __init__(self, total: int, sink: Optional[EventSink] = None):
+        self.total = total
+        self.sink = sink
+        self.done = 0
+        self.failures = 0
+        self.stage_ns: Dict[str, int] = dict.fromkeys(STAGES, 0)
+        self.workers: Dict[str, Dict[str, Any]] = {}
+        self.splits: Dict[str, Dict[str, Any]] = {}
+        self.queues: Dict[str, Dict[str, int]] = {}
+        self._start = time.perf_counter()
+        self._split_start = self._start
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        self._emit('start', None)
+
+    def start_split(self, split: str) -> None:
+        self._split_start = time.perf_counter()
+        self.splits[split] = {'samples': 0, 'seconds': 0.0}
+
+    def skip(self, count: int) -> None:
+        """Leave samples that already exist (resumed runs) out of the progress total."""
+        self.total -= count
+
+    def task_done(self, split: str, stats: TaskStats) -> None:
+        self.done += stats.samples
+        for stage, ns in stats.stage_ns.items():
+            self.stage_ns[stage] = self.stage_ns.get(stage, 0) + ns
+
+        worker = self.workers.setdefault(stats.worker, {'tasks': 0, 'samples': 0, 'busy_ns': 0})
+        worker['tasks'] += 1
+        worker['samples'] += stats.samples
+        worker['busy_ns'] += sum(stats.stage_ns.values())
+
+        split_stats = self.splits[split]
+        split_stats['samples'] += stats.samples
+        split_stats['seconds'] = time.perf_counter() - self._split_start
+        self._emit('task', split, stats=stats)
+
+    def observe_queue(self, stage: str, capacity: int, busy: int, ready: int) -> None:
+        """Record the occupancy of the bounded queue feeding ``stage``.
+
+        ``busy`` tasks are still being worked on and ``ready`` ones are finished
+        but wait for the next stage. A queue that is mostly ready means the next
+        stage is the bottleneck, one that is mostly busy means this stage is.
+        """
+        queue = self.queues.setdefault(stage, {'capacity': capacity, 'observations': 0,
+                                               'busy_total': 0, 'ready_total': 0, 'max_ready': 0})
+        queue.update(capacity=capacity, busy=busy, ready=ready)
+        queue['observations'] += 1
+        queue['busy_total'] += busy
+        queue['ready_total'] += ready
+        queue['max_ready'] = max(queue['max_ready'], ready)
+
+    def failure(self, split: Optional[str], error: BaseException) -> None:
+        self.failures += 1
+        self._emit('failure', split, error=error)
+
+    def finish(self) -> None:
+        self._emit('finish', None)
+
+    def summary(self) -> Dict[str, Any]:
+        """Timing summary of the run, stage and worker times are summed over all workers."""
+        elapsed = self.elapsed
+        return {
+            'elapsed_seconds': elapsed,
+            'samples': self.done,
+            'samples_per_sec': self.done / elapsed if elapsed > 0 else 0.0,
+            'failures': self.failures,
+            'stages': {
+                stage: {
+                    'total_seconds': ns / 1e9,
+                    'mean_ms': ns / 1e6 / self.done if self.done else 0.0
+                }
+                for stage, ns in self.stage_ns.items()
+            },
+            'workers': {
+                name: {'tasks': worker['tasks'], 'samples': worker['samples'], 'busy_seconds': worker['busy_ns'] / 1e9}
+                for name, worker in self.workers.items()
+            },
+            'splits': self.splits,
+            'queues': {
+                stage: {
+                    'capacity': queue['capacity'],
+                    'mean_busy': queue['busy_total'] / queue['observations'],
+                    'mean_ready': queue['ready_total'] / queue['observations'],
+                    'max_ready': queue['max_ready']
+                }
+                for stage, queue in self.queues.items()
+            }
+        }
+
+    def _emit(self, kind: str, split: Optional[str], stats: Optional[TaskStats] = None,
+              error: Optional[BaseException] = None) -> None:
+        if self.sink is not None:
+            queues = {
+                stage: {'capacity': queue['capacity'], 'busy': queue['busy'], 'ready': queue['ready']}
+                for stage, queue in self.queues.items()
+            }
+            self.sink(ProgressEvent(kind, split, self.done, self.total, self.elapsed,
+                                    self.failures, stats, error, queues))
+
+
+class ProgressPrinter:
+    """Event sink that keeps a single live progress line on a terminal stream."""
+
+    def __init__(self, stream: Optional[TextIO] = None, interval: float = 0.5):
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self._last = 0.0
+
+    def __call__(self, event: ProgressEvent) -> None:
+        now = time.monotonic()
+        if event.kind == 'task' and now - self._last < self.interval:
+            return
+        self._last = now
+
+        eta = event.eta
+        eta_text = time.strftime('%H:%M:%S', time.gmtime(eta)) if eta is not None else '--:--:--'
+        percent = 100.0 * event.done / event.total if event.total else 100.0
+        line = (f"{event.split or '':<5} {event.done}/{event.total} ({percent:5.1f}%) "
+                f"{event.rate:8.1f} samples/sec  ETA {eta_text}  failures {event.failures}")
+        for stage, queue in event.queues.items():
+            # Tasks still running / tasks waiting for the next stage, out of the queue's capacity
+            line += f"  {stage} {queue['busy']}+{queue['ready']}/{queue['capacity']}"
+        end = '\n' if event.kind in ('finish', 'failure') else ''
+        self.stream.write(f"\r{line}{end}")
+        self.stream.flush()
@@ -0,0 +1,19 @@
+import importlib
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule(ModuleType):
+    """Stand-in for a module that is only imported on first attribute access.
+
+    ``np = LazyModule('numpy')`` lets a module use ``np.<name>`` as usual while
+    code paths that never touch it (the CLI, single samples) skip the import.
+    After the first access the module's namespace is copied in, so later
+    lookups are plain attribute reads. The import itself is serialized by the
+    interpreter's import lock, so concurrent first accesses are safe.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, name)
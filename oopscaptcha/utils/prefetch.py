@@ -0,0 +1,56 @@
+import queue
+import threading
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar('T')
+
+_DONE = object()
+
+
+def prefetch(iterable: Iterable[T], depth: int) -> Iterator[T]:
+    """Consume ``iterable`` on a background thread, keeping up to ``depth`` items ready.
+    
+    The producer blocks once ``depth`` items are waiting, exceptions raised while
+    producing are re-raised to the consumer, and closing the returned iterator
+    stops the producer.
+    """
+    if depth <= 0:
+        raise ValueError(f"Invalid prefetch depth: {depth}")
+    
+    items: 'queue.Queue' = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    
+    def _put(item) -> bool:
+        # Poll so a closed consumer never leaves the producer blocked forever
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def _produce() -> None:
+        try:
+            for item in iterable:
+                if not _put((item, None)):
+                    return
+        except BaseException as e:
+            _put((_DONE, e))
+            return
+        _put((_DONE, None))
+    
+    producer = threading.Thread(target=_produce, name='oopscaptcha-prefetch', daemon=True)
+    producer.start()
+    
+    try:
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        producer.join()
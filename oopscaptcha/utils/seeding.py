@@ -0,0 +1,76 @@
+import random
+from .lazy import LazyModule
+
+np = LazyModule('numpy')
+
+# Fixed Spawn Keys So Every Split Has Its Own Family Of Streams
+SPLIT_KEYS = {'train': 0, 'val': 1, 'test': 2}
+
+
+def new_entropy() -> int:
+    """Draw fresh OS entropy to use as the seed of an unseeded run."""
+    return int(np.random.SeedSequence().entropy)
+
+
+def sample_rng(seed: int, split: str, index: int) -> random.Random:
+    """Return the independent RNG stream of sample ``index`` in ``split``.
+    
+    The stream is derived from ``(seed, split, index)`` alone through
+    ``numpy.random.SeedSequence`` spawn keys, so any worker, process or node
+    can reproduce any sample without coordinating with the others.
+    """
+    if split not in SPLIT_KEYS:
+        raise ValueError(f"Unknown split: {split}, expected one of {tuple(SPLIT_KEYS)}")
+    
+    state = np.random.SeedSequence(seed, spawn_key=(SPLIT_KEYS[split], index)).generate_state(4)
+    return random.Random(int.from_bytes(state.tobytes(), 'little'))
+
+
+# Spawn Key Of The Label Permutation, Apart From The Split Streams
+PERMUTATION_KEY = len(SPLIT_KEYS)
+PERMUTATION_ROUNDS = 6
+MASK_64 = (1 << 64) - 1
+
+
+class IndexPermutation:
+    """Keyed pseudo-random bijection of ``range(size)``, evaluated one index at a time.
+    
+    A balanced Feistel network over the smallest even number of bits covering
+    ``size`` is a permutation of that power-of-two domain. Outputs that fall
+    outside ``range(size)`` are fed through again (cycle walking), which keeps
+    the map a bijection and takes fewer than four passes on average. The round
+    keys come from ``seed``, so every worker, process or node computes the
+    same permutation without sharing any state.
+    """
+    
+    def __init__(self, size: int, seed: int):
+        if size <= 0:
+            raise ValueError(f"Invalid permutation size: {size}")
+        
+        self.size = size
+        self.seed = seed
+        self._half = max(1, ((size - 1).bit_length() + 1) // 2)
+        self._mask = (1 << self._half) - 1
+        state = np.random.SeedSequence(seed, spawn_key=(PERMUTATION_KEY,)).generate_state(PERMUTATION_ROUNDS, dtype=np.uint64)
+        self._keys = [int(key) for key in state]
+    
+    def __call__(self, index: int) -> int:
+        if not 0 <= index < self.size:
+            raise IndexError(f"Index {index} out of range for permutation of size {self.size}")
+        while True:
+            index = self._encrypt(index)
+            if index < self.size:
+                return index
+    
+    def _encrypt(self, value: int) -> int:
+        left, right = value >> self._half, value & self._mask
+        for key in self._keys:
+            left, right = right, left ^ (_mix(right ^ key) & self._mask)
+        return (left << self._half) | right
+
+
+def _mix(value: int) -> int:
+    # splitmix64 finalizer, the round function of the permutation
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return value ^ (value >> 31)
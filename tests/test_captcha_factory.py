@@ -1,4 +1,5 @@
 import unittest
+import threading
 from unittest.mock import patch, MagicMock
 from oopscaptcha.generators.types import CaptchaType
 from oopscaptcha.generators.factory import CaptchaFactory
@@ -66,6 +67,43 @@ class TestCaptchaFactory(unittest.TestCase):
         
         # Verify error message
         self.assertIn('Unsupported captcha type', str(context.exception))
+    
+    def test_create_does_not_mutate_settings(self):
+        """Test that parameter overrides do not leak into later generators"""
+        CaptchaFactory.create(CaptchaType.IMAGE, width=321)
+        generator = CaptchaFactory.create(CaptchaType.IMAGE)
+        self.assertNotEqual(generator.width, 321)
+    
+    def test_acquire_reuses_generator_per_config(self):
+        """Test that pooled generators are reused for the same effective config"""
+        CaptchaFactory.clear_pool()
+        first = CaptchaFactory.acquire(CaptchaType.IMAGE, width=200, characters="0123456789")
+        self.assertIs(CaptchaFactory.acquire(CaptchaType.IMAGE, width=200, characters="0123456789"), first)
+        self.assertEqual(first.width, 200)
+        
+        # A different effective config gets its own generator
+        other = CaptchaFactory.acquire(CaptchaType.IMAGE, width=180)
+        self.assertIsNot(other, first)
+        self.assertEqual(other.width, 180)
+        
+        CaptchaFactory.clear_pool()
+        self.assertIsNot(CaptchaFactory.acquire(CaptchaType.IMAGE, width=200, characters="0123456789"), first)
+    
+    def test_acquire_is_thread_confined(self):
+        """Test that each thread gets its own pooled generator"""
+        local = CaptchaFactory.acquire(CaptchaType.IMAGE)
+        acquired = []
+        
+        def worker():
+            acquired.append(CaptchaFactory.acquire(CaptchaType.IMAGE))
+            acquired.append(CaptchaFactory.acquire(CaptchaType.IMAGE))
+        
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        
+        self.assertIs(acquired[0], acquired[1])
+        self.assertIsNot(acquired[0], local)
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,60 @@
+import unittest
+import os
+import subprocess
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Print Which Of The Heavy Modules A CLI Invocation Imported
+PROBE = """
+import sys
+sys.argv = ['oops-captcha'] + sys.argv[1:]
+try:
+    from oopscaptcha.cli import main
+    main()
+except SystemExit:
+    pass
+finally:
+    heavy = ('numpy', 'PIL', 'yaml', 'captcha', 'asyncio', 'multiprocessing')
+    print('LOADED', ','.join(name for name in heavy if name in sys.modules), file=sys.stderr)
+"""
+
+class TestCLIStartup(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test environment"""
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test environment"""
+        shutil.rmtree(self.output_dir)
+
+    def loaded_modules(self, *args):
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE, *args],
+            cwd=ROOT, env={**os.environ, 'PYTHONPATH': str(ROOT)},
+            capture_output=True, text=True
+        )
+        line = [l for l in result.stderr.splitlines() if l.startswith('LOADED')][-1]
+        return set(filter(None, line.split(' ', 1)[1].split(',')))
+
+    def test_help_is_lightweight(self):
+        """Test that --help imports no generator dependencies"""
+        self.assertEqual(self.loaded_modules('--help'), set())
+
+    def test_usage_error_is_lightweight(self):
+        """Test that a usage error is reported before anything heavy is imported"""
+        self.assertEqual(self.loaded_modules('single'), set())
+
+    def test_single_skips_numpy(self):
+        """Test that a single sample does not need NumPy, asyncio or multiprocessing"""
+        loaded = self.loaded_modules('single', '--type', 'image', '--output-dir', self.output_dir)
+        self.assertIn('captcha', loaded)
+        self.assertTrue(any(Path(self.output_dir).iterdir()))
+        self.assertFalse(loaded & {'numpy', 'asyncio', 'multiprocessing'})
+
+if __name__ == '__main__':
+    unittest.main()
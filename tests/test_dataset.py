@@ -0,0 +1,625 @@
+import unittest
+import json
+import random
+import shutil
+import tarfile
+import tempfile
+import threading
+import tracemalloc
+from pathlib import Path
+from unittest.mock import patch
+from PIL import Image # type: ignore
+import numpy as np # type: ignore
+
+from oopscaptcha.generators.types import CaptchaType
+from oopscaptcha.generators.base import CaptchaConfig, CaptchaGenerator
+from oopscaptcha.generators.image import ImageCaptchaGenerator
+from oopscaptcha.datasets import load_label_manifest, merge_shards
+
+class TestDatasetGeneration(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test environment"""
+        self.output_dir = tempfile.mkdtemp()
+        self.config = CaptchaConfig(
+            type=CaptchaType.IMAGE,
+            params={
+                'width': 80,
+                'height': 30,
+                'length': 4,
+                'characters': 'abcdefgh12345',
+                'output_dir': self.output_dir
+            }
+        )
+        self.generator = ImageCaptchaGenerator(self.config)
+
+    def tearDown(self):
+        """Clean up test environment"""
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def _generate(self, **kwargs):
+        params = {
+            'size': 10,
+            'train_ratio': 0.6,
+            'val_ratio': 0.2,
+            'test_ratio': 0.2,
+            'parallel': False,
+            'output_dir': self.output_dir
+        }
+        params.update(kwargs)
+        return self.generator.generate_dataset(**params)
+
+    def _dataset_dir(self, sample_path):
+        # <dataset_dir>/<split>/samples/<id>.png
+        return Path(sample_path).parents[2]
+
+    def test_sequential(self):
+        """Test sequential dataset generation"""
+        result = self._generate()
+        self.assertEqual({split: len(paths) for split, paths in result.items()},
+                         {'train': 6, 'val': 2, 'test': 2})
+
+        sample_path, label_path = result['train'][0]
+        self.assertTrue(sample_path.exists())
+        self.assertTrue(label_path.exists())
+
+    def test_thread_pool(self):
+        """Test parallel generation with the thread backend"""
+        result = self._generate(parallel=True, max_workers=2, executor='thread')
+        self.assertEqual(sum(len(paths) for paths in result.values()), 10)
+
+    def test_process_pool(self):
+        """Test parallel generation with the process backend"""
+        result = self._generate(parallel=True, max_workers=2, executor='process')
+        self.assertEqual({split: len(paths) for split, paths in result.items()},
+                         {'train': 6, 'val': 2, 'test': 2})
+
+        # Every sample must be a distinct, readable file
+        sample_paths = [sample for paths in result.values() for sample, _ in paths]
+        self.assertEqual(len(set(sample_paths)), 10)
+        for sample_path, label_path in result['train']:
+            with Image.open(sample_path) as img:
+                self.assertEqual(img.size, (80, 30))
+            self.assertEqual(len(label_path.read_text()), 4)
+
+        metadata_path = self._dataset_dir(result['train'][0][0]) / 'metadata.json'
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+        self.assertEqual(metadata['dataset_config']['executor'], 'process')
+
+    def test_tar_shards(self):
+        """Test streaming samples into tar shards"""
+        for parallel in (False, True):
+            result = self._generate(output_format='tar', shard_size=4, parallel=parallel,
+                                    max_workers=2, executor='process')
+            sample_member, label_member = result['train'][0]
+            dataset_dir = sample_member.parents[2]
+            self.assertEqual(sample_member.parent.name, 'train-000000.tar')
+
+            with open(dataset_dir / 'metadata.json') as f:
+                metadata = json.load(f)
+            self.assertEqual(metadata['output_format'], 'tar')
+            self.assertEqual([shard['count'] for shard in metadata['shards']['train']], [4, 2])
+            self.assertNotIn('samples', [p.name for p in (dataset_dir / 'train').iterdir()])
+
+            with tarfile.open(dataset_dir / 'train' / 'train-000000.tar') as tar:
+                names = tar.getnames()
+                self.assertEqual(len(names), 8)
+                self.assertIn(sample_member.name, names)
+                label = tar.extractfile(label_member.name).read().decode()
+            self.assertEqual(len(label), 4)
+            shutil.rmtree(dataset_dir)
+
+    def test_npy_arrays(self):
+        """Test rendering splits straight into memory-mappable arrays"""
+        self.generator = ImageCaptchaGenerator(CaptchaConfig(
+            type=CaptchaType.IMAGE, params={**self.config.params, 'color_mode': 'L'}
+        ))
+        for parallel in (False, True):
+            result = self._generate(output_format='npy', parallel=parallel,
+                                    max_workers=2, executor='process')
+            images_row, labels_row = result['train'][5]
+            dataset_dir = images_row.parents[2]
+            self.assertEqual(images_row, dataset_dir / 'train' / 'images.npy' / '5')
+
+            images = np.load(dataset_dir / 'train' / 'images.npy', mmap_mode='r')
+            labels = np.load(dataset_dir / 'train' / 'labels.npy', mmap_mode='r')
+            self.assertEqual(images.shape, (6, 30, 80, 1))
+            self.assertEqual(images.dtype, np.uint8)
+            self.assertEqual(labels.shape, (6, 4))
+            self.assertTrue((np.asarray(images) < 255).any())
+            for label in self.generator.decode_labels(labels):
+                self.assertTrue(set(label) <= set('abcdefgh12345'))
+
+            with open(dataset_dir / 'metadata.json') as f:
+                metadata = json.load(f)
+            self.assertEqual(metadata['arrays']['val']['image_shape'], [2, 30, 80, 1])
+            self.assertEqual(metadata['arrays']['test']['labels'], 'test/labels.npy')
+            del images, labels
+            shutil.rmtree(dataset_dir)
+
+    def test_label_manifest(self):
+        """Test writing one label manifest per split instead of a file per label"""
+        for label_format in ('jsonl', 'npy'):
+            result = self._generate(label_format=label_format, parallel=True, max_workers=2, seed=3)
+            sample_path, label_row = result['train'][2]
+            dataset_dir = self._dataset_dir(sample_path)
+            self.assertEqual(label_row, dataset_dir / 'train' / f"labels.{label_format}" / '2')
+            self.assertFalse((dataset_dir / 'train' / 'labels').exists())
+
+            manifest = load_label_manifest(dataset_dir / 'train' / f"labels.{label_format}")
+            self.assertEqual(manifest['index'].tolist(), list(range(6)))
+            self.assertEqual(manifest['sample'][2], f"samples/{sample_path.name}")
+            self.assertTrue(sample_path.exists())
+
+            with open(dataset_dir / 'metadata.json') as f:
+                metadata = json.load(f)
+            self.assertEqual(metadata['label_manifests']['val'],
+                             {'manifest': f"val/labels.{label_format}", 'format': label_format, 'count': 2})
+            shutil.rmtree(dataset_dir)
+
+            # Same labels as the per-file layout of the same seed
+            files = self._generate(seed=3)
+            self.assertEqual(manifest['label'].tolist(), [label.read_text() for _, label in files['train']])
+            shutil.rmtree(self._dataset_dir(files['train'][0][0]))
+
+        with self.assertRaises(ValueError):
+            self._generate(label_format='jsonl', output_format='tar')
+
+    def _snapshot(self, result):
+        # Relative file name -> content, for comparing whole datasets
+        snapshot = {}
+        for split, paths in result.items():
+            for sample_path, label_path in paths:
+                snapshot[f"{split}/{sample_path.name}"] = (sample_path.read_bytes(), label_path.read_text())
+        return snapshot
+
+    def test_seeded_runs_are_identical(self):
+        """Test that a seeded dataset is bit-identical across execution backends"""
+        sequential = self._snapshot(self._generate(seed=123))
+        threaded = self._snapshot(self._generate(seed=123, parallel=True, max_workers=3, executor='thread'))
+        processes = self._snapshot(self._generate(seed=123, parallel=True, max_workers=2, executor='process'))
+
+        self.assertEqual(len(sequential), 10)
+        self.assertEqual(sequential, threaded)
+        self.assertEqual(sequential, processes)
+        self.assertNotEqual(sequential, self._snapshot(self._generate(seed=124)))
+
+    def test_unseeded_run_records_entropy(self):
+        """Test that an unseeded run records the entropy it was generated from"""
+        result = self._generate()
+        with open(self._dataset_dir(result['train'][0][0]) / 'metadata.json') as f:
+            dataset_config = json.load(f)['dataset_config']
+        self.assertIsNone(dataset_config['seed'])
+        self.assertIsInstance(dataset_config['entropy'], int)
+
+    def test_resume_after_failure(self):
+        """Test that an interrupted resumable run only redoes missing samples"""
+        dataset_dir = Path(self.output_dir) / 'resumable'
+        original = ImageCaptchaGenerator.generate_indexed
+        calls = []
+        crash = [True]
+
+        def failing(generator, seed, split, index, stats=None):
+            calls.append((split, index))
+            if crash[0] and len(calls) == 4:
+                raise RuntimeError('crash')
+            return original(generator, seed, split, index, stats)
+
+        with patch.object(ImageCaptchaGenerator, 'generate_indexed', failing):
+            with self.assertRaises(RuntimeError):
+                self._generate(output_dir=dataset_dir, resume=True, seed=5, chunk_size=2)
+        self.assertFalse((dataset_dir / 'metadata.json').exists())
+
+        calls.clear()
+        crash[0] = False
+        with patch.object(ImageCaptchaGenerator, 'generate_indexed', failing):
+            result = self._generate(output_dir=dataset_dir, resume=True)
+
+        # The first batch of train was recorded before the crash
+        self.assertNotIn(('train', 0), calls)
+        self.assertNotIn(('train', 1), calls)
+        self.assertEqual(len(calls), 8)
+        self.assertEqual(sum(len(paths) for paths in result.values()), 10)
+        self.assertTrue((dataset_dir / 'metadata.json').exists())
+
+        # The resumed dataset is identical to an uninterrupted one with the same seed
+        fresh = self._snapshot(self._generate(seed=5))
+        self.assertEqual(self._snapshot(result), fresh)
+
+    def test_resume_removes_unrecorded_files(self):
+        """Test that files of an interrupted task do not outlive a resume with sortable IDs"""
+        self.generator = ImageCaptchaGenerator(CaptchaConfig(
+            type=CaptchaType.IMAGE, params={**self.config.params, 'id_scheme': 'sortable'}
+        ))
+        dataset_dir = Path(self.output_dir) / 'sortable'
+        original = ImageCaptchaGenerator.generate_indexed
+
+        # Index 2 is written, then its task dies on index 3 before recording either
+        def failing(generator, seed, split, index, stats=None):
+            if split == 'train' and index == 3:
+                raise RuntimeError('crash')
+            return original(generator, seed, split, index, stats)
+
+        with patch.object(ImageCaptchaGenerator, 'generate_indexed', failing):
+            with self.assertRaises(RuntimeError):
+                self._generate(output_dir=dataset_dir, resume=True, seed=5, chunk_size=2)
+        self.assertEqual(len(list((dataset_dir / 'train' / 'samples').iterdir())), 3)
+
+        result = self._generate(output_dir=dataset_dir, resume=True)
+        self.assertEqual(len(result['train']), 6)
+        for directory in ('samples', 'labels'):
+            self.assertEqual(sorted((dataset_dir / 'train' / directory).iterdir()),
+                             sorted(paths[directory == 'labels'] for paths in result['train']))
+
+    def test_resume_grows_dataset(self):
+        """Test growing a resumable dataset without touching existing files"""
+        dataset_dir = Path(self.output_dir) / 'growing'
+        first = self._generate(output_dir=dataset_dir, resume=True)
+        sample_path = first['train'][0][0]
+        mtime = sample_path.stat().st_mtime_ns
+
+        second = self._generate(output_dir=dataset_dir, resume=True, size=20)
+        self.assertEqual({split: len(paths) for split, paths in second.items()},
+                         {'train': 12, 'val': 4, 'test': 4})
+        self.assertEqual(second['train'][:6], first['train'])
+        self.assertEqual(sample_path.stat().st_mtime_ns, mtime)
+
+        with open(dataset_dir / 'metadata.json') as f:
+            self.assertEqual(json.load(f)['split_sizes']['train'], 12)
+
+        with self.assertRaises(ValueError):
+            self._generate(output_dir=dataset_dir, resume=True, size=10)
+        with self.assertRaises(ValueError):
+            self._generate(output_dir=dataset_dir, resume=True, size=20, seed=999)
+
+    def test_resume_requires_files_format(self):
+        """Test that resume is rejected for archive formats"""
+        with self.assertRaises(ValueError):
+            self._generate(resume=True, output_format='tar')
+
+    def test_progress_events(self):
+        """Test that the event sink receives start, per-task and finish events"""
+        for executor in ('thread', 'process'):
+            events = []
+            result = self._generate(parallel=True, max_workers=2, executor=executor,
+                                    events=events.append, record_timings=True)
+
+            kinds = [event.kind for event in events]
+            self.assertEqual(kinds[0], 'start')
+            self.assertEqual(kinds[-1], 'finish')
+            self.assertEqual(events[-1].done, 10)
+            self.assertEqual(events[-1].failures, 0)
+
+            tasks = [event for event in events if event.kind == 'task']
+            self.assertEqual(sum(event.stats.samples for event in tasks), 10)
+            self.assertEqual({event.split for event in tasks}, {'train', 'val', 'test'})
+            self.assertTrue(all(event.stats.stage_ns['render'] > 0 for event in tasks))
+
+            with open(self._dataset_dir(result['train'][0][0]) / 'metadata.json') as f:
+                timings = json.load(f)['timings']
+            self.assertEqual(timings['samples'], 10)
+            self.assertEqual(set(timings['stages']), {'label', 'render', 'encode', 'write'})
+            self.assertEqual(sum(worker['samples'] for worker in timings['workers'].values()), 10)
+            self.assertEqual(timings['splits']['train']['samples'], 6)
+
+    def test_failure_event(self):
+        """Test that a failing task is reported to the event sink before it propagates"""
+        events = []
+        with patch.object(ImageCaptchaGenerator, 'generate_label', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                self._generate(events=events.append)
+        self.assertEqual(events[-1].kind, 'failure')
+        self.assertEqual(events[-1].failures, 1)
+        self.assertEqual(events[-1].split, 'train')
+        self.assertIsInstance(events[-1].error, RuntimeError)
+
+    def test_counter_ids(self):
+        """Test naming samples with the counter ID scheme"""
+        self.generator = ImageCaptchaGenerator(CaptchaConfig(
+            type=CaptchaType.IMAGE, params={**self.config.params, 'id_scheme': 'counter', 'id_worker': 2}
+        ))
+        result = self._generate(parallel=True, max_workers=2, executor='process')
+        names = [sample.stem for sample, _ in result['train']]
+        self.assertEqual(names, [f"train-0002-{index:010d}" for index in range(6)])
+        self.assertEqual(result['test'][1][1].name, 'test-0002-0000000001.txt')
+
+    def test_write_workers(self):
+        """Test that a dedicated writer stage produces the same dataset and reports queue occupancy"""
+        expected = self._snapshot(self._generate(seed=5))
+        for executor in ('thread', 'process'):
+            events = []
+            result = self._generate(seed=5, parallel=True, max_workers=2, executor=executor,
+                                    write_workers=2, events=events.append, record_timings=True)
+            self.assertEqual(self._snapshot(result), expected)
+
+            queues = [event.queues for event in events if event.kind == 'task']
+            self.assertTrue(all(set(queue) == {'render', 'write'} for queue in queues))
+            self.assertEqual(queues[-1]['write']['capacity'], 8)
+
+            with open(self._dataset_dir(result['train'][0][0]) / 'metadata.json') as f:
+                metadata = json.load(f)
+            self.assertEqual(metadata['dataset_config']['write_workers'], 2)
+            self.assertEqual(set(metadata['timings']['queues']), {'render', 'write'})
+            self.assertGreater(metadata['timings']['stages']['write']['total_seconds'], 0)
+
+        result = self._generate(seed=5, write_workers=1, label_format='jsonl')
+        sample_path, label_row = result['val'][1]
+        self.assertTrue(sample_path.exists())
+        self.assertEqual(label_row.name, '1')
+
+        with self.assertRaises(ValueError):
+            self._generate(write_workers=2, output_format='tar')
+        with self.assertRaises(ValueError):
+            self._generate(write_workers=0)
+
+    def test_invalid_executor(self):
+        """Test unsupported executor type"""
+        with self.assertRaises(ValueError) as context:
+            self._generate(parallel=True, executor='fiber')
+        self.assertIn('Invalid executor', str(context.exception))
+
+    def test_splits_overlap(self):
+        """Test that the next split starts rendering while the previous one finishes"""
+        original = ImageCaptchaGenerator.generate_indexed
+        val_started = threading.Event()
+        overlapped = []
+
+        def slow_tail(generator, seed, split, index, stats=None):
+            if split == 'val':
+                val_started.set()
+            if split == 'train' and index == 5:
+                overlapped.append(val_started.wait(timeout=5))
+            return original(generator, seed, split, index, stats)
+
+        with patch.object(ImageCaptchaGenerator, 'generate_indexed', slow_tail):
+            result = self._generate(parallel=True, max_workers=2, executor='thread', seed=5)
+        self.assertEqual(overlapped, [True])
+        self.assertEqual(self._snapshot(result), self._snapshot(self._generate(seed=5)))
+
+    def test_guided_chunks(self):
+        """Test that tasks hold at most chunk_size samples and shrink at the end of the run"""
+        events = []
+        self._generate(size=200, chunk_size=8, events=events.append)
+        sizes = [event.stats.samples for event in events if event.kind == 'task']
+        self.assertEqual(sum(sizes), 200)
+        self.assertEqual(max(sizes), 8)
+        self.assertEqual(sizes[-4:], [1, 1, 1, 1])
+
+        with self.assertRaises(ValueError):
+            self._generate(chunk_size=0)
+
+    def _labels(self, result):
+        return [label_path.read_text() for paths in result.values() for _, label_path in paths]
+
+    def test_unique_labels(self):
+        """Test that unique_labels never repeats a label within or across splits"""
+        self.generator = ImageCaptchaGenerator(CaptchaConfig(
+            type=CaptchaType.IMAGE, params={**self.config.params, 'characters': 'ab'}
+        ))
+        ratios = {'train_ratio': 0.5, 'val_ratio': 0.25, 'test_ratio': 0.25}
+        labels = self._labels(self._generate(size=16, seed=5, unique_labels=True, **ratios))
+        self.assertEqual(sorted(labels), sorted(f"{n:04b}".translate(str.maketrans('01', 'ab')) for n in range(16)))
+
+        # Every backend assigns the same label to the same sample
+        for executor in ('thread', 'process'):
+            result = self._generate(size=16, seed=5, unique_labels=True, parallel=True, max_workers=2,
+                                    executor=executor, **ratios)
+            self.assertEqual(self._labels(result), labels)
+
+    def test_unique_labels_fail_fast(self):
+        """Test that a dataset larger than the label space is rejected before anything is written"""
+        self.generator = ImageCaptchaGenerator(CaptchaConfig(
+            type=CaptchaType.IMAGE, params={**self.config.params, 'characters': 'ab'}
+        ))
+        output_dir = Path(self.output_dir) / 'unique'
+        with self.assertRaises(ValueError):
+            self._generate(size=17, unique_labels=True, output_dir=output_dir)
+        # Rounding leaves 8 test samples but only 7 positions in the test share
+        with self.assertRaises(ValueError):
+            self._generate(size=16, train_ratio=0.3, val_ratio=0.3, test_ratio=0.4,
+                           unique_labels=True, output_dir=output_dir)
+        self.assertFalse(output_dir.exists())
+
+class NullCaptchaGenerator(CaptchaGenerator[bytes, str]):
+    """Generator that renders and writes nothing, so only the dataset driver allocates"""
+
+    def generate_label(self, rng=None):
+        return f"{(rng or random).getrandbits(16):04x}"
+
+    def generate_sample(self, label, rng=None):
+        return label.encode()
+
+    def generate(self, rng=None):
+        label = self.generate_label(rng)
+        return self.generate_sample(label, rng), label
+
+    def _save_sample(self, sample, path):
+        return path
+
+    def _save_label(self, label, path):
+        return path
+
+    def save(self, sample, label, output_dir=None, use_timestamp_dir=True, key=None):
+        return f"{output_dir}/samples/{key}.bin", f"{output_dir}/labels/{key}.txt"
+
+class TestStreamingDataset(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test environment"""
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test environment"""
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def _generate(self, generator, **kwargs):
+        params = {
+            'size': 10,
+            'train_ratio': 0.6,
+            'val_ratio': 0.2,
+            'test_ratio': 0.2,
+            'parallel': False,
+            'seed': 7,
+            'output_dir': self.output_dir
+        }
+        params.update(kwargs)
+        return generator.generate_dataset(**params)
+
+    def _peak_memory(self, generator, **kwargs):
+        tracemalloc.start()
+        try:
+            self._generate(generator, **kwargs)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_stream_summary(self):
+        """Test that a streaming run writes the full dataset and returns a summary"""
+        generator = ImageCaptchaGenerator(CaptchaConfig(
+            type=CaptchaType.IMAGE,
+            params={'width': 80, 'height': 30, 'length': 4, 'characters': 'abcdefgh12345'}
+        ))
+        summary = self._generate(generator, stream=True, parallel=True, max_workers=2, max_in_flight=1)
+        dataset_dir = summary['output_dir']
+        self.assertEqual(summary['split_sizes'], {'train': 6, 'val': 2, 'test': 2})
+        self.assertEqual(summary['metadata'], dataset_dir / 'metadata.json')
+        self.assertEqual(summary['timings']['samples'], 10)
+        self.assertEqual(len(list((dataset_dir / 'train' / 'samples').iterdir())), 6)
+        self.assertEqual(len(list((dataset_dir / 'val' / 'labels').iterdir())), 2)
+
+        with open(summary['metadata']) as f:
+            self.assertEqual(json.load(f)['split_sizes'], summary['split_sizes'])
+
+        with self.assertRaises(ValueError):
+            self._generate(generator, stream=True, resume=True)
+        with self.assertRaises(ValueError):
+            self._generate(generator, stream=True, label_format='npy')
+        with self.assertRaises(ValueError):
+            self._generate(generator, max_in_flight=0)
+
+    def test_stream_constant_memory(self):
+        """Test that peak memory of a streaming run does not grow with the dataset size"""
+        generator = NullCaptchaGenerator(CaptchaConfig(type=CaptchaType.IMAGE, params={}))
+        for parallel in (False, True):
+            kwargs = {'parallel': parallel, 'max_workers': 2, 'executor': 'thread'}
+            small = self._peak_memory(generator, size=1000, stream=True, **kwargs)
+            large = self._peak_memory(generator, size=5000, stream=True, **kwargs)
+            collected = self._peak_memory(generator, size=5000, **kwargs)
+
+            # Collecting 4000 more path pairs costs over a megabyte, streaming them costs nothing
+            self.assertGreater(collected - small, 1024 * 1024)
+            self.assertLess(large - small, 64 * 1024)
+
+class TestShardedDataset(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test environment"""
+        self.output_dir = Path(tempfile.mkdtemp())
+        self.generator = ImageCaptchaGenerator(CaptchaConfig(
+            type=CaptchaType.IMAGE,
+            params={'width': 80, 'height': 30, 'length': 4, 'characters': 'abcdefgh12345'}
+        ))
+
+    def tearDown(self):
+        """Clean up test environment"""
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def _generate(self, **kwargs):
+        params = {
+            'size': 20,
+            'train_ratio': 0.6,
+            'val_ratio': 0.2,
+            'test_ratio': 0.2,
+            'parallel': False,
+            'seed': 11,
+            'output_dir': self.output_dir
+        }
+        params.update(kwargs)
+        return self.generator.generate_dataset(**params)
+
+    def _generate_shards(self, num_shards=3, **kwargs):
+        for shard_index in range(num_shards):
+            self._generate(shard_index=shard_index, num_shards=num_shards, **kwargs)
+        return sorted(self.output_dir.glob('shard-*'))
+
+    def _files(self, dataset_dir):
+        # Relative file name -> content of every sample and label
+        return {path.relative_to(dataset_dir).as_posix(): path.read_bytes()
+                for split in ('train', 'val', 'test') for path in (dataset_dir / split).rglob('*.*')}
+
+    def test_shards_partition_dataset(self):
+        """Test that the shards of a run hold exactly the samples of an unsharded run"""
+        unsharded = self._generate(output_dir=self.output_dir / 'full')
+        expected = self._files(Path(unsharded['train'][0][0]).parents[2])
+
+        shard_dirs = self._generate_shards()
+        self.assertEqual([shard_dir.name for shard_dir in shard_dirs],
+                         ['shard-00000-of-00003', 'shard-00001-of-00003', 'shard-00002-of-00003'])
+        with open(shard_dirs[1] / 'metadata.json') as f:
+            metadata = json.load(f)
+        self.assertEqual(metadata['shard'], {'index': 1, 'count': 3,
+                                             'ranges': {'train': [4, 8], 'val': [1, 2], 'test': [1, 2]}})
+        self.assertEqual(metadata['split_sizes'], {'train': 4, 'val': 1, 'test': 1})
+
+        merged_dir = self.output_dir / 'merged'
+        metadata_path = merge_shards(shard_dirs, merged_dir)
+        self.assertEqual(self._files(merged_dir), expected)
+        with open(metadata_path) as f:
+            self.assertEqual(json.load(f)['split_sizes'], {'train': 12, 'val': 4, 'test': 4})
+
+        # Hard links leave the shards intact
+        self.assertTrue(any((shard_dirs[0] / 'train' / 'samples').iterdir()))
+
+    def test_merge_manifests(self):
+        """Test merging per-shard label manifests into one manifest per split"""
+        shard_dirs = self._generate_shards(label_format='csv')
+        merge_shards(shard_dirs, self.output_dir / 'merged', move=True)
+        manifest = load_label_manifest(self.output_dir / 'merged' / 'train' / 'labels.csv')
+        self.assertEqual(manifest['index'].tolist(), list(range(12)))
+        for sample in manifest['sample']:
+            self.assertTrue((self.output_dir / 'merged' / 'train' / sample).exists())
+        self.assertFalse(any((shard_dirs[0] / 'train' / 'samples').iterdir()))
+
+    def test_merge_archives_and_arrays(self):
+        """Test merging tar shards and array parts without copying them"""
+        shard_dirs = self._generate_shards(num_shards=2, output_format='tar', shard_size=4)
+        with open(merge_shards(shard_dirs, self.output_dir / 'tar')) as f:
+            shards = json.load(f)['shards']['train']
+        self.assertEqual([shard['path'] for shard in shards],
+                         ['train/train-000000.tar', 'train/train-000001.tar', 'train/train-000002.tar',
+                          'train/train-000003.tar'])
+        self.assertEqual(sum(shard['count'] for shard in shards), 12)
+        with tarfile.open(self.output_dir / 'tar' / shards[2]['path']) as tar:
+            self.assertEqual(len(tar.getnames()), 8)
+
+        for shard_dir in shard_dirs:
+            shutil.rmtree(shard_dir)
+        shard_dirs = self._generate_shards(num_shards=2, output_format='npy')
+        with open(merge_shards(shard_dirs, self.output_dir / 'npy')) as f:
+            arrays = json.load(f)['arrays']['train']
+        self.assertEqual(arrays['count'], 12)
+        self.assertEqual(arrays['image_shape'], [12, 30, 80, 3])
+        self.assertEqual([part['images'] for part in arrays['parts']],
+                         ['train/images-00000.npy', 'train/images-00001.npy'])
+        images = np.load(self.output_dir / 'npy' / arrays['parts'][1]['images'], mmap_mode='r')
+        self.assertEqual(images.shape, (6, 30, 80, 3))
+        del images
+
+    def test_invalid_shards(self):
+        """Test rejecting bad shard parameters and incomplete merges"""
+        with self.assertRaises(ValueError):
+            self._generate(shard_index=3, num_shards=3)
+        with self.assertRaises(ValueError):
+            self._generate(shard_index=0, num_shards=2, seed=None)
+
+        shard_dirs = self._generate_shards()
+        with self.assertRaises(ValueError):
+            merge_shards(shard_dirs[:2], self.output_dir / 'merged')
+
+        self._generate(shard_index=2, num_shards=3, seed=12, output_dir=self.output_dir / 'other')
+        with self.assertRaises(ValueError):
+            merge_shards(shard_dirs[:2] + sorted((self.output_dir / 'other').iterdir()), self.output_dir / 'merged')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
 import re
+import random
+import threading
 from collections import Counter
-from oopscaptcha.utils.id_generator import IDGenerator
+from unittest.mock import patch
+from oopscaptcha.utils.id_generator import IDGenerator, CounterIDScheme, SortableIDScheme
 
 class TestIDGenerator(unittest.TestCase):
     
@@ -54,5 +57,67 @@ class TestIDGenerator(unittest.TestCase):
         # This is a weak assertion because timestamps could be equal if tests run very quickly
         # or if they run exactly at the change of a second
         
+    def test_unseeded_ids_do_not_use_global_random(self):
+        """Test that unseeded IDs neither read nor advance the global random state"""
+        random.seed(1)
+        state = random.getstate()
+        with patch('random.randint') as randint:
+            ids = [IDGenerator.generate_captcha_id() for _ in range(10)]
+        randint.assert_not_called()
+        self.assertEqual(random.getstate(), state)
+        self.assertEqual(len(set(ids)), 10)
+    
+    def test_counter_scheme(self):
+        """Test that counter IDs encode split, worker and index and sort in order"""
+        scheme = IDGenerator.create_scheme('counter', worker=3)
+        self.assertIsInstance(scheme, CounterIDScheme)
+        self.assertEqual(scheme.key('train', 42), 'train-0003-0000000042')
+        
+        keys = scheme.block('val', 8, 5)
+        self.assertEqual(keys[0], 'val-0003-0000000008')
+        self.assertEqual(sorted(keys), keys)
+        self.assertNotEqual(IDGenerator.create_scheme('counter', worker=4).key('train', 42), scheme.key('train', 42))
+    
+    def test_sortable_scheme(self):
+        """Test that sortable IDs are unique across threads and sort in generation order"""
+        scheme = SortableIDScheme(block_size=64)
+        
+        block = scheme.allocate(1000)
+        self.assertEqual(sorted(block), block)
+        self.assertTrue(all(re.match(r"^captcha_[0-9a-f]{32}$", key) for key in block))
+        
+        per_thread = []
+        
+        def worker():
+            per_thread.append([scheme.key('train', 0) for _ in range(500)])
+        
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        keys = [key for ids in per_thread for key in ids]
+        self.assertEqual(len(set(keys)), len(keys))
+    
+    def test_sortable_blocks_in_same_millisecond(self):
+        """Test that blocks allocated within one millisecond continue the previous block"""
+        scheme = SortableIDScheme(block_size=2)
+        with patch('oopscaptcha.utils.id_generator.time.time', return_value=1700000000.0):
+            keys = [key for _ in range(50) for key in scheme.allocate(2)]
+            keys += [scheme.key('train', 0) for _ in range(50)]
+        self.assertEqual(sorted(keys), keys)
+        self.assertEqual(len(set(keys)), len(keys))
+        
+        # A clock stepping back does not reorder IDs either
+        with patch('oopscaptcha.utils.id_generator.time.time', return_value=1699999999.0):
+            later = scheme.allocate(2)
+        self.assertLess(keys[-1], later[0])
+    
+    def test_unknown_scheme(self):
+        """Test unsupported ID scheme"""
+        with self.assertRaises(ValueError):
+            IDGenerator.create_scheme('snowflake')
+    
 if __name__ == "__main__":
     unittest.main()
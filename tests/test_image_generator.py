@@ -1,7 +1,10 @@
 import unittest
+import random
 import tempfile
 from pathlib import Path
 from io import BytesIO
+from unittest.mock import patch
+import numpy as np # type: ignore
 from PIL import Image # type: ignore
 
 from oopscaptcha.generators.types import CaptchaType
@@ -107,5 +110,178 @@ class TestImageCaptchaGenerator(unittest.TestCase):
         # Label should match the original text
         self.assertEqual(label, text)
 
+    def test_save_writes_encoded_bytes(self):
+        """Test that the saved file is the generated PNG, byte for byte"""
+        image, text = self.generator.generate()
+        sample_path, _ = self.generator.save(image, text)
+        
+        self.assertEqual(sample_path.read_bytes(), image.getvalue())
+
+    def test_seeded_generation(self):
+        """Test that an explicit RNG reproduces label and pixels exactly"""
+        image1, text1 = self.generator.generate(random.Random(7))
+        image2, text2 = self.generator.generate(random.Random(7))
+        
+        self.assertEqual(text1, text2)
+        self.assertEqual(image1.getvalue(), image2.getvalue())
+    
+    def test_glyph_cache(self):
+        """Test that the glyph cache renders the same pixels and stays bounded"""
+        cached = ImageCaptchaGenerator(CaptchaConfig(
+            type=CaptchaType.IMAGE,
+            params={**self.config.params, 'glyph_cache': True, 'glyph_cache_size': 4}
+        ))
+        self.assertEqual(self.generator.generator.glyph_cache_size, 0)
+        
+        for seed in range(5):
+            expected, _ = self.generator.generate(random.Random(seed))
+            image, _ = cached.generate(random.Random(seed))
+            self.assertEqual(image.getvalue(), expected.getvalue())
+        
+        renderer = cached.generator
+        self.assertGreater(renderer.glyph_cache_hits, 0)
+        self.assertLessEqual(len(renderer._glyphs), 4)
+    
+    def test_iter_samples(self):
+        """Test bounded lazy generation without touching the filesystem"""
+        pairs = list(self.generator.iter_samples(n=5))
+        
+        self.assertEqual(len(pairs), 5)
+        for image, text in pairs:
+            self.assertIsInstance(image, BytesIO)
+            self.assertEqual(len(text), 6)
+        self.assertEqual(list(Path(self.config.params['output_dir']).iterdir()), [])
+    
+    def test_iter_samples_batches(self):
+        """Test batched generation with read-ahead"""
+        batches = list(self.generator.iter_samples(n=7, batch_size=3, prefetch_batches=2))
+        self.assertEqual([len(batch) for batch in batches], [3, 3, 1])
+    
+    def test_iter_samples_endless(self):
+        """Test that an endless prefetching stream can be closed early"""
+        stream = self.generator.iter_samples(batch_size=2, prefetch_batches=1)
+        for _ in range(3):
+            self.assertEqual(len(next(stream)), 2)
+        stream.close()
+    
+    def test_iter_samples_propagates_errors(self):
+        """Test that producer errors reach the consumer"""
+        with patch.object(self.generator, 'generate', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                list(self.generator.iter_samples(n=2, prefetch_batches=1))
+
+    def test_generate_batch(self):
+        """Test rendering a batch straight into a uint8 array"""
+        images, labels = self.generator.generate_batch(['abc123', 'hhh555'], color_mode='L')
+        
+        self.assertEqual(images.shape, (2, 60, 160, 1))
+        self.assertEqual(images.dtype, np.uint8)
+        np.testing.assert_array_equal(labels[0], [0, 1, 2, 8, 9, 10])
+        self.assertEqual(self.generator.decode_labels(labels), ['abc123', 'hhh555'])
+        
+        # Renders into a caller-provided array
+        out = np.zeros((3, 60, 160, 3), dtype=np.uint8)
+        images, labels = self.generator.generate_batch(3, out=out)
+        self.assertIs(images, out)
+        self.assertEqual(labels.shape, (3, 6))
+    
+    def test_encode_labels_rejects_unknown_characters(self):
+        """Test label encoding validation"""
+        with self.assertRaises(ValueError):
+            self.generator.encode_labels(['xyzxyz'])
+        with self.assertRaises(ValueError):
+            self.generator.encode_labels(['abc'])
+    
+    def test_generate_labels(self):
+        """Test drawing a batch of labels in one call"""
+        labels = self.generator.generate_labels(1000, rng=0)
+        
+        self.assertEqual(labels.shape, (1000,))
+        self.assertTrue(all(len(label) == 6 and set(label) <= set('abcdefgh12345') for label in labels))
+        np.testing.assert_array_equal(labels, self.generator.generate_labels(1000, rng=0))
+        self.assertEqual(self.generator.decode_labels(self.generator.generate_label_indices(1000, rng=0)),
+                         labels.tolist())
+    
+    def test_generate_unique_labels(self):
+        """Test that unique batches never repeat a label and fail fast when too large"""
+        generator = ImageCaptchaGenerator(CaptchaConfig(
+            type=CaptchaType.IMAGE, params={**self.config.params, 'length': 2, 'characters': 'abcc'}
+        ))
+        self.assertEqual(generator.label_space(), 9)
+        
+        for balance in (False, True):
+            labels = generator.generate_labels(9, rng=1, unique=True, balance=balance)
+            self.assertEqual(sorted(labels.tolist()), sorted(a + b for a in 'abc' for b in 'abc'))
+        
+        with self.assertRaises(ValueError):
+            generator.generate_labels(10, unique=True)
+    
+    def test_label_at(self):
+        """Test that label numbers map one-to-one onto the distinct labels"""
+        generator = ImageCaptchaGenerator(CaptchaConfig(
+            type=CaptchaType.IMAGE, params={**self.config.params, 'length': 3, 'characters': 'abcc'}
+        ))
+        self.assertEqual(generator.label_at(0), 'aaa')
+        self.assertEqual(generator.label_at(5), 'abc')
+        self.assertEqual(len({generator.label_at(n) for n in range(generator.label_space())}), 27)
+        
+        with self.assertRaises(ValueError):
+            generator.label_at(27)
+    
+    def test_generate_balanced_labels(self):
+        """Test that balanced batches use every character equally often"""
+        labels = self.generator.generate_labels(130, rng=2, balance=True)
+        counts = {c: ''.join(labels.tolist()).count(c) for c in 'abcdefgh12345'}
+        self.assertEqual(set(counts.values()), {60})
+    
+    def _with_encoding(self, **encoding):
+        return ImageCaptchaGenerator(CaptchaConfig(
+            type=CaptchaType.IMAGE, params={**self.config.params, 'encoding': encoding}
+        ))
+    
+    def test_encoding_formats(self):
+        """Test that every encoding format decodes back to the rendered size and sets the extension"""
+        for format_, pil_format, extension in (('png', 'PNG', 'png'), ('webp', 'WEBP', 'webp'),
+                                               ('jpeg', 'JPEG', 'jpg'), ('raw', 'PPM', 'ppm')):
+            generator = self._with_encoding(format=format_)
+            sample, label = generator.generate(random.Random(0))
+            with Image.open(sample) as image:
+                self.assertEqual((image.format, image.size), (pil_format, (160, 60)))
+            self.assertEqual(generator.sample_extension, extension)
+            sample_path, _ = generator.save(sample, label, use_timestamp_dir=False, key=format_)
+            self.assertEqual(sample_path.name, f"{format_}.{extension}")
+    
+    def test_encoding_modes(self):
+        """Test grayscale and palette encoding"""
+        rendered = self.generator.render_sample('abc123', random.Random(1))
+        with Image.open(self._with_encoding(mode='L').encode_rendered(rendered)) as image:
+            self.assertEqual(image.mode, 'L')
+        raw_gray = self._with_encoding(format='raw', mode='L')
+        self.assertEqual(raw_gray.sample_extension, 'pgm')
+        with Image.open(raw_gray.encode_rendered(rendered)) as image:
+            self.assertEqual((image.format, image.mode), ('PPM', 'L'))
+        with Image.open(self._with_encoding(mode='P', colors=16).encode_rendered(rendered)) as image:
+            self.assertEqual(image.mode, 'P')
+            self.assertLessEqual(len(image.getcolors()), 16)
+    
+    def test_encoding_compression(self):
+        """Test that the compression level and quality reach the encoder"""
+        rendered = self.generator.render_sample('abc123', random.Random(1))
+        fast = self._with_encoding(compress_level=0).encode_rendered(rendered).getbuffer().nbytes
+        small = self._with_encoding(compress_level=9).encode_rendered(rendered).getbuffer().nbytes
+        self.assertLess(small, fast)
+        
+        low = self._with_encoding(format='jpeg', quality=10).encode_rendered(rendered).getbuffer().nbytes
+        high = self._with_encoding(format='jpeg', quality=95).encode_rendered(rendered).getbuffer().nbytes
+        self.assertLess(low, high)
+    
+    def test_invalid_encoding(self):
+        """Test invalid encoding profiles"""
+        for encoding in ({'format': 'gif'}, {'mode': 'CMYK'}, {'format': 'jpeg', 'mode': 'P'},
+                         {'compress_level': 10}, {'format': 'jpeg', 'compress_level': 1},
+                         {'quality': 80}, {'format': 'webp', 'quality': 0}, {'level': 1}):
+            with self.assertRaises(ValueError, msg=str(encoding)):
+                self._with_encoding(**encoding)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
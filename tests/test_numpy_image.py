@@ -0,0 +1,100 @@
+import unittest
+import random
+import shutil
+import tempfile
+from pathlib import Path
+from io import BytesIO
+import numpy as np # type: ignore
+from PIL import Image # type: ignore
+
+from oopscaptcha.generators.types import CaptchaType
+from oopscaptcha.generators.base import CaptchaConfig
+from oopscaptcha.generators.factory import CaptchaFactory
+from oopscaptcha.generators.image import ImageCaptchaGenerator
+from oopscaptcha.generators.numpy_image import NumpyImageCaptchaGenerator
+
+class TestNumpyImageCaptchaGenerator(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test environment"""
+        self.output_dir = tempfile.mkdtemp()
+        self.config = CaptchaConfig(
+            type=CaptchaType.IMAGE,
+            params={
+                'width': 80,
+                'height': 30,
+                'length': 4,
+                'characters': 'abcdefgh12345',
+                'output_dir': self.output_dir
+            }
+        )
+        self.generator = NumpyImageCaptchaGenerator(self.config)
+
+    def tearDown(self):
+        """Clean up test environment"""
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_factory_backend(self):
+        """Test selecting the backend through the factory"""
+        generator = CaptchaFactory.create(CaptchaType.IMAGE, backend='numpy', width=80, height=30)
+        self.assertIsInstance(generator, NumpyImageCaptchaGenerator)
+        generator = CaptchaFactory.create(CaptchaType.IMAGE, backend='captcha')
+        self.assertNotIsInstance(generator, NumpyImageCaptchaGenerator)
+        self.assertIsInstance(generator, ImageCaptchaGenerator)
+
+        with self.assertRaises(ValueError):
+            CaptchaFactory.create(CaptchaType.IMAGE, backend='unknown')
+
+    def test_generate(self):
+        """Test captcha generation"""
+        image, text = self.generator.generate(random.Random(7))
+        self.assertIsInstance(image, BytesIO)
+        self.assertEqual(len(text), 4)
+
+        image.seek(0)
+        img = Image.open(image)
+        self.assertEqual(img.size, (80, 30))
+        self.assertEqual(img.mode, 'RGB')
+
+    def test_seeded_generation_is_reproducible(self):
+        """Test that the same seed renders the same image"""
+        image1, text1 = self.generator.generate(random.Random(7))
+        image2, text2 = self.generator.generate(random.Random(7))
+        self.assertEqual(text1, text2)
+        self.assertEqual(image1.getvalue(), image2.getvalue())
+
+    def test_batch_matches_single_samples(self):
+        """Test that a vectorized batch renders the same pixels as single samples"""
+        labels = ['ab12', 'h345', 'cdef']
+        images, encoded = self.generator.generate_batch(labels, rngs=[random.Random(seed) for seed in range(3)])
+        self.assertEqual(images.shape, (3, 30, 80, 3))
+        self.assertEqual(images.dtype, np.uint8)
+        self.assertEqual(self.generator.decode_labels(encoded), labels)
+
+        for seed, label in enumerate(labels):
+            expected = self.generator.generator.generate_image(label, rng=random.Random(seed))
+            np.testing.assert_array_equal(images[seed], np.asarray(expected))
+
+    def test_batch_grayscale(self):
+        """Test grayscale batches match PIL's luma conversion"""
+        rgb, _ = self.generator.generate_batch(['ab12'], rngs=[random.Random(1)])
+        gray, _ = self.generator.generate_batch(['ab12'], rngs=[random.Random(1)], color_mode='L')
+        self.assertEqual(gray.shape, (1, 30, 80, 1))
+        expected = np.asarray(Image.fromarray(rgb[0]).convert('L'))
+        np.testing.assert_array_equal(gray[0, ..., 0], expected)
+
+    def test_npy_dataset(self):
+        """Test rendering an array dataset with the NumPy backend"""
+        self.generator.warmup()
+        result = self.generator.generate_dataset(
+            size=10, train_ratio=0.6, val_ratio=0.2, test_ratio=0.2, parallel=True, max_workers=2,
+            output_format='npy', seed=3, output_dir=self.output_dir
+        )
+        images_row, _ = result['train'][0]
+        images = np.load(Path(images_row).parent, mmap_mode='r')
+        self.assertEqual(images.shape, (6, 30, 80, 3))
+        self.assertTrue((np.asarray(images) < 255).any())
+        del images
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np # type: ignore
+
+from oopscaptcha.generators.types import CaptchaType
+from oopscaptcha.generators.base import CaptchaConfig
+from oopscaptcha.generators.image import ImageCaptchaGenerator
+from oopscaptcha.datasets import OnlineProducer
+from oopscaptcha.utils.seeding import sample_rng
+
+class FailingGenerator(ImageCaptchaGenerator):
+
+    def generate_label(self, rng=None):
+        if rng is not None:
+            raise ValueError("label failure")
+        return super().generate_label(rng)
+
+class TestOnlineProducer(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test environment"""
+        self.config = CaptchaConfig(
+            type=CaptchaType.IMAGE,
+            params={'width': 80, 'height': 30, 'length': 4, 'characters': 'abcdefgh12345', 'backend': 'numpy'}
+        )
+        self.generator = ImageCaptchaGenerator(self.config)
+
+    def _expected(self, seed, start, count):
+        rngs = [sample_rng(seed, 'train', index) for index in range(start, start + count)]
+        return self.generator.generate_batch([self.generator.generate_label(rng) for rng in rngs], rngs=rngs)
+
+    def test_ordered_batches(self):
+        """Test that ordered batches hold the seeded train samples in sequence"""
+        with OnlineProducer(self.generator, batch_size=4, num_workers=2, seed=3, batches=5, ordered=True) as producer:
+            batches = [(images.copy(), labels.copy()) for images, labels in producer]
+
+        self.assertEqual(len(batches), 5)
+        for number, (images, labels) in enumerate(batches):
+            expected_images, expected_labels = self._expected(3, number * 4, 4)
+            np.testing.assert_array_equal(images, expected_images)
+            np.testing.assert_array_equal(labels, expected_labels)
+        self.assertEqual(producer.metrics()['samples'], 20)
+
+    def test_unordered_batches(self):
+        """Test that unordered batches deliver every batch exactly once"""
+        with OnlineProducer(self.generator, batch_size=2, num_workers=3, slots=3, seed=3, batches=9) as producer:
+            labels = [tuple(self.generator.decode_labels(labels)) for _, labels in producer]
+
+        expected = [tuple(self.generator.decode_labels(self._expected(3, number * 2, 2)[1])) for number in range(9)]
+        self.assertEqual(sorted(labels), sorted(expected))
+
+    def test_zero_copy_views(self):
+        """Test that batches are views of the shared ring buffer"""
+        with OnlineProducer(self.generator, batch_size=2, num_workers=1, slots=2, seed=0, batches=2) as producer:
+            images, labels = next(producer)
+            self.assertTrue(np.shares_memory(images, producer._images))
+            self.assertEqual(images.shape, (2, 30, 80, 3))
+            self.assertEqual(labels.shape, (2, 4))
+
+    def test_stop_endless(self):
+        """Test stopping an endless producer while workers are blocked on a full ring"""
+        producer = OnlineProducer(self.generator, batch_size=2, num_workers=2, slots=2)
+        producer.start()
+        next(producer)
+        producer.stop()
+        self.assertEqual(producer._workers, [])
+        with self.assertRaises(RuntimeError):
+            next(producer)
+
+    def test_worker_failure(self):
+        """Test that a worker error is raised to the consumer"""
+        producer = OnlineProducer(FailingGenerator(self.config), batch_size=2, num_workers=1)
+        with producer:
+            with self.assertRaises(RuntimeError) as context:
+                next(producer)
+        self.assertIn("label failure", str(context.exception))
+
+    def test_invalid_params(self):
+        """Test invalid producer parameters"""
+        with self.assertRaises(ValueError):
+            OnlineProducer(self.generator, batch_size=0)
+        with self.assertRaises(ValueError):
+            OnlineProducer(self.generator, num_workers=0)
+        with self.assertRaises(ValueError):
+            OnlineProducer(self.generator, slots=1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np # type: ignore
+
+from oopscaptcha.generators.types import CaptchaType
+from oopscaptcha.generators.base import CaptchaConfig
+from oopscaptcha.generators.image import ImageCaptchaGenerator
+from oopscaptcha.datasets import DatasetReader, merge_shards
+
+class TestDatasetReader(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test environment"""
+        self.output_dir = Path(tempfile.mkdtemp())
+        self.generator = ImageCaptchaGenerator(CaptchaConfig(
+            type=CaptchaType.IMAGE,
+            params={'width': 80, 'height': 30, 'length': 4, 'characters': 'abcdefgh12345'}
+        ))
+
+    def tearDown(self):
+        """Clean up test environment"""
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def _generate(self, name, **kwargs):
+        params = {
+            'size': 20,
+            'train_ratio': 0.6,
+            'val_ratio': 0.2,
+            'test_ratio': 0.2,
+            'parallel': False,
+            'seed': 5,
+            'output_dir': self.output_dir / name
+        }
+        params.update(kwargs)
+        self.generator.generate_dataset(**params)
+        return next((self.output_dir / name).rglob('metadata.json')).parent
+
+    def _reference(self):
+        # Encoded sample and label of every train sample, in index order
+        dataset_dir = self._generate('reference', output_format='tar')
+        with DatasetReader(dataset_dir) as reader:
+            return list(reader)
+
+    def test_files_format(self):
+        """Test reading samples and labels written as individual files"""
+        dataset_dir = self._generate('files')
+        reader = DatasetReader(dataset_dir)
+
+        self.assertEqual(len(reader), 12)
+        self.assertTrue((dataset_dir / 'train' / 'index.npy').exists())
+        expected = {(sample, label) for sample, label in self._reference()}
+        self.assertEqual({reader[i] for i in range(len(reader))}, expected)
+        self.assertEqual(reader[-1], reader[11])
+        with self.assertRaises(IndexError):
+            reader[12]
+
+    def test_formats_agree(self):
+        """Test that tar shards and label manifests return the samples in index order"""
+        expected = self._reference()
+        for name, kwargs in (('tar', {'output_format': 'tar', 'shard_size': 5}),
+                             ('jsonl', {'label_format': 'jsonl'}),
+                             ('npy', {'label_format': 'npy'})):
+            with DatasetReader(self._generate(name, **kwargs)) as reader:
+                self.assertEqual(list(reader), expected, name)
+
+    def test_index_is_reused(self):
+        """Test that a saved index is memory-mapped instead of rebuilt"""
+        dataset_dir = self._generate('reuse', output_format='tar')
+        DatasetReader(dataset_dir, split='val')
+        index_path = dataset_dir / 'val' / 'index.npy'
+        mtime = index_path.stat().st_mtime_ns
+
+        reader = DatasetReader(dataset_dir, split='val')
+        self.assertIsInstance(reader._index, np.memmap)
+        self.assertEqual(index_path.stat().st_mtime_ns, mtime)
+        self.assertEqual(len(reader), 4)
+
+    def test_decode(self):
+        """Test decoding images to arrays on access"""
+        reader = DatasetReader(self._generate('decode'), split='test', decode=True)
+        image, label = reader[0]
+        self.assertEqual(image.shape, (30, 80, 3))
+        self.assertEqual(len(label), 4)
+
+    def test_npy_format(self):
+        """Test reading array rows and decoded labels, also from merged parts"""
+        dataset_dir = self._generate('npy', output_format='npy')
+        reader = DatasetReader(dataset_dir)
+        images = np.load(dataset_dir / 'train' / 'images.npy')
+        labels = [label for _, label in self._reference()]
+
+        np.testing.assert_array_equal(np.stack([image for image, _ in reader]), images)
+        self.assertEqual([label for _, label in reader], labels)
+
+        for shard_index in range(3):
+            self._generate('sharded', output_format='npy', shard_index=shard_index, num_shards=3)
+        merged = self.output_dir / 'merged'
+        merge_shards(sorted((self.output_dir / 'sharded').glob('shard-*')), merged)
+        reader = DatasetReader(merged)
+        np.testing.assert_array_equal(np.stack([image for image, _ in reader]), images)
+        self.assertEqual([label for _, label in reader], labels)
+
+    def test_worker_shards(self):
+        """Test that worker shards partition the split"""
+        reader = DatasetReader(self._generate('workers', output_format='tar'))
+        shards = [reader.shard(k, 3) for k in range(3)]
+
+        self.assertEqual([len(shard) for shard in shards], [4, 4, 4])
+        self.assertEqual(shards[1][0], reader[1])
+        self.assertEqual(sorted(item for shard in shards for item in shard), sorted(reader))
+        with self.assertRaises(ValueError):
+            reader.shard(3, 3)
+
+    def test_empty_split(self):
+        """Test that a split without samples reads as empty in every format"""
+        for output_format, label_format in (('files', 'files'), ('files', 'jsonl'), ('tar', 'files'), ('npy', 'files')):
+            dataset_dir = self._generate(f"empty-{output_format}-{label_format}", size=4, train_ratio=0.5,
+                                         val_ratio=0.5, test_ratio=0.0, output_format=output_format,
+                                         label_format=label_format)
+            with DatasetReader(dataset_dir, 'test') as reader:
+                self.assertEqual(len(reader), 0)
+                self.assertEqual(list(reader), [])
+
+    def test_unrecorded_files(self):
+        """Test that files outside progress.jsonl or without a label are not indexed"""
+        dataset_dir = self._generate('resumed', resume=True)
+        split_dir = dataset_dir / 'train'
+        (split_dir / 'samples' / 'orphan.png').write_bytes(b'')
+        (split_dir / 'labels' / 'orphan.txt').write_text('abcd')
+        with DatasetReader(dataset_dir, rebuild_index=True) as reader:
+            self.assertEqual(len(reader), 12)
+            self.assertEqual(list(reader), self._reference())
+
+        # Without a progress manifest, a sample whose label was never written is skipped
+        dataset_dir = self._generate('unlabeled')
+        next((dataset_dir / 'train' / 'labels').iterdir()).unlink()
+        with DatasetReader(dataset_dir) as reader:
+            self.assertEqual(len(reader), 11)
+
+    def test_invalid_dataset(self):
+        """Test opening a directory without metadata or an unknown split"""
+        with self.assertRaises(ValueError):
+            DatasetReader(self.output_dir)
+        with self.assertRaises(ValueError):
+            DatasetReader(self._generate('split'), split='holdout')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from oopscaptcha.utils.seeding import sample_rng, new_entropy, IndexPermutation
+
+class TestSeeding(unittest.TestCase):
+
+    def test_streams_are_reproducible(self):
+        """Test that the same (seed, split, index) always yields the same stream"""
+        first = [sample_rng(42, 'train', 7).random() for _ in range(3)]
+        second = [sample_rng(42, 'train', 7).random() for _ in range(3)]
+        self.assertEqual(first, second)
+
+    def test_streams_are_independent(self):
+        """Test that seed, split and index each select a different stream"""
+        values = {
+            sample_rng(42, 'train', 0).getrandbits(64),
+            sample_rng(42, 'train', 1).getrandbits(64),
+            sample_rng(42, 'val', 0).getrandbits(64),
+            sample_rng(43, 'train', 0).getrandbits(64),
+        }
+        self.assertEqual(len(values), 4)
+
+    def test_unknown_split(self):
+        """Test that only train/val/test have streams"""
+        with self.assertRaises(ValueError):
+            sample_rng(42, 'holdout', 0)
+
+    def test_new_entropy(self):
+        """Test that fresh entropy is a usable non-negative seed"""
+        entropy = new_entropy()
+        self.assertGreaterEqual(entropy, 0)
+        sample_rng(entropy, 'test', 0)
+
+    def test_index_permutation(self):
+        """Test that the index permutation is a seeded bijection of [0, size)"""
+        for size in (1, 2, 3, 16, 1000):
+            permutation = IndexPermutation(size, 42)
+            self.assertEqual(sorted(permutation(i) for i in range(size)), list(range(size)))
+
+        order = [IndexPermutation(1000, 42)(i) for i in range(1000)]
+        self.assertEqual(order, [IndexPermutation(1000, 42)(i) for i in range(1000)])
+        self.assertNotEqual(order, [IndexPermutation(1000, 43)(i) for i in range(1000)])
+        self.assertNotEqual(order, list(range(1000)))
+
+        with self.assertRaises(IndexError):
+            IndexPermutation(1000, 42)(1000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import asyncio
+import json
+import tempfile
+from io import BytesIO
+from PIL import Image # type: ignore
+
+from oopscaptcha.generators.types import CaptchaType
+from oopscaptcha.generators.base import CaptchaConfig
+from oopscaptcha.generators.image import ImageCaptchaGenerator
+from oopscaptcha.service import CaptchaPool, CaptchaServer
+
+class TestCaptchaService(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test environment"""
+        self.generator = ImageCaptchaGenerator(CaptchaConfig(
+            type=CaptchaType.IMAGE,
+            params={
+                'width': 80,
+                'height': 30,
+                'length': 4,
+                'characters': 'abcdefgh12345',
+                'output_dir': tempfile.gettempdir()
+            }
+        ))
+
+    async def _wait_for_depth(self, pool, depth):
+        for _ in range(500):
+            if pool.depth >= depth:
+                return
+            await asyncio.sleep(0.01)
+        self.fail(f"Pool never reached depth {depth}")
+
+    def test_pool_refills_between_watermarks(self):
+        """Test that issuing below the low watermark triggers a refill to the high watermark"""
+        async def run():
+            async with CaptchaPool(self.generator, high_watermark=6, low_watermark=2, refill_workers=2) as pool:
+                await self._wait_for_depth(pool, 6)
+                await asyncio.sleep(0.05)
+                self.assertEqual(pool.depth, 6)
+                self.assertEqual(pool.refilled, 6)
+
+                # Down to 3 stays above the low watermark, no refill
+                for _ in range(3):
+                    sample, label = await pool.issue()
+                    self.assertIsInstance(sample, BytesIO)
+                    self.assertEqual(len(label), 4)
+                await asyncio.sleep(0.05)
+                self.assertEqual(pool.refilled, 6)
+
+                # Reaching the low watermark refills back to the top
+                await pool.issue()
+                await self._wait_for_depth(pool, 6)
+                metrics = pool.metrics()
+                self.assertEqual(metrics['issued'], 4)
+                self.assertEqual(metrics['misses'], 0)
+                self.assertEqual(metrics['refilled'], 10)
+                self.assertGreater(metrics['refill_rate'], 0)
+
+        asyncio.run(run())
+
+    def test_empty_pool_renders_inline(self):
+        """Test that an empty pool still issues and counts a miss"""
+        async def run():
+            pool = CaptchaPool(self.generator, high_watermark=4)
+            sample, label = await pool.issue()
+            self.assertEqual(len(label), 4)
+            self.assertEqual(pool.misses, 1)
+
+        asyncio.run(run())
+
+    def test_invalid_watermarks(self):
+        """Test watermark validation"""
+        with self.assertRaises(ValueError):
+            CaptchaPool(self.generator, high_watermark=0)
+        with self.assertRaises(ValueError):
+            CaptchaPool(self.generator, high_watermark=4, low_watermark=4)
+
+    async def _request(self, port, path):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+
+        head, _, body = response.partition(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        headers = dict(line.split(': ', 1) for line in lines[1:])
+        return int(lines[0].split()[1]), headers, body
+
+    def test_server_issues_captchas(self):
+        """Test issuing CAPTCHAs and reading metrics over HTTP"""
+        async def run():
+            pool = CaptchaPool(self.generator, high_watermark=4, refill_workers=1)
+            async with CaptchaServer({'image': pool}, port=0) as server:
+                await self._wait_for_depth(pool, 4)
+
+                status, headers, body = await self._request(server.port, '/captcha/image')
+                self.assertEqual(status, 200)
+                self.assertEqual(headers['Content-Type'], 'image/png')
+                self.assertRegex(headers['X-Captcha-Id'], r'^captcha_[0-9a-f]{24,32}$')
+                self.assertEqual(len(headers['X-Captcha-Label']), 4)
+                with Image.open(BytesIO(body)) as img:
+                    self.assertEqual(img.size, (80, 30))
+
+                status, _, _ = await self._request(server.port, '/captcha')
+                self.assertEqual(status, 200)
+
+                status, _, body = await self._request(server.port, '/metrics')
+                self.assertEqual(status, 200)
+                metrics = json.loads(body)
+                self.assertEqual(metrics['image']['issued'], 2)
+                self.assertEqual(metrics['image']['misses'], 0)
+
+                status, _, _ = await self._request(server.port, '/captcha/audio')
+                self.assertEqual(status, 404)
+
+        asyncio.run(run())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+import json
+import shutil
+import tarfile
+import tempfile
+from pathlib import Path
+
+import numpy as np # type: ignore
+
+from oopscaptcha.datasets.writers import TarShardWriter, NpyArrayWriter, LabelManifestWriter, load_label_manifest
+
+class TestTarShardWriter(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test environment"""
+        self.output_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Clean up test environment"""
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_rolls_over_shards(self):
+        """Test that samples are split into fixed-size shards"""
+        with TarShardWriter(self.output_dir, 'train', shard_size=2) as writer:
+            for i in range(5):
+                writer.write(f"key{i}", {'png': b'image', 'txt': b'label'})
+
+        self.assertEqual([shard['path'] for shard in writer.shards],
+                         ['train-000000.tar', 'train-000001.tar', 'train-000002.tar'])
+        self.assertEqual([shard['count'] for shard in writer.shards], [2, 2, 1])
+
+        with tarfile.open(self.output_dir / 'train-000002.tar') as tar:
+            self.assertEqual(tar.getnames(), ['key4.png', 'key4.txt'])
+
+    def test_index_offsets(self):
+        """Test that the index points at the member data inside the shard"""
+        with TarShardWriter(self.output_dir, 'val') as writer:
+            writer.write('a', {'png': b'\x89PNG-a', 'txt': b'abcd'})
+            writer.write('b', {'png': b'\x89PNG-bb', 'txt': b'efgh'})
+
+        data = (self.output_dir / 'val-000000.tar').read_bytes()
+        with open(self.output_dir / 'val-000000.idx') as f:
+            entries = [json.loads(line) for line in f]
+
+        self.assertEqual([entry['key'] for entry in entries], ['a', 'b'])
+        offset, size = entries[1]['png']
+        self.assertEqual(data[offset:offset + size], b'\x89PNG-bb')
+        offset, size = entries[1]['txt']
+        self.assertEqual(data[offset:offset + size], b'efgh')
+
+    def test_invalid_shard_size(self):
+        """Test non-positive shard size"""
+        with self.assertRaises(ValueError):
+            TarShardWriter(self.output_dir, 'test', shard_size=0)
+
+class TestNpyArrayWriter(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test environment"""
+        self.output_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Clean up test environment"""
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_write_batches(self):
+        """Test that batches are appended into memory-mappable arrays"""
+        images = np.arange(5 * 2 * 3 * 1, dtype=np.uint8).reshape(5, 2, 3, 1)
+        labels = np.arange(5 * 4, dtype=np.uint8).reshape(5, 4)
+
+        with NpyArrayWriter(self.output_dir, 5) as writer:
+            self.assertEqual(writer.write(images[:3], labels[:3]), 0)
+            self.assertEqual(writer.write(images[3:], labels[3:]), 3)
+
+        self.assertEqual(writer.layout['image_shape'], [5, 2, 3, 1])
+        loaded = np.load(self.output_dir / 'images.npy', mmap_mode='r')
+        np.testing.assert_array_equal(loaded, images)
+        np.testing.assert_array_equal(np.load(self.output_dir / 'labels.npy'), labels)
+
+    def test_overflow(self):
+        """Test writing more rows than the declared size"""
+        with NpyArrayWriter(self.output_dir, 1) as writer:
+            with self.assertRaises(ValueError):
+                writer.write(np.zeros((2, 1, 1, 1), np.uint8), np.zeros((2, 4), np.uint8))
+
+class TestLabelManifestWriter(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test environment"""
+        self.output_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Clean up test environment"""
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        """Test that every manifest format loads back the rows written in batches"""
+        rows = [(0, 'samples/a.png', 'ab12'), (1, 'samples/b.png', 'c3d4'), (2, 'samples/c.png', 'xyz9')]
+        for format in ('jsonl', 'csv', 'npy'):
+            with LabelManifestWriter(self.output_dir, format, seed=7) as writer:
+                writer.write(rows[:2])
+                writer.write(rows[2:])
+
+            self.assertEqual(writer.layout, {'manifest': f"labels.{format}", 'format': format, 'count': 3})
+            manifest = load_label_manifest(self.output_dir / f"labels.{format}")
+            self.assertEqual(manifest['index'].tolist(), [0, 1, 2])
+            self.assertEqual(manifest['sample'].tolist(), [row[1] for row in rows])
+            self.assertEqual(manifest['label'].tolist(), [row[2] for row in rows])
+
+    def test_text_rows_record_seed(self):
+        """Test that text manifests carry the seed on every row"""
+        with LabelManifestWriter(self.output_dir, 'jsonl', seed=7) as writer:
+            writer.write([(0, 'samples/a.png', 'ab12')])
+        with open(self.output_dir / 'labels.jsonl') as f:
+            self.assertEqual(json.loads(f.readline()),
+                             {'index': 0, 'sample': 'samples/a.png', 'label': 'ab12', 'seed': 7})
+
+    def test_columnar_manifest(self):
+        """Test that the npy manifest is a single structured array"""
+        with LabelManifestWriter(self.output_dir, 'npy') as writer:
+            writer.write([(0, 'samples/a.png', 'ab')])
+            writer.write([(1, 'samples/bb.png', 'abcdef')])
+
+        manifest = np.load(self.output_dir / 'labels.npy')
+        self.assertEqual(manifest.dtype.names, ('index', 'sample', 'label'))
+        self.assertEqual(manifest['label'].tolist(), ['ab', 'abcdef'])
+
+    def test_invalid_format(self):
+        """Test unsupported manifest format"""
+        with self.assertRaises(ValueError):
+            LabelManifestWriter(self.output_dir, 'files')
+
+if __name__ == '__main__':
+    unittest.main()